@@ -95,6 +95,60 @@ options:
     type: str
     default: INFO
     choices: [INFO, DEBUG]
+  reference_cache_path:
+    description:
+      - Path to a SQLite file where lookups of references between
+        resources (names to IDs and back) are cached, shared by all
+        module invocations that use the same file. Cached lookups
+        expire after an hour, and those of resources created or
+        updated by the module are dropped.
+      - If omitted, lookups are only cached for the duration of the
+        module run.
+    type: str
+  reference_cache_size:
+    description:
+      - Maximum number of lookups kept in the in-memory reference
+        cache, the least recently used ones are dropped beyond it.
+        0 disables caching of lookups.
+      - Hit and miss counts of the cache are returned in
+        C(reference_cache_stats) by the import and export modules.
+      - If omitted, up to 10000 lookups are kept.
+    type: int
+  reference_cache_ttl:
+    description:
+      - Number of seconds for which lookups are kept in the in-memory
+        reference cache.
+      - If omitted, lookups are kept for 5 minutes.
+    type: int
+  identity_directory:
+    description:
+      - Load all Keystone domains, projects, users and roles visible to
+        the user when connecting, and resolve references to them from
+        the loaded lists instead of looking them up one by one.
+      - Pays off for modules making many identity lookups in clouds
+        with a moderate number of identity resources.
+    type: bool
+    default: false
+  auth_cache_path:
+    description:
+      - Path to a file where Keystone tokens are cached, so that
+        module invocations using the same cloud config reuse a token
+        (including its service catalog) instead of authenticating
+        again. Tokens are reused until 5 minutes before they expire.
+      - The file is created readable only by its owner. Tokens grant
+        access to the cloud, keep the file private.
+      - If omitted, each module invocation authenticates on its own.
+    type: str
+  broker_socket_path:
+    description:
+      - Path of the Unix socket of a connection broker (see the
+        M(os_migrate.os_migrate.connection_broker) module). When a
+        broker serves at the path, the module uses its warm
+        connection instead of connecting and authenticating on its
+        own.
+      - If omitted or no broker is running, the module connects on
+        its own.
+    type: str
 requirements:
   - "python >= 3.6"
   - "openstacksdk >= 1.0.0"
@@ -0,0 +1,70 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import json
+import os
+
+# Cached tokens which expire in less than this many seconds are not
+# reused, so that they don't expire in the middle of a module run.
+EXPIRY_MARGIN = 300
+
+
+def reuse_auth_state(conn, file_path):
+    """Reuse Keystone authentication of OpenStack SDK connection `conn`
+    from the token cache at `file_path`, or authenticate and store the
+    new token there. Tokens are keyed by a hash of the resolved cloud
+    config (auth args, region and interface), and are reused until
+    `EXPIRY_MARGIN` seconds before their expiry. The file is created
+    with 0600 mode and locked while being read and written.
+
+    Returns: True if a cached token was reused, False otherwise
+    """
+    auth = conn.session.auth
+    if not hasattr(auth, "get_auth_state"):
+        # Auth plugin doesn't support (de)serialization of its state.
+        return False
+
+    key = config_hash(conn)
+    fd = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o600)
+    with os.fdopen(fd, "r+") as cache_file:
+        fcntl.flock(cache_file, fcntl.LOCK_EX)
+        try:
+            states = json.load(cache_file)
+        except ValueError:
+            # Empty or damaged file, start over.
+            states = {}
+
+        state = states.get(key)
+        if state is not None:
+            auth.set_auth_state(state)
+            if auth.auth_ref is not None and not auth.auth_ref.will_expire_soon(
+                EXPIRY_MARGIN
+            ):
+                return True
+            auth.invalidate()
+
+        conn.session.get_token()
+        states[key] = auth.get_auth_state()
+        cache_file.seek(0)
+        cache_file.truncate()
+        json.dump(states, cache_file)
+        cache_file.flush()
+        os.fsync(cache_file.fileno())
+    return False
+
+
+def config_hash(conn):
+    """Returns: hex digest identifying the resolved cloud config of
+    `conn`, credentials included, without revealing them
+    """
+    config = [
+        conn.config.get_auth_args(),
+        conn.config.get_region_name(),
+        conn.config.get_interface(),
+    ]
+    return hashlib.sha256(
+        json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
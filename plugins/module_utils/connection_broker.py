@@ -0,0 +1,414 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import types
+
+# How long (in seconds) the broker keeps running without any requests.
+DEFAULT_IDLE_TIMEOUT = 3600
+# How long (in seconds) clients wait for the broker to accept a socket
+# connection and open the SDK connection on it.
+DEFAULT_CONNECT_TIMEOUT = 30
+
+_HEADER = struct.Struct("!I")
+
+
+class BrokerError(Exception):
+    """Error raised in the broker which couldn't be sent to the client
+    as is.
+    """
+
+
+class BrokerServer:
+    """Broker holding warm OpenStack SDK connections, serving module
+    requests over the Unix socket at `socket_path`.
+
+    Clients (see `BrokeredConnection`) open a connection by sending
+    the keyword arguments for `connect` (`openstack.connect` by
+    default). Connections are shared by all clients sending the same
+    arguments. Clients then resolve attributes of the connection, and
+    call the resolved methods. The socket is created readable only by
+    its owner, as the broker acts with the credentials of the clients.
+    """
+
+    def __init__(self, socket_path, connect=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self._connect = connect
+        self._conns = {}
+        self._conns_lock = threading.Lock()
+        self._last_request = time.time()
+        self._stopped = threading.Event()
+
+        if os.path.exists(socket_path):
+            # Stale socket of a broker which didn't clean up.
+            os.unlink(socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(
+                socket_path, _handler_class(self)
+            )
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_threads = True
+        self._server.timeout = 1
+
+    def serve_forever(self):
+        """Serve requests until `shutdown` is called, a client requests
+        shutdown, or no request arrives for `idle_timeout` seconds.
+        """
+        try:
+            while not self._stopped.is_set():
+                self._server.handle_request()
+                if (
+                    self.idle_timeout
+                    and time.time() - self._last_request > self.idle_timeout
+                ):
+                    break
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        self._stopped.set()
+
+    def connection(self, config):
+        """Returns: SDK connection for connect keyword arguments `config`,
+        connecting on first use
+        """
+        key = hashlib.sha256(
+            json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        with self._conns_lock:
+            if key not in self._conns:
+                connect = self._connect
+                if connect is None:
+                    import openstack
+
+                    connect = openstack.connect
+                self._conns[key] = connect(**config)
+            return self._conns[key]
+
+    def handle(self, request, session):
+        """Returns: response to `request`, `session` is a dict holding
+        the state of the client socket connection
+        """
+        self._last_request = time.time()
+        op = request["op"]
+        if op == "ping":
+            return ("value", "pong")
+        if op == "shutdown":
+            self.shutdown()
+            return ("value", None)
+        if op == "open":
+            session["conn"] = self.connection(request["config"])
+            return ("value", None)
+
+        obj = _resolve(session["conn"], request["path"])
+        if op == "get":
+            if callable(obj):
+                return ("callable", None)
+            if _is_value(obj):
+                return ("value", obj)
+            return ("object", None)
+        if op == "call":
+            result = obj(*request["args"], **request["kwargs"])
+            if isinstance(result, types.GeneratorType):
+                # SDK list methods return generators, exhaust them here.
+                result = list(result)
+            return ("value", result)
+        raise BrokerError(f"Unknown broker operation '{op}'.")
+
+
+class BrokeredConnection:
+    """Client side of a `BrokerServer` connection, standing in for the
+    SDK connection created from connect keyword arguments `config`.
+
+    Attribute access returns plain values (strings, dicts, SDK
+    resources, ...) as they are, other objects and methods are
+    represented by remote proxies. Calls of remote methods return their
+    results, generators are returned as lists. Exceptions raised in the
+    broker are re-raised in the client. Each thread using the connection
+    talks to the broker over its own socket, so that threads' requests
+    are served concurrently.
+
+    Connecting a socket and opening the SDK connection on it time out
+    after `connect_timeout` seconds. Requests made afterwards wait as
+    long as the SDK calls in the broker take, as they would when calling
+    the SDK directly.
+    """
+
+    def __init__(self, socket_path, config, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self._config = config
+        self._local = threading.local()
+        self._socks = []
+        self._socks_lock = threading.Lock()
+        # Proxies of remote objects and methods by attribute path, so
+        # that their kind is only resolved once and they can be
+        # identified across accesses (see reference._method_key).
+        self._remotes = {}
+        # Connect right away, so that errors surface here.
+        self._socket()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._get(self, (name,))
+
+    def close(self):
+        with self._socks_lock:
+            for sock in self._socks:
+                sock.close()
+            self._socks = []
+
+    def _call(self, path, args, kwargs):
+        return self._request(
+            {"op": "call", "path": path, "args": args, "kwargs": kwargs}
+        )
+
+    def _get(self, parent, path):
+        if path in self._remotes:
+            return self._remotes[path]
+        kind, value = self._request({"op": "get", "path": path}, with_kind=True)
+        if kind == "value":
+            return value
+        remote = _RemoteObject(self, parent, path)
+        self._remotes[path] = remote
+        return remote
+
+    def _request(self, request, with_kind=False):
+        sock = self._socket()
+        _send(sock, request)
+        kind, value = _recv(sock)
+        if kind == "error":
+            raise value
+        if with_kind:
+            return kind, value
+        return value
+
+    def _socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            with self._socks_lock:
+                self._socks.append(sock)
+            sock.settimeout(self.connect_timeout)
+            try:
+                sock.connect(self.socket_path)
+                self._local.sock = sock
+                self._request({"op": "open", "config": self._config})
+            except BaseException:
+                # Don't leave a half open socket to the next request.
+                self._local.sock = None
+                sock.close()
+                raise
+            sock.settimeout(None)
+        return sock
+
+
+class _RemoteObject:
+    """Proxy of an object or method of the brokered SDK connection at
+    attribute `path`.
+    """
+
+    def __init__(self, conn, parent, path):
+        self._conn = conn
+        self._path = path
+        # Let remote methods be identified like bound SDK methods.
+        self.__self__ = parent
+        self.__name__ = ".".join(path)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._conn._get(self, self._path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        return self._conn._call(self._path, args, kwargs)
+
+    def __repr__(self):
+        return f"<brokered {self.__name__}>"
+
+
+def ping(socket_path, timeout=5):
+    """Returns: True if a broker is serving requests at `socket_path`,
+    False otherwise
+    """
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            _send(sock, {"op": "ping"})
+            return _recv(sock) == ("value", "pong")
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return False
+
+
+def spawn(socket_path, idle_timeout=DEFAULT_IDLE_TIMEOUT, timeout=30):
+    """Start a broker serving at `socket_path` in a daemon process,
+    detached from the calling process, and wait until it serves
+    requests.
+
+    Returns: True if the broker was started, False if one was already
+    running
+    """
+    if ping(socket_path):
+        return False
+    pid = os.fork()
+    if pid == 0:
+        # Double fork so that the broker is not a child of the caller.
+        try:
+            os.setsid()
+            if os.fork() == 0:
+                _run_daemon(socket_path, idle_timeout)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    deadline = time.time() + timeout
+    while not ping(socket_path):
+        if time.time() > deadline:
+            raise BrokerError(
+                f"Connection broker didn't start serving at '{socket_path}'."
+            )
+        time.sleep(0.1)
+    return True
+
+
+def shutdown(socket_path):
+    """Ask the broker at `socket_path` to stop.
+
+    Returns: True if a broker was running, False otherwise
+    """
+    if not ping(socket_path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        _send(sock, {"op": "shutdown"})
+        _recv(sock)
+    return True
+
+
+def _handler_class(broker):
+    class _Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            session = {}
+            while True:
+                try:
+                    request = _recv(self.request)
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = broker.handle(request, session)
+                    payload = _dumps(response)
+                except Exception as e:
+                    payload = _dumps_error(e)
+                try:
+                    _send_payload(self.request, payload)
+                except OSError:
+                    return
+
+    return _Handler
+
+
+def _run_daemon(socket_path, idle_timeout):
+    # Working directory is kept, the SDK looks for clouds.yaml there.
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    BrokerServer(socket_path, idle_timeout=idle_timeout).serve_forever()
+
+
+def _resolve(conn, path):
+    obj = conn
+    for name in path:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        obj = getattr(obj, name)
+    return obj
+
+
+def _is_value(obj):
+    if isinstance(
+        obj, (type(None), bool, int, float, str, bytes, list, tuple, dict, set)
+    ):
+        return True
+    resource_class = _sdk_resource_class()
+    return resource_class is not None and isinstance(obj, resource_class)
+
+
+def _sdk_resource_class():
+    # Objects can only be SDK resources once the SDK got imported, don't
+    # import it just to find out.
+    resource = sys.modules.get("openstack.resource")
+    if resource is None:
+        return None
+    return resource.Resource
+
+
+def _rebuild_resource(cls, attrs):
+    return cls.existing(**attrs)
+
+
+class _Pickler(pickle.Pickler):
+    # SDK resources don't support pickling, send their attributes and
+    # re-create them on the other side.
+
+    def reducer_override(self, obj):
+        resource_class = _sdk_resource_class()
+        if resource_class is not None and isinstance(obj, resource_class):
+            return (_rebuild_resource, (type(obj), obj.to_dict(computed=False)))
+        return NotImplemented
+
+
+def _dumps(obj):
+    buf = io.BytesIO()
+    _Pickler(buf, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buf.getvalue()
+
+
+def _dumps_error(exc):
+    try:
+        return _dumps(("error", exc))
+    except Exception:
+        return _dumps(("error", BrokerError(f"{type(exc).__name__}: {exc}")))
+
+
+def _send(sock, obj):
+    _send_payload(sock, _dumps(obj))
+
+
+def _send_payload(sock, payload):
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv(sock):
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return pickle.loads(_recv_exact(sock, length))
+
+
+def _recv_exact(sock, length):
+    chunks = []
+    while length:
+        chunk = sock.recv(min(length, 1 << 20))
+        if not chunk:
+            raise EOFError("Broker connection closed.")
+        chunks.append(chunk)
+        length -= len(chunk)
+    return b"".join(chunks)
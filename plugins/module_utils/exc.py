@@ -52,6 +52,13 @@ class InconsistentState(Exception):
         super().__init__(message)
 
 
+class InvalidQuery(Exception):
+    """Invalid query or queried data when filtering."""
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
 class UnexpectedResourceType(Exception):
     """Unexpected resource type."""
 
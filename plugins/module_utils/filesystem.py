@@ -2,47 +2,318 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+from contextlib import contextmanager
+import fcntl
+import json
+import os
 from os import path
+import pickle
+import tempfile
 
 try:
     import yaml
+
     HAS_YAML = True
 except ImportError:
     HAS_YAML = False
 
+if HAS_YAML:
+    # Prefer the LibYAML based loader, it is an order of magnitude
+    # faster on large resource files. Writing always uses the pure
+    # Python dumper, the LibYAML emitter folds long multi-line strings
+    # differently, and file contents must not depend on whether the
+    # bindings happen to be installed.
+    from yaml import SafeDumper as YAMLDumper
+
+    try:
+        from yaml import CSafeLoader as YAMLLoader
+    except ImportError:
+        from yaml import SafeLoader as YAMLLoader
+
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import exc
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    osm_resource,
+)
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    resource_map,
+)
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import serialization
 
 
-def write_or_replace_resource(file_path, resource):
+def write_or_replace_resource(file_path, resource, journal=False, shard_size=None):
     """Add (or replace if already present) a `resource` into a resource
     file at `file_path`. If the resource is already present *and* its
     serialization is up to date, the file will not be modified.
 
+    See write_or_replace_resources for `journal` and `shard_size`.
+
     Returns: True if the file was modified, False otherwise
     """
-    if path.exists(file_path):
-        file_struct = load_resources_file(file_path)
-    else:
-        file_struct = serialization.new_resources_file_struct()
+    return write_or_replace_resources(
+        file_path, [resource], journal=journal, shard_size=shard_size
+    )
 
-    resources = file_struct["resources"]
 
-    if serialization.add_or_replace_resource(resources, resource):
-        _write_resources_file(file_path, file_struct)
-        return True
-    else:
-        return False
+def write_or_replace_resources(file_path, resources, journal=False, shard_size=None):
+    """Add (or replace if already present) all `resources` into a
+    resource file at `file_path`. The file is loaded once and written
+    at most once, regardless of how many resources are being
+    merged. Resources already present with up to date serialization
+    do not cause the file to be modified.
+
+    If `journal` is True and the resource file already exists, only
+    the changed resources are appended to the journal file next to it
+    (see journal_file_path) rather than rewriting the whole resource
+    file. The journal is replayed by load_resources_file and folded
+    back into the resource file by compact_resources_file.
+
+    If `shard_size` is given and the resource file doesn't exist yet,
+    it is created with sharded layout: a directory (see
+    shards_dir_path) of resource files (shards) holding at most
+    `shard_size` resources each, and a manifest mapping resources to
+    shards. Only the shards which change get written. Resource files
+    which already exist keep their layout.
+
+    The whole read-modify-write is done under an exclusive lock (see
+    lock_file_path), so concurrent writers targeting the same file
+    don't lose each other's updates.
+
+    Returns: True if the file was modified, False otherwise
+    """
+    with _file_lock(file_path, exclusive=True):
+        if is_sharded(file_path) or (
+            shard_size is not None and not path.exists(file_path)
+        ):
+            return _write_or_replace_sharded(file_path, resources, journal, shard_size)
+        _, changed = _merge_into_resources_file(file_path, resources, journal)
+        return bool(changed)
+
+
+def cache_file_path(file_path):
+    """Returns: path of the parse cache file belonging to resource file
+    at `file_path`.
+    """
+    return file_path + ".cache"
+
+
+def compact_resources_file(file_path):
+    """Fold the journal of resource file at `file_path` into the
+    resource file itself and remove the journal. For sharded resource
+    files, journals of all the shards are compacted.
+
+    Returns: True if the file was modified, False otherwise
+    """
+    with _file_lock(file_path, exclusive=True):
+        if is_sharded(file_path):
+            shard_paths = [
+                _shard_path(file_path, shard)
+                for shard in _load_manifest(file_path)["shards"]
+            ]
+        else:
+            shard_paths = [file_path]
+
+        changed = False
+        for shard_path in shard_paths:
+            if path.exists(journal_file_path(shard_path)):
+                _write_resources_file(shard_path, _load_resources_file(shard_path))
+                changed = True
+        return changed
+
+
+def fingerprints_file_path(file_path):
+    """Returns: path of the file with content fingerprints of resources
+    in resource file at `file_path`.
+    """
+    return file_path + ".fingerprints"
+
+
+def is_sharded(file_path):
+    """Returns: True if resource file at `file_path` uses sharded
+    layout, False otherwise
+    """
+    return path.exists(_manifest_path(file_path))
+
+
+def journal_file_path(file_path):
+    """Returns: path of the journal file belonging to resource file at
+    `file_path`.
+    """
+    return file_path + ".journal"
+
+
+def load_export_mark(file_path, res_type):
+    """Returns: high-water mark of incremental exports of `res_type`
+    resources into resource file at `file_path` (see
+    write_export_mark), or None if there is no mark or the resource
+    file doesn't exist (in either layout).
+    """
+    if not (path.exists(file_path) or is_sharded(file_path)):
+        return None
+    try:
+        with open(marks_file_path(file_path), "r", encoding="utf8") as f:
+            recorded = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if recorded.get("os_migrate_version") != const.OS_MIGRATE_VERSION:
+        return None
+    return recorded["marks"].get(res_type)
+
 
+def load_resources_file(file_path, cache=False, import_ids=None):
+    """Load resources file at `file_path`, including any changes
+    recorded in its journal. For sharded resource files, the shards
+    are merged into a single resources file structure.
 
-def load_resources_file(file_path):
-    """Load resources file at `file_path`.
+    If `cache` is True, the parsed resource file is stored in a cache
+    file next to it (see cache_file_path), and reused by subsequent
+    loads with `cache` enabled as long as the resource file hasn't
+    changed. The cache is pickled, so it must only be enabled when the
+    directory with resource files is trusted.
+
+    If `import_ids` is given, only resources with these import
+    identities are loaded. For sharded resource files, only the
+    shards holding them are read.
+
+    Returns: Structure (dict) of the loaded file.
+    """
+    with _file_lock(file_path, exclusive=False):
+        if is_sharded(file_path):
+            return _load_sharded_resources_file(file_path, cache, import_ids)
+
+        file_struct = _load_resources_file(file_path, cache=cache)
+        if import_ids is not None:
+            file_struct["resources"] = [
+                res for res in file_struct["resources"] if _import_id(res) in import_ids
+            ]
+        return file_struct
+
+
+def lock_file_path(file_path):
+    """Returns: path of the file used for advisory locking of resource
+    file at `file_path`.
+    """
+    return file_path + ".lock"
+
+
+def marks_file_path(file_path):
+    """Returns: path of the file with high-water marks of incremental
+    exports into resource file at `file_path`.
+    """
+    return file_path + ".marks"
+
+
+def shards_dir_path(file_path):
+    """Returns: path of the directory holding shards of resource file
+    at `file_path` with sharded layout.
+    """
+    return file_path + ".d"
+
+
+def write_export_mark(file_path, res_type, mark):
+    """Record `mark` as the high-water mark of incremental exports of
+    `res_type` resources into resource file at `file_path`. The marks
+    of all resource types exported into the file are kept in a marks
+    file next to it (see marks_file_path).
+    """
+    with _file_lock(file_path, exclusive=True):
+        marks_path = marks_file_path(file_path)
+        try:
+            with open(marks_path, "r", encoding="utf8") as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            recorded = {}
+
+        if recorded.get("os_migrate_version") != const.OS_MIGRATE_VERSION:
+            recorded = {"os_migrate_version": const.OS_MIGRATE_VERSION, "marks": {}}
+        recorded["marks"][res_type] = mark
+        _write_file_atomic(marks_path, json.dumps(recorded))
+
+
+def _append_journal(file_path, resources):
+    """Append entries for `resources` (Resource instances) into the
+    journal of resource file at `file_path`.
+
+    Each journal line is a JSON object holding the resource and its
+    same_resource_key (as repr, like in the fingerprints file). The
+    resource is looked up by the key when replaying, so the journal
+    stays valid when the resource file gets edited by hand.
+    """
+    lines = []
+    for resource in resources:
+        key = resource.same_resource_key()
+        entry = {
+            "key": None if key is None else repr(key),
+            "resource": resource.data,
+        }
+        lines.append(json.dumps(entry) + "\n")
+
+    j_path = journal_file_path(file_path)
+    _truncate_torn_journal_entry(j_path)
+    with open(j_path, "a", encoding="utf8") as f:
+        f.write("".join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _file_state(file_path):
+    """Returns: list identifying the current state of resource file at
+    `file_path` and its journal, changing whenever either of them is
+    written to.
+    """
+    state = []
+    for state_path in (file_path, journal_file_path(file_path)):
+        try:
+            stat = os.stat(state_path)
+        except FileNotFoundError:
+            state.append(None)
+        else:
+            state.append([stat.st_ino, stat.st_size, stat.st_mtime_ns])
+    return state
+
+
+def _import_id(resource):
+    """Returns: import identity of serialized `resource`."""
+    res_cls = resource_map.RESOURCE_MAP.get(resource.get(const.RES_TYPE))
+    if res_cls is not None:
+        return res_cls.from_data(resource).import_id()
+
+    # Types without a resource class have the default import identity.
+    res_type = resource.get(const.RES_TYPE)
+    res_name = resource.get(const.RES_PARAMS, {}).get("name")
+    if res_type and res_name:
+        return f"{res_type}:{res_name}"
+    return None
+
+
+def _load_manifest(file_path):
+    """Returns: manifest of sharded resource file at `file_path`, or
+    None if the resource file isn't sharded.
+    """
+    manifest_path = _manifest_path(file_path)
+    if not path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, "r", encoding="utf8") as f:
+        manifest = json.load(f)
+    manifest_os_migrate_version = manifest.get("os_migrate_version", None)
+    if manifest_os_migrate_version != const.OS_MIGRATE_VERSION:
+        raise exc.DataVersionMismatch(manifest_path, manifest_os_migrate_version)
+    return manifest
+
+
+def _load_resources_file(file_path, cache=False):
+    """Load resources file at `file_path`, including any changes
+    recorded in its journal. The caller is responsible for locking.
 
     Returns: Structure (dict) of the loaded file.
     """
     with open(file_path, "r", encoding="utf8") as f:
-        file_struct = yaml.safe_load(f)
+        if cache:
+            file_struct = _parse_resources_file_cached(file_path, f)
+        else:
+            file_struct = yaml.load(f, Loader=YAMLLoader)
 
     if file_struct is None:
         raise exc.EmptyYAMLFileError(file_path)
@@ -52,12 +323,437 @@ def load_resources_file(file_path):
     if file_os_migrate_version != const.OS_MIGRATE_VERSION:
         raise exc.DataVersionMismatch(file_path, file_os_migrate_version)
 
+    _replay_journal(file_path, file_struct["resources"])
+    return file_struct
+
+
+@contextmanager
+def _file_lock(file_path, exclusive):
+    """Hold an advisory lock of resource file at `file_path` for the
+    duration of the context. The lock is taken on a separate lock file
+    (see lock_file_path), as the resource file itself gets replaced on
+    writes.
+    """
+    lock_path = lock_file_path(file_path)
+    if not exclusive and not path.exists(lock_path):
+        # Nothing has ever written the file via this module, there
+        # is no writer to synchronize with.
+        yield
+        return
+
+    with open(lock_path, "a", encoding="utf8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _load_sharded_resources_file(file_path, cache, import_ids):
+    """Load shards of sharded resource file at `file_path`, merged into
+    a single resources file structure. If `import_ids` is given, only
+    shards holding resources with these import identities are read.
+    The caller is responsible for locking.
+
+    Returns: Structure (dict) of the loaded file.
+    """
+    file_struct = serialization.new_resources_file_struct()
+    for shard in _load_manifest(file_path)["shards"]:
+        if import_ids is None:
+            positions = None
+        else:
+            positions = [
+                i
+                for i, import_id in enumerate(shard["import_ids"])
+                if import_id in import_ids
+            ]
+            if not positions:
+                continue
+
+        shard_struct = _load_resources_file(_shard_path(file_path, shard), cache=cache)
+        if positions is None:
+            file_struct["resources"].extend(shard_struct["resources"])
+        else:
+            file_struct["resources"].extend(
+                shard_struct["resources"][i] for i in positions
+            )
+    return file_struct
+
+
+def _load_fingerprints(file_path):
+    """Returns: dict of content fingerprints of resources in resource
+    file at `file_path`, keyed by repr of same_resource_key, or None
+    if the fingerprints are missing or don't match the current state
+    of the file.
+    """
+    try:
+        with open(fingerprints_file_path(file_path), "r", encoding="utf8") as f:
+            recorded = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if recorded.get("os_migrate_version") != const.OS_MIGRATE_VERSION:
+        return None
+    if recorded.get("state") != _file_state(file_path):
+        return None
+    return recorded["fingerprints"]
+
+
+def _manifest_path(file_path):
+    """Returns: path of the manifest of sharded resource file at
+    `file_path`.
+    """
+    return path.join(shards_dir_path(file_path), "manifest.json")
+
+
+def _merge_into_resources_file(file_path, resources, journal):
+    """Merge `resources` into resource file at `file_path` and write
+    it if anything changed. See write_or_replace_resources. The
+    caller is responsible for locking.
+
+    Fingerprints of the merged resources are recorded next to the
+    file (see fingerprints_file_path). When all the fingerprints match
+    the recorded ones, the file is not even loaded.
+
+    Returns: tuple of the merged resources file structure (None if it
+    wasn't loaded) and the list of positions of changed resources in
+    it
+    """
+    fingerprints = _load_fingerprints(file_path)
+    new_fingerprints = [
+        (res.same_resource_key(), serialization.content_fingerprint(res.data))
+        for res in resources
+    ]
+    if fingerprints is not None and all(
+        key is not None and fingerprints.get(repr(key)) == fingerprint
+        for key, fingerprint in new_fingerprints
+    ):
+        # All the resources are stored already, no need to parse the
+        # file.
+        return None, []
+
+    if path.exists(file_path):
+        file_struct = _load_resources_file(file_path)
+    else:
+        file_struct = serialization.new_resources_file_struct()
+        journal = False
+
+    changed = serialization.merge_resources(file_struct["resources"], resources)
+    if changed:
+        if journal:
+            changed_data = set(id(file_struct["resources"][pos]) for pos in changed)
+            _append_journal(
+                file_path, [res for res in resources if id(res.data) in changed_data]
+            )
+        else:
+            _write_resources_file(file_path, file_struct)
+
+    if path.exists(file_path):
+        fingerprints = fingerprints or {}
+        for key, fingerprint in new_fingerprints:
+            if key is not None:
+                fingerprints[repr(key)] = fingerprint
+        _write_fingerprints(file_path, fingerprints)
+    return file_struct, changed
+
+
+def _parse_resources_file_cached(file_path, f):
+    """Parse YAML from open resource file `f` at `file_path`, reusing
+    the parse cache if it is up to date, or refreshing it otherwise.
+
+    The cache is keyed by the path, inode, size and modification time
+    of the opened file, and the OS Migrate version. Atomic writes
+    replace the inode, so rewrites are detected even on file systems
+    with coarse modification times.
+
+    Returns: Structure (dict) parsed from the file.
+    """
+    stat = os.fstat(f.fileno())
+    key = [
+        path.abspath(file_path),
+        stat.st_ino,
+        stat.st_size,
+        stat.st_mtime_ns,
+        const.OS_MIGRATE_VERSION,
+    ]
+    c_path = cache_file_path(file_path)
+    try:
+        with open(c_path, "rb") as c_file:
+            cached = pickle.load(c_file)
+        if cached["key"] == key:
+            return cached["struct"]
+    except Exception:
+        # Missing, outdated or corrupted cache, reparse.
+        pass
+
+    file_struct = yaml.load(f, Loader=YAMLLoader)
+    try:
+        _write_file_atomic(
+            c_path,
+            pickle.dumps({"key": key, "struct": file_struct}),
+            mode=0o600,
+        )
+    except OSError:
+        # The cache is an optimization only, e.g. the data dir
+        # might be read-only.
+        pass
     return file_struct
 
 
+def _replay_journal(file_path, resources):
+    """Apply journal of resource file at `file_path` onto `resources`
+    list loaded from the resource file. Edits `resources` in place.
+
+    Journaled resources replace the resources with the same key (see
+    _append_journal), or get appended if there are none. Keys of the
+    loaded resources are computed by their resource classes, types
+    without a class get the default key of type and ID.
+    """
+    j_path = journal_file_path(file_path)
+    if not path.exists(j_path):
+        return
+
+    # resource type -> {repr(key): position in `resources`}
+    indexes = {}
+    with open(j_path, "r", encoding="utf8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # Torn write of an interrupted run, the entry was
+                # never fully recorded.
+                break
+            entry = json.loads(line)
+            data = entry["resource"]
+            res_type = data.get(const.RES_TYPE)
+            res_cls = resource_map.RESOURCE_MAP.get(res_type)
+            key = entry["key"]
+            if key is None:
+                # The class compares resources via is_same_resource
+                # only.
+                idx = None
+                if res_cls is not None:
+                    idx = serialization.find_resource(
+                        resources, res_cls.from_data(data)
+                    )
+            else:
+                index = indexes.get(res_type)
+                if index is None:
+                    index = _journal_index(resources, res_cls)
+                    indexes[res_type] = index
+                idx = index.get(key)
+
+            if idx is None:
+                resources.append(data)
+                idx = len(resources) - 1
+            else:
+                resources[idx] = data
+            if key is None:
+                # Keys of the resource aren't known, rebuild the
+                # indexes when needed.
+                indexes = {}
+            else:
+                indexes[res_type].setdefault(key, idx)
+
+
+def _journal_index(resources, res_cls):
+    """Returns: dict mapping repr of same_resource_key values, as
+    computed by `res_cls` (the default Resource key if None), to
+    positions in serialized `resources`.
+    """
+    if res_cls is None:
+        res_cls = osm_resource.Resource
+    return {
+        repr(key): idx
+        for key, idx in serialization.build_resource_index(resources, res_cls).items()
+    }
+
+
+def _truncate_torn_journal_entry(j_path):
+    """Cut off an unterminated last line of journal at `j_path`, left
+    behind by a torn write of an interrupted run. Entries appended
+    afterwards then start on a line of their own. The caller is
+    responsible for locking.
+    """
+    try:
+        f = open(j_path, "r+b")
+    except FileNotFoundError:
+        return
+
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+
+        # Search backwards for the end of the last complete entry.
+        end = 0
+        chunk_end = size
+        while chunk_end > 0:
+            chunk_start = max(chunk_end - 65536, 0)
+            f.seek(chunk_start)
+            newline = f.read(chunk_end - chunk_start).rfind(b"\n")
+            if newline != -1:
+                end = chunk_start + newline + 1
+                break
+            chunk_end = chunk_start
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+
+
 def _write_resources_file(file_path, file_struct):
     """Write `file_struct` resources file structure into a file at
+    `file_path`. The journal of the file is removed, as `file_struct`
+    is expected to contain its changes already. The caller is
+    responsible for locking.
+    """
+    _write_file_atomic(file_path, yaml.dump(file_struct, Dumper=YAMLDumper))
+
+    j_path = journal_file_path(file_path)
+    if path.exists(j_path):
+        os.remove(j_path)
+
+
+def _shard_for_resource(file_path, manifest, resource, new_counts):
+    """Find the shard of sharded resource file at `file_path` where
+    `resource` belongs. Resources which are not present yet are
+    assigned to the last shard, or to a new one if the last shard is
+    full. `new_counts` tracks the number of resources assigned to each
+    shard in the current write, and `manifest` is updated with the
+    assignment.
+
+    Returns: shard (dict) from `manifest`
+    """
+    shards = {shard["name"]: shard for shard in manifest["shards"]}
+    key = resource.same_resource_key()
+    if key is not None:
+        name = manifest["keys"].get(repr(key))
+        if name is not None:
+            return shards[name]
+    else:
+        # Sameness cannot be looked up by key, search the shards.
+        for shard in manifest["shards"]:
+            shard_path = _shard_path(file_path, shard)
+            if not path.exists(shard_path):
+                continue
+            for res in _load_resources_file(shard_path)["resources"]:
+                if resource.is_same_resource(res):
+                    return shard
+
+    shard = manifest["shards"][-1] if manifest["shards"] else None
+    if shard is None or (
+        len(shard["import_ids"]) + new_counts.get(shard["name"], 0)
+        >= manifest["shard_size"]
+    ):
+        shard = {
+            "name": "shard-{0:05d}.yml".format(len(manifest["shards"])),
+            "import_ids": [],
+        }
+        manifest["shards"].append(shard)
+
+    new_counts[shard["name"]] = new_counts.get(shard["name"], 0) + 1
+    if key is not None:
+        manifest["keys"][repr(key)] = shard["name"]
+    return shard
+
+
+def _shard_path(file_path, shard):
+    """Returns: path of `shard` of sharded resource file at
     `file_path`.
     """
-    with open(file_path, "w", encoding="utf8") as f:
-        f.write(yaml.safe_dump(file_struct))
+    return path.join(shards_dir_path(file_path), shard["name"])
+
+
+def _write_file_atomic(file_path, content, mode=None):
+    """Write `content` (string or bytes) into a file at `file_path`
+    atomically, via a temporary file in the same directory renamed
+    over `file_path`. Readers never see a partially written file.
+
+    The file gets permissions `mode`, or if None, keeps permissions of
+    the existing file, or gets the default ones for a new file.
+    """
+    dir_path, file_name = path.split(path.abspath(file_path))
+    if mode is None and path.exists(file_path):
+        mode = os.stat(file_path).st_mode & 0o777
+    elif mode is None:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=dir_path, prefix=f".{file_name}.", suffix=".tmp"
+    )
+    try:
+        if isinstance(content, bytes):
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding="utf8")
+        with f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_fingerprints(file_path, fingerprints):
+    """Record `fingerprints` (see _load_fingerprints) of resources in
+    resource file at `file_path`, tied to the current state of the
+    file.
+    """
+    recorded = {
+        "os_migrate_version": const.OS_MIGRATE_VERSION,
+        "state": _file_state(file_path),
+        "fingerprints": fingerprints,
+    }
+    _write_file_atomic(fingerprints_file_path(file_path), json.dumps(recorded))
+
+
+def _write_or_replace_sharded(file_path, resources, journal, shard_size):
+    """Add or replace `resources` in sharded resource file at
+    `file_path`, creating it with `shard_size` if it doesn't exist
+    yet. See write_or_replace_resources. The caller is responsible for
+    locking.
+
+    Returns: True if the file was modified, False otherwise
+    """
+    manifest = _load_manifest(file_path)
+    if manifest is None:
+        manifest = {
+            "os_migrate_version": const.OS_MIGRATE_VERSION,
+            "shard_size": shard_size,
+            "shards": [],
+            # repr of same_resource_key -> shard name
+            "keys": {},
+        }
+
+    shard_resources = {}
+    new_counts = {}
+    for resource in resources:
+        shard = _shard_for_resource(file_path, manifest, resource, new_counts)
+        shard_resources.setdefault(shard["name"], (shard, []))[1].append(resource)
+
+    changed = False
+    os.makedirs(shards_dir_path(file_path), exist_ok=True)
+    for shard, res_list in shard_resources.values():
+        file_struct, positions = _merge_into_resources_file(
+            _shard_path(file_path, shard), res_list, journal
+        )
+        by_data = {id(res.data): res for res in res_list}
+        for position in positions:
+            import_id = by_data[id(file_struct["resources"][position])].import_id()
+            if position < len(shard["import_ids"]):
+                shard["import_ids"][position] = import_id
+            else:
+                shard["import_ids"].append(import_id)
+        changed = changed or bool(positions)
+
+    if changed:
+        _write_file_atomic(
+            _manifest_path(file_path), json.dumps(manifest, indent=2) + "\n"
+        )
+    return changed
@@ -2,23 +2,18 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_FLAVOR = openstack.compute.v2.flavor.Flavor
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_FLAVOR = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class Flavor(osm_resource.Resource):
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_FLAVOR
-    sdk_class = OPENSTACK_SDK_FLAVOR
+    sdk_class = openstack_sdk.LazyResourceClass("compute.v2.flavor.Flavor")
 
     info_from_sdk = [
         "id",
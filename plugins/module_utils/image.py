@@ -5,27 +5,21 @@ __metaclass__ = type
 import hashlib
 import os
 
-try:
-    import openstack
-
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_IMAGE = openstack.image.v2.image.Image
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_IMAGE = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
     exc,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class Image(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_IMAGE
-    sdk_class = OPENSTACK_SDK_IMAGE
+    sdk_class = openstack_sdk.LazyResourceClass("image.v2.image.Image")
 
     info_from_sdk = [
         "checksum",
@@ -134,17 +128,12 @@ class Image(osm_resource.Resource):
             )
         refs = self._refs_from_ser(conn)
         sdk_params = self._to_sdk_params(refs)
-        sdk_params["filename"] = blob_path
         existing = self._find_sdk_res(conn, sdk_params["name"], filters)
-        if existing:
-            if self._needs_update(self.from_sdk(conn, existing)):
-                self._remove_readonly_params(sdk_params)
-                self._update_sdk_res(conn, existing, sdk_params)
-                return True
-        else:
-            self._create_sdk_res(conn, sdk_params)
-            return True
-        return False  # no change done
+        if not existing:
+            # Image data is only uploaded on creation, updates change
+            # the metadata.
+            sdk_params["filename"] = blob_path
+        return self._create_or_update_sdk_res(conn, sdk_params, existing)
 
     @classmethod
     def _create_sdk_res(cls, conn, sdk_params):
@@ -161,6 +150,11 @@ class Image(osm_resource.Resource):
 
         return conn.image.create_image(**sdk_params, meta=meta)
 
+    def _hook_after_update(self, conn, sdk_res, is_create):
+        catalog = reference.image_catalog(conn)
+        if catalog is not None:
+            catalog.add(sdk_res)
+
     @staticmethod
     def _find_sdk_res(conn, name_or_id, filters=None):
         # Glance filter require owner instead of project_id.
@@ -168,6 +162,11 @@ class Image(osm_resource.Resource):
         if "project_id" in glance_filters:
             glance_filters["owner"] = glance_filters.pop("project_id")
 
+        catalog = reference.image_catalog(conn)
+        if catalog is not None and set(glance_filters) <= {"owner"}:
+            matches = catalog.find(name_or_id, glance_filters.get("owner"))
+            return matches[0] if matches else None
+
         # Unlike other find methods, find_image doesn't support
         # filters, our best option is probably to do a filtered list
         # and then match on name or id.
@@ -195,6 +194,15 @@ class Image(osm_resource.Resource):
         refs["ramdisk_id"] = reference.image_id(conn, params["ramdisk_ref"])
         return refs
 
+    def _remove_unchanged_params(self, sdk_params, changed_params):
+        super()._remove_unchanged_params(sdk_params, changed_params)
+        if "properties" not in sdk_params:
+            # Properties are also passed as kwargs (see _to_sdk_params),
+            # drop those along with the unchanged properties dict.
+            for key in self.params().get("properties") or {}:
+                if key not in self.params_from_sdk:
+                    sdk_params.pop(key, None)
+
     @staticmethod
     def _update_sdk_res(conn, sdk_res, sdk_params):
         return conn.image.update_image(sdk_res, **sdk_params)
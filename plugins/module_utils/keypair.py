@@ -2,28 +2,21 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_KEYPAIR = openstack.compute.v2.keypair.Keypair
-    OPENSTACK_BAD_REQUEST = openstack.exceptions.BadRequestException
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_KEYPAIR = None
-    OPENSTACK_BAD_REQUEST = Exception
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class Keypair(osm_resource.Resource):
+    __slots__ = ()
+
     # according to https://github.com/openstack/openstacksdk/blob/a4a2a7b42ec2ae7e186b44aeb7242fddd84944f7/openstack/cloud/_compute.py#L601
     # keypairs are created with name and public key.  user is not used.
     resource_type = const.RES_TYPE_KEYPAIR
-    sdk_class = OPENSTACK_SDK_KEYPAIR
+    sdk_class = openstack_sdk.LazyResourceClass("compute.v2.keypair.Keypair")
 
     info_from_sdk = [
         "created_at",
@@ -105,7 +98,7 @@ class Keypair(osm_resource.Resource):
     def _create_sdk_res(conn, sdk_params):
         try:
             return conn.compute.create_keypair(**sdk_params)
-        except OPENSTACK_BAD_REQUEST:
+        except openstack_sdk.exceptions().BadRequestException:
             sdk_params_no_type = {k: v for k, v in sdk_params.items() if k != "type"}
             return conn.compute.create_keypair(**sdk_params_no_type)
 
@@ -118,14 +111,16 @@ class Keypair(osm_resource.Resource):
         # openstack.compute.v2.keypair.Keypair does not support update
         return sdk_res
 
-    def _is_same_resource(self, target_data):
+    @classmethod
+    def _same_resource_key(cls, data):
         # For keys, IDs are typically the same as names, so we cannot
         # rely on IDs being unique. We have to track identity by
         # looking at ID + user_ref tuple.
-        ids_match = self.data[const.RES_INFO].get(
-            "id", "__undefined1__"
-        ) == target_data[const.RES_INFO].get("id", "__undefined2__")
-        user_refs_match = self.data[const.RES_PARAMS].get(
-            "user_ref", "__undefined1__"
-        ) == target_data[const.RES_PARAMS].get("user_ref", "__undefined2__")
-        return ids_match and user_refs_match
+        info = data.get(const.RES_INFO) or {}
+        params = data.get(const.RES_PARAMS) or {}
+        if "id" not in info or "user_ref" not in params:
+            return None
+        return (
+            osm_resource.hashable(info["id"]),
+            osm_resource.hashable(params["user_ref"]),
+        )
@@ -2,26 +2,21 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_NETWORK = openstack.network.v2.network.Network
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_NETWORK = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     common,
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class Network(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_NETWORK
-    sdk_class = OPENSTACK_SDK_NETWORK
+    sdk_class = openstack_sdk.LazyResourceClass("network.v2.network.Network")
 
     info_from_sdk = [
         "availability_zones",
@@ -76,6 +71,10 @@ class Network(osm_resource.Resource):
     def _find_sdk_res(conn, name_or_id, filters=None):
         return conn.network.find_network(name_or_id, **(filters or {}))
 
+    @staticmethod
+    def _list_sdk_res(conn, filters=None):
+        return conn.network.networks(**(filters or {}))
+
     def _hook_after_update(self, conn, sdk_res, is_create):
         common.neutron_set_tags(conn, sdk_res, self.params()["tags"])
 
@@ -0,0 +1,63 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+# Importing openstacksdk takes a considerable part of module startup
+# time, so it is only imported once something actually needs it, and
+# modules which don't talk to the clouds never import it.
+
+
+class _DummyException(Exception):
+    pass
+
+
+class _DummyExceptions:
+    BadRequestException = _DummyException
+    ConflictException = _DummyException
+    DuplicateResource = _DummyException
+    HttpException = _DummyException
+    ResourceFailure = _DummyException
+    ResourceNotFound = _DummyException
+    SDKException = _DummyException
+
+
+class LazyResourceClass:
+    """Class attribute resolving to the OpenStack SDK resource class at
+    `path` (relative to the `openstack` package, e.g.
+    'network.v2.network.Network') on first access, or to None if the SDK
+    is not installed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._class = None
+
+    def __get__(self, instance, owner):
+        if self._class is None:
+            self._class = resource_class(self.path)
+        return self._class
+
+
+def exceptions():
+    """Returns: the `openstack.exceptions` module, or a stand-in with
+    exception classes which are never raised if the SDK is not installed
+    """
+    try:
+        from openstack import exceptions as sdk_exceptions
+    except ImportError:
+        return _DummyExceptions
+    return sdk_exceptions
+
+
+def resource_class(path):
+    """Returns: the OpenStack SDK resource class at `path` (relative to
+    the `openstack` package), or None if the SDK is not installed
+    """
+    try:
+        import openstack
+    except ImportError:
+        return None
+    obj = openstack
+    for name in path.split("."):
+        obj = getattr(obj, name)
+    return obj
@@ -2,6 +2,12 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import importlib
+import sqlite3
+import sys
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import auth_cache
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import connection_broker
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 
 
 def openstack_full_argument_spec(**kwargs):
@@ -23,6 +29,12 @@ def openstack_full_argument_spec(**kwargs):
             aliases=['endpoint_type']),
         sdk_log_path=dict(type='str'),
         sdk_log_level=dict(type='str', default='INFO', choices=['INFO', 'DEBUG']),
+        reference_cache_path=dict(type='str'),
+        reference_cache_size=dict(type='int'),
+        reference_cache_ttl=dict(type='int'),
+        identity_directory=dict(type='bool', default=False),
+        auth_cache_path=dict(type='str'),
+        broker_socket_path=dict(type='str'),
     )
     spec.update(kwargs)
     return spec
@@ -30,36 +42,90 @@ def openstack_full_argument_spec(**kwargs):
 
 def get_connection(module):
     """Establishes connection using official Ansible logic (Simplified)"""
-    try:
-        sdk = importlib.import_module('openstack')
-    except ImportError:
-        module.fail_json(msg='openstacksdk is required for this module')
-
     cloud_config = module.params.get('cloud')
-    try:
-        if isinstance(cloud_config, dict):
-            # If cloud is a dict, other auth params must be None
-            fail_message = (
-                "A cloud config dict was provided to the cloud parameter"
-                " but also a value was provided for {param}. If a cloud"
-                " config dict is provided, {param} should be excluded.")
-            for param in ('auth', 'region_name', 'validate_certs', 'ca_cert',
-                          'client_cert', 'client_key', 'api_timeout', 'auth_type'):
-                if module.params.get(param) is not None:
-                    module.fail_json(msg=fail_message.format(param=param))
-            return sdk.connect(**cloud_config)
-        else:
-            return sdk.connect(
-                cloud=cloud_config,
-                auth_type=module.params.get('auth_type'),
-                auth=module.params.get('auth'),
-                region_name=module.params.get('region_name'),
-                verify=module.params.get('validate_certs'),
-                cacert=module.params.get('ca_cert'),
-                key=module.params.get('client_key'),
-                cert=module.params.get('client_cert'),
-                api_timeout=module.params.get('api_timeout'),
-                interface=module.params.get('interface'),
-            )
-    except sdk.exceptions.SDKException as e:
-        module.fail_json(msg=f"OpenStack Connection Error: {str(e)}")
+    if isinstance(cloud_config, dict):
+        # If cloud is a dict, other auth params must be None
+        fail_message = (
+            "A cloud config dict was provided to the cloud parameter"
+            " but also a value was provided for {param}. If a cloud"
+            " config dict is provided, {param} should be excluded.")
+        for param in ('auth', 'region_name', 'validate_certs', 'ca_cert',
+                      'client_cert', 'client_key', 'api_timeout', 'auth_type'):
+            if module.params.get(param) is not None:
+                module.fail_json(msg=fail_message.format(param=param))
+        connect_kwargs = cloud_config
+    else:
+        connect_kwargs = dict(
+            cloud=cloud_config,
+            auth_type=module.params.get('auth_type'),
+            auth=module.params.get('auth'),
+            region_name=module.params.get('region_name'),
+            verify=module.params.get('validate_certs'),
+            cacert=module.params.get('ca_cert'),
+            key=module.params.get('client_key'),
+            cert=module.params.get('client_cert'),
+            api_timeout=module.params.get('api_timeout'),
+            interface=module.params.get('interface'),
+        )
+
+    conn = None
+    broker_socket_path = module.params.get('broker_socket_path')
+    # The broker is checked before importing the SDK, a brokered
+    # connection only imports it once SDK resources or exceptions are
+    # received from the broker.
+    if broker_socket_path and connection_broker.ping(broker_socket_path):
+        try:
+            # The broker holds an authenticated connection already,
+            # the auth cache isn't needed.
+            conn = connection_broker.BrokeredConnection(
+                broker_socket_path, connect_kwargs)
+        except _sdk_exceptions() as e:
+            module.fail_json(msg=f"OpenStack Connection Error: {str(e)}")
+        except (OSError, EOFError, connection_broker.BrokerError):
+            # Broker went away or doesn't respond, connect on our own.
+            pass
+    if conn is None:
+        try:
+            sdk = importlib.import_module('openstack')
+        except ImportError:
+            module.fail_json(msg='openstacksdk is required for this module')
+        try:
+            conn = sdk.connect(**connect_kwargs)
+        except sdk.exceptions.SDKException as e:
+            module.fail_json(msg=f"OpenStack Connection Error: {str(e)}")
+
+    if (module.params.get('auth_cache_path')
+            and not isinstance(conn, connection_broker.BrokeredConnection)):
+        try:
+            auth_cache.reuse_auth_state(conn, module.params['auth_cache_path'])
+        except OSError as e:
+            module.fail_json(msg=f"Cannot use auth cache: {str(e)}")
+        except _sdk_exceptions() as e:
+            module.fail_json(msg=f"OpenStack Connection Error: {str(e)}")
+    if (module.params.get('reference_cache_size') is not None
+            or module.params.get('reference_cache_ttl') is not None):
+        reference.reference_cache(
+            conn,
+            max_size=module.params.get('reference_cache_size'),
+            ttl=module.params.get('reference_cache_ttl'))
+    if module.params.get('reference_cache_path'):
+        try:
+            reference.use_reference_store(conn, module.params['reference_cache_path'])
+        except (OSError, sqlite3.Error) as e:
+            module.fail_json(msg=f"Cannot open reference cache: {str(e)}")
+    if module.params.get('identity_directory'):
+        try:
+            reference.use_identity_directory(conn)
+        except _sdk_exceptions() as e:
+            module.fail_json(msg=f"Cannot load identity directory: {str(e)}")
+    return conn
+
+
+def _sdk_exceptions():
+    """Returns: tuple of SDK exception classes to catch, empty if the SDK
+    wasn't imported (and so none of its exceptions can have been raised)
+    """
+    exceptions = sys.modules.get('openstack.exceptions')
+    if exceptions is None:
+        return ()
+    return (exceptions.SDKException,)
@@ -3,25 +3,114 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 from copy import deepcopy
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_EXC = openstack.exceptions
-except ImportError:
-    HAS_OPENSTACK = False
-
-    class DummyException(Exception):
-        pass
 
-    class OPENSTACK_EXC:
-        ResourceFailure = DummyException
-        ResourceNotFound = DummyException
-        DuplicateResource = DummyException
-from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const, exc
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    const,
+    exc,
+    openstack_sdk,
+    reference,
+    serialization,
+)
+
+
+def hashable(value):
+    """Returns: a hashable equivalent of `value`, which can be a
+    (possibly nested) serialized structure of dicts and lists. Equal
+    values produce equal results.
+    """
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, hashable(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return (list, tuple(hashable(v) for v in value))
+    return value
+
+
+def importable_data(value, skip_params=()):
+    """Returns: the importable part of `value`, a (possibly nested)
+    serialized resource structure. Anything under '_info' and
+    '_migration_params' keys is dropped, even in nested resources, as
+    are top level params listed in `skip_params`. Booleans and integral
+    floats are turned into ints, so that values which compare equal
+    (True == 1 == 1.0) also have equal fingerprints. The original
+    structure is untouched, only lists and dicts are fresh instances.
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key == const.RES_INFO or key == const.RES_MIGRATION_PARAMS:
+                continue
+            if key == const.RES_PARAMS and skip_params and isinstance(item, dict):
+                item = {k: v for k, v in item.items() if k not in skip_params}
+            result[key] = importable_data(item)
+        return result
+    if isinstance(value, list):
+        return [importable_data(item) for item in value]
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def importable_fingerprint(value, skip_params=()):
+    """Returns: content fingerprint (see
+    serialization.content_fingerprint) of the importable part of
+    `value`, as returned by importable_data. Values that compare equal
+    after such trimming produce equal fingerprints.
+    """
+    return serialization.content_fingerprint(importable_data(value, skip_params))
+
+
+def changed_paths(current, target, prefix=""):
+    """Compare `current` and `target` dicts of serialized data, ignoring
+    '_info' and '_migration_params' keys, even in nested structures.
+    Nested dicts are descended into, other values are compared as a
+    whole.
+
+    Returns: list of dot-joined key paths which differ
+    """
+    changed = []
+    for key in sorted(set(current) | set(target), key=repr):
+        if key == const.RES_INFO or key == const.RES_MIGRATION_PARAMS:
+            continue
+        path = f"{prefix}{key}"
+        if key not in current or key not in target:
+            changed.append(path)
+            continue
+        cur_value = current[key]
+        tgt_value = target[key]
+        if isinstance(cur_value, dict) and isinstance(tgt_value, dict):
+            changed.extend(changed_paths(cur_value, tgt_value, f"{path}."))
+        elif isinstance(cur_value, (dict, list)) or isinstance(tgt_value, (dict, list)):
+            if importable_fingerprint(cur_value) != importable_fingerprint(tgt_value):
+                changed.append(path)
+        elif cur_value != tgt_value:
+            changed.append(path)
+    return changed
+
+
+def _ref_param_name(sdk_param_name):
+    """Returns: name of the serialized '<x>_ref(s)' param from which
+    the '<x>_id(s)' SDK param is resolved, or None
+    """
+    if sdk_param_name.endswith("_id"):
+        return sdk_param_name[: -len("_id")] + "_ref"
+    if sdk_param_name.endswith("_ids"):
+        return sdk_param_name[: -len("_ids")] + "_refs"
+    return None
+
+
+_DATA_SECTIONS = (const.RES_PARAMS, const.RES_INFO, const.RES_MIGRATION_PARAMS)
 
 
 class Resource:
 
+    # Instances only hold the serialized data, avoiding a per-instance
+    # __dict__ keeps memory use low when many resources are loaded
+    # (e.g. validation of whole data dirs). Subclasses should define
+    # empty __slots__ too.
+    __slots__ = ("data",)
+
     # OS-Migrate resource type, checked in from_data constructor
     resource_type = "UNDEFINED"
     # OpenStack SDK class, checked in from_sdk constructor
@@ -65,6 +154,53 @@ class Resource:
 
     # ===== PUBLIC CLASS/STATIC METHODS (alphabetic sort) =====
 
+    # Not meant to be overriden in majority of subclasses.
+    @classmethod
+    def create_or_update_all(cls, conn, resources, filters=None):
+        """Create or update all `resources` (instances of `cls`) in the
+        target OpenStack cloud connection `conn`. Existing resources
+        are fetched with a single _list_sdk_res call filtered by
+        `filters` and matched by name (or id) in memory. Falls back to
+        per-resource create_or_update when the class doesn't support
+        listing or customizes create_or_update.
+
+        Returns: list of booleans, True for each resource where any
+        change was made
+        """
+        if not resources:
+            return []
+
+        cls._prefetch_refs(conn, resources)
+        inventory = None
+        if cls.create_or_update is Resource.create_or_update:
+            inventory = cls._list_sdk_res(conn, filters)
+        if inventory is None:
+            return [res.create_or_update(conn, filters) for res in resources]
+
+        by_name = {}
+        by_id = {}
+        ambiguous = set()
+        for sdk_res in inventory:
+            if sdk_res["name"] in by_name:
+                ambiguous.add(sdk_res["name"])
+            by_name[sdk_res["name"]] = sdk_res
+            by_id[sdk_res["id"]] = sdk_res
+
+        changed = []
+        for res in resources:
+            refs = res._refs_from_ser(conn)
+            sdk_params = res._to_sdk_params(refs)
+            name = sdk_params["name"]
+            if name in ambiguous:
+                # Let the regular lookup deal with duplicates (or with
+                # resources created earlier in this batch).
+                existing = cls._find_sdk_res(conn, name, filters)
+            else:
+                existing = by_name.get(name, by_id.get(name))
+            changed.append(res._create_or_update_sdk_res(conn, sdk_params, existing))
+            ambiguous.add(name)
+        return changed
+
     # This constructor should work OOTB in all cases, shouldn't be
     # overriden in child classes.
     @classmethod
@@ -76,7 +212,9 @@ class Resource:
         if res_type != cls.resource_type:
             raise exc.UnexpectedResourceType(cls.resource_type, res_type)
 
-        obj = cls()
+        # Skip __init__, its fresh data structure would be replaced
+        # right away.
+        obj = cls.__new__(cls)
         # Barring resource type errors, we allow Resource subclass
         # construction with invalid data so that we don't break on
         # loading a data file, but we explicitly fail with full list
@@ -86,10 +224,11 @@ class Resource:
         obj.data = data
         # Just in case the data didn't contain those keys (invalid
         # data), set to empty defaults so that all other methods can
-        # rely on these existing rather than calling dict.get().
-        obj.data.setdefault(const.RES_PARAMS, {})
-        obj.data.setdefault(const.RES_INFO, {})
-        obj.data.setdefault(const.RES_MIGRATION_PARAMS, {})
+        # rely on these existing rather than calling dict.get(). Valid
+        # data is left untouched.
+        for key in _DATA_SECTIONS:
+            if key not in data:
+                data[key] = {}
         return obj
 
     # Meant to be extended in child classes, but can be overriden
@@ -139,6 +278,27 @@ class Resource:
         """
         raise NotImplementedError(f"_find_sdk_res not implemented for {cls}.")
 
+    # Meant to be overriden in child classes where the destination
+    # inventory can be listed, used by `create_or_update_all`.
+    @classmethod
+    def _list_sdk_res(cls, conn, filters=None):
+        """List the existing OpenStack resources which match a Resource
+        subclass, filtered by `filters`.
+
+        Returns: iterable of OpenStack SDK objects, or None when listing
+        is not supported
+        """
+        return None
+
+    # Meant to be overriden in child classes which resolve many
+    # references in _refs_from_ser, used by `create_or_update_all`.
+    @classmethod
+    def _prefetch_refs(cls, conn, resources):
+        """Resolve references of all `resources` in bulk ahead of
+        their _refs_from_ser calls, e.g. via reference.prefetch_ids.
+        """
+        pass
+
     # Used when creating Resource from SDK object, should be overriden
     # in majority of child classes.
     @staticmethod
@@ -151,6 +311,25 @@ class Resource:
         """
         return {}
 
+    # May be overridden in subclasses as needed. This is the single
+    # source of truth for resource sameness, it is used both by
+    # _is_same_resource and by key-based lookups when merging
+    # resources into resource files.
+    @classmethod
+    def _same_resource_key(cls, data):
+        """Get a hashable key identifying the resource serialized in `data`
+        dict. Resources of the same type are the same resource if their
+        keys are equal. Type and id are used by default.
+
+        Returns: hashable key, or None if the resource cannot be
+        identified (in which case it is not the same as any other
+        resource)
+        """
+        info = data.get(const.RES_INFO) or {}
+        if "id" not in info:
+            return None
+        return hashable(info["id"])
+
     # Not meant to be overriden in majority of subclasses.
     @classmethod
     def _set_sdk_params_same_name(cls, ser_params, sdk_params, param_names):
@@ -230,17 +409,19 @@ class Resource:
         refs = self._refs_from_ser(conn)
         sdk_params = self._to_sdk_params(refs)
         existing = self._find_sdk_res(conn, sdk_params["name"], filters)
-        if existing:
-            if self._needs_update(self.from_sdk(conn, existing)):
-                self._remove_readonly_params(sdk_params)
-                sdk_res = self._update_sdk_res(conn, existing, sdk_params)
-                self._hook_after_update(conn, sdk_res, False)
-                return True
-        else:
-            sdk_res = self._create_sdk_res(conn, sdk_params)
-            self._hook_after_update(conn, sdk_res, True)
-            return True
-        return False  # no change done
+        return self._create_or_update_sdk_res(conn, sdk_params, existing)
+
+    # Not meant to be overriden in majority of subclasses.
+    def changed_params(self, target):
+        """Get params which differ between `self` and `target` resource.
+        Nested dicts are descended into, other values (including
+        lists) are compared as a whole. '_info' and '_migration_params'
+        keys are ignored, even in nested resources.
+
+        Returns: list of dot-joined param paths, e.g. ['description',
+        'external_gateway_info.network_ref']
+        """
+        return changed_paths(self.data[const.RES_PARAMS], target.data[const.RES_PARAMS])
 
     def data_errors(self):
         """Get errors in the data structure of a resource, e.g. missing
@@ -302,16 +483,27 @@ class Resource:
         are met
         """
         errors = []
+        sdk_exc = openstack_sdk.exceptions()
         try:
             self._refs_from_ser(conn)
         except (
-            OPENSTACK_EXC.ResourceFailure,
-            OPENSTACK_EXC.ResourceNotFound,
-            OPENSTACK_EXC.DuplicateResource,
+            sdk_exc.ResourceFailure,
+            sdk_exc.ResourceNotFound,
+            sdk_exc.DuplicateResource,
         ) as e:
             errors.append(f"Destination prerequisites not met: {e}")
         return errors
 
+    def importable_fingerprint(self):
+        """Get a fingerprint of the importable part of the resource, i.e.
+        data without any '_info' and '_migration_params'. It is computed
+        from the current data on each call, so that in-place edits of
+        the data are always taken into account.
+
+        Returns: hex digest string
+        """
+        return importable_fingerprint(self.data)
+
     def info(self):
         return self.data[const.RES_INFO]
 
@@ -354,6 +546,28 @@ class Resource:
     def params_and_info(self):
         return (self.params(), self.info())
 
+    # Not meant to be overriden in majority of subclasses.
+    def same_resource_key(self):
+        """Get a hashable key under which the resource can be looked up
+        among other serialized resources, consistent with
+        is_same_resource.
+
+        Returns: hashable key, or None if the resource cannot be
+        looked up by key and is_same_resource has to be used instead
+        """
+        cls = type(self)
+        if (
+            cls._is_same_resource is not Resource._is_same_resource
+            and cls._same_resource_key.__func__ is Resource._same_resource_key.__func__
+        ):
+            # Sameness is customized via _is_same_resource only, the
+            # default key would not respect it.
+            return None
+        key = cls._same_resource_key(self.data)
+        if key is None:
+            return None
+        return (self.data[const.RES_TYPE], key)
+
     def type(self):
         return self.data[const.RES_TYPE]
 
@@ -376,6 +590,39 @@ class Resource:
             const.RES_MIGRATION_PARAMS: {},
         }
 
+    # Not meant to be overriden in majority of subclasses.
+    def _create_or_update_sdk_res(self, conn, sdk_params, existing):
+        """Create the resource from `sdk_params` if `existing` SDK
+        resource is None, or update `existing` if it differs from
+        `self`.
+
+        Returns: True if any change was made, False otherwise
+        """
+        if existing:
+            target = self.from_sdk(conn, existing)
+            if self._needs_update(target):
+                self._remove_readonly_params(sdk_params)
+                self._remove_unchanged_params(sdk_params, self.changed_params(target))
+                if sdk_params:
+                    sdk_res = self._update_sdk_res(conn, existing, sdk_params)
+                else:
+                    # Only params which are not sent in the update
+                    # request differ, e.g. tags set in the hook.
+                    sdk_res = existing
+                # Cached references to the resource may be stale now,
+                # e.g. after a rename.
+                reference.invalidate_references(
+                    conn, [existing["id"], existing["name"], self._name()]
+                )
+                self._hook_after_update(conn, sdk_res, False)
+                return True
+        else:
+            sdk_res = self._create_sdk_res(conn, sdk_params)
+            reference.invalidate_references(conn, [self._name()])
+            self._hook_after_update(conn, sdk_res, True)
+            return True
+        return False  # no change done
+
     # Not meant to be overriden in majority of subclasses.
     def _data_from_sdk_and_refs(self, sdk_res, refs):
         """Fill `self` internal params and info structures with values from
@@ -423,11 +670,11 @@ class Resource:
         Returns: True if the `target` is the same resource as self.
         """
         # if something else than ['type'] && ['_info']['id'] should be the
-        # deciding factors for sameness, just override the following method in
-        # the specific subclass
-        return self.data[const.RES_INFO].get("id", "__undefined1__") == target_data[
-            const.RES_INFO
-        ].get("id", "__undefined2__")
+        # deciding factors for sameness, override _same_resource_key in
+        # the specific subclass rather than this method, so that
+        # key-based lookups stay consistent with it
+        key = self._same_resource_key(self.data)
+        return key is not None and key == self._same_resource_key(target_data)
 
     # Meant to be overriden in some subclasses.
     def _hook_after_update(self, conn, sdk_res, is_create):
@@ -438,6 +685,9 @@ class Resource:
         """
         pass
 
+    def _name(self):
+        return self.params().get("name")
+
     # Not meant to be overriden in majority of subclasses.
     def _needs_update(self, target):
         """Check if `target` resource needs to be updated to match the state
@@ -445,7 +695,7 @@ class Resource:
 
         Returns: True if `target` needs to be updated, False otherwise
         """
-        return self._data_without_info() != target._data_without_info()
+        return self.importable_fingerprint() != target.importable_fingerprint()
 
     # Not meant to be overriden in majority of subclasses.
     def _remove_readonly_params(self, sdk_params):
@@ -458,6 +708,32 @@ class Resource:
             if name in sdk_params:
                 sdk_params.pop(name)
 
+    # Not meant to be overriden in majority of subclasses.
+    def _remove_unchanged_params(self, sdk_params, changed_params):
+        """Remove parameters from `sdk_params` which are known to be
+        derived from params that are not listed in `changed_params`
+        (as returned by changed_params). Same-name params are matched
+        directly, ref-derived '<x>_id(s)' params are matched via their
+        '<x>_ref(s)' params. Any other parameters are kept.
+        """
+        changed = {path.split(".", 1)[0] for path in changed_params}
+        if self.sdk_params_from_params is None:
+            same_name = self.params_from_sdk
+        else:
+            same_name = self.sdk_params_from_params
+
+        for name in list(sdk_params):
+            if name in same_name:
+                source = name
+            elif name in self.sdk_params_from_refs:
+                source = _ref_param_name(name)
+                if source not in self.params_from_refs:
+                    continue
+            else:
+                continue
+            if source not in changed:
+                del sdk_params[name]
+
     # Used when creating params for SDK calls, should be overriden in
     # majority of child classes.
     def _refs_from_ser(self, conn):
@@ -2,24 +2,19 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_PROJECT = openstack.identity.v3.project.Project
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_PROJECT = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class Project(osm_resource.Resource):
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_PROJECT
-    sdk_class = OPENSTACK_SDK_PROJECT
+    sdk_class = openstack_sdk.LazyResourceClass("identity.v3.project.Project")
 
     info_from_sdk = [
         "domain_id",
@@ -2,26 +2,383 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    from openstack.exceptions import DuplicateResource, HttpException, ResourceFailure
-    OPENSTACK_IMAGE_CLASS = openstack.image.v2.image.Image
-except ImportError:
-    HAS_OPENSTACK = False
+from collections import OrderedDict
+import threading
+import time
+import weakref
 
-    class DuplicateResource(Exception):
-        pass
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    openstack_sdk,
+)
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    reference_store,
+)
+
+# Bounds of the per-connection reference cache, see ReferenceCache.
+DEFAULT_CACHE_MAX_SIZE = 10000
+DEFAULT_CACHE_TTL = 300
+
+_CACHES = weakref.WeakKeyDictionary()
+_CACHES_LOCK = threading.Lock()
+_DIRECTORIES = weakref.WeakKeyDictionary()
+_IMAGE_CATALOGS = weakref.WeakKeyDictionary()
+
+# Reference kinds supported by prefetch_ids, mapped to names of
+# conn.network find and list methods.
+_NEUTRON_LOOKUPS = {
+    "network": ("find_network", "networks"),
+    "router": ("find_router", "routers"),
+    "security_group": ("find_security_group", "security_groups"),
+    "subnet": ("find_subnet", "subnets"),
+}
+
+
+class ReferenceCache:
+    """LRU cache of id->ref and ref->id lookups made through a single
+    OpenStack SDK connection. Entries expire `ttl` seconds after being
+    stored, and the least recently used entries are evicted when more
+    than `max_size` are stored. A `max_size` of 0 disables caching.
+
+    When `store` (a ReferenceStore) is set, lookups missing in memory
+    are read from it and new ones are written to it, so that they are
+    shared with other module invocations.
+
+    Hit and miss counters are kept for tuning the bounds.
+    """
 
-    class HttpException(Exception):
-        pass
+    def __init__(self, max_size=DEFAULT_CACHE_MAX_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = None
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        # key -> (expires_at, value, lookup)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        # Doesn't count as a hit or miss, nor refresh LRU order.
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key):
+        """Returns: cached value for `key`, or None if not cached or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _lookup = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            if self.store is not None and reference_store.persistable(key):
+                stored = self.store.get(key)
+                if stored is not None:
+                    value, lookup = stored
+                    self.store_hits += 1
+                    self._put_entry(key, value, lookup)
+                    return value
+            self.misses += 1
+            return None
 
-    class ResourceFailure(Exception):
-        pass
+    def invalidate(self, lookups):
+        """Drop all entries looked up by any of the names or IDs in
+        `lookups`, also from the store.
+        """
+        lookups = set(lookups)
+        with self._lock:
+            for key in [
+                key for key, entry in self._entries.items() if entry[2] in lookups
+            ]:
+                del self._entries[key]
+            if self.store is not None:
+                self.store.invalidate(lookups)
+
+    def put(self, key, value, lookup=None):
+        """Store `value` under `key`, `lookup` is the name or ID the value
+        was looked up by. None values are never cached, so that
+        resources which don't exist (yet) are looked up again.
+        """
+        if value is None or self.max_size <= 0:
+            return
+        with self._lock:
+            self._put_entry(key, value, lookup)
+            if self.store is not None and reference_store.persistable(key):
+                self.store.put(key, value, lookup)
+
+    def stats(self):
+        """Returns: dict with hits, store_hits, misses and size of the cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def _put_entry(self, key, value, lookup):
+        self._entries[key] = (time.monotonic() + self.ttl, value, lookup)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class IdentityDirectory:
+    """Name<->id indexes of Keystone domains, projects, users and roles,
+    loaded with one list call per kind. Kinds which cannot be listed
+    due to missing permissions (HTTP 403) are left out. Lookups return
+    None whenever the directory can't give a definite answer, and
+    callers then fall back to per-item find calls.
+    """
 
-    OPENSTACK_IMAGE_CLASS = type(None)
+    KINDS = ("domains", "projects", "users", "roles")
+
+    def __init__(self, conn):
+        # kind -> {id: (name, domain_id)}
+        self._by_id = {}
+        # kind -> {name: [(id, domain_id), ...]}
+        self._by_name = {}
+        for kind in self.KINDS:
+            try:
+                items = list(getattr(conn.identity, kind)())
+            except openstack_sdk.exceptions().HttpException as e:
+                if e.status_code != 403:
+                    raise e
+                continue
+            by_id = {}
+            by_name = {}
+            for item in items:
+                domain_id = None if kind == "domains" else item["domain_id"]
+                by_id[item["id"]] = (item["name"], domain_id)
+                by_name.setdefault(item["name"], []).append((item["id"], domain_id))
+            self._by_id[kind] = by_id
+            self._by_name[kind] = by_name
+
+    def available(self, kind):
+        """Returns: True if `kind` (e.g. 'projects') was listed"""
+        return kind in self._by_id
+
+    def find_id(self, kind, name, domain_id=None):
+        """Returns: ID of `kind` resource named `name`, optionally within
+        `domain_id`, or None if unknown or ambiguous
+        """
+        matches = [
+            id_
+            for id_, item_domain_id in self._by_name.get(kind, {}).get(name, [])
+            if domain_id is None or item_domain_id == domain_id
+        ]
+        if len(matches) == 1:
+            return matches[0]
+        return None
 
-from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
+    def get(self, kind, id_):
+        """Returns: (name, domain_id) tuple of `kind` resource with ID
+        `id_`, or None if unknown
+        """
+        return self._by_id.get(kind, {}).get(id_)
+
+    def ref(self, kind, id_):
+        """Returns: reference dict of `kind` resource with ID `id_`, shaped
+        like project_ref, user_ref, role_ref and domain_ref results, or
+        None if unknown
+        """
+        item = self.get(kind, id_)
+        if item is None:
+            return None
+        name, domain_id = item
+        domain_name = None
+        if domain_id is not None:
+            domain = self.get("domains", domain_id)
+            if domain is None:
+                return None
+            domain_name = domain[0]
+        return {"name": name, "project_name": None, "domain_name": domain_name}
+
+
+class ImageCatalog:
+    """Indexes of Glance images by ID, name (and owner) and checksum,
+    built with a single list of all images visible through a
+    connection. Images created or updated afterwards should be added
+    with `add` to keep the catalog current.
+    """
+
+    def __init__(self, conn):
+        self._by_id = {}
+        self._by_name = {}
+        self._by_checksum = {}
+        for image in conn.image.images():
+            self.add(image)
+
+    def add(self, image):
+        """Add or replace `image` (an SDK image) in the catalog."""
+        old_image = self._by_id.get(image["id"])
+        if old_image is not None:
+            self._by_name[old_image["name"]].remove(old_image)
+            if old_image["checksum"]:
+                self._by_checksum[old_image["checksum"]].remove(old_image)
+        self._by_id[image["id"]] = image
+        self._by_name.setdefault(image["name"], []).append(image)
+        if image["checksum"]:
+            self._by_checksum.setdefault(image["checksum"], []).append(image)
+
+    def find(self, name_or_id, owner=None):
+        """Returns: list of images with ID or name `name_or_id`, ID match
+        first, optionally only those owned by project ID `owner`
+        """
+        matches = []
+        if name_or_id in self._by_id:
+            matches.append(self._by_id[name_or_id])
+        matches.extend(self._by_name.get(name_or_id, []))
+        return [image for image in matches if owner is None or image["owner"] == owner]
+
+    def get(self, id_):
+        """Returns: image with ID `id_`, or None"""
+        return self._by_id.get(id_)
+
+    def with_checksum(self, checksum):
+        """Returns: list of images with content `checksum`"""
+        return list(self._by_checksum.get(checksum, []))
+
+    def with_name(self, name, owner=None):
+        """Returns: list of images named `name`, optionally only those
+        owned by project ID `owner`
+        """
+        return [
+            image
+            for image in self._by_name.get(name, [])
+            if owner is None or image["owner"] == owner
+        ]
+
+
+def identity_directory(conn):
+    """Returns: IdentityDirectory used for lookups through OpenStack
+    SDK connection `conn`, or None if not enabled
+    """
+    return _DIRECTORIES.get(conn)
+
+
+def use_identity_directory(conn):
+    """Opt in to preloading Keystone domains, projects, users and roles
+    visible through OpenStack SDK connection `conn`, and resolving
+    identity references from the loaded indexes where possible.
+
+    Returns: the IdentityDirectory
+    """
+    directory = IdentityDirectory(conn)
+    _DIRECTORIES[conn] = directory
+    return directory
+
+
+def image_catalog(conn):
+    """Returns: ImageCatalog used for lookups through OpenStack SDK
+    connection `conn`, or None if not enabled
+    """
+    return _IMAGE_CATALOGS.get(conn)
+
+
+def use_image_catalog(conn):
+    """Opt in to listing all images visible through OpenStack SDK
+    connection `conn` once, and resolving image references and
+    looking up existing images from the resulting catalog.
+
+    Returns: the ImageCatalog
+    """
+    catalog = ImageCatalog(conn)
+    _IMAGE_CATALOGS[conn] = catalog
+    return catalog
+
+
+def prefetch_ids(conn, kind, refs):
+    """Resolve IDs of Neutron resources of `kind` ('network', 'router',
+    'security_group' or 'subnet') identified by reference dicts
+    `refs` in bulk, with one list call per project the refs point
+    to. The IDs are stored in the reference cache of `conn`, so that
+    subsequent `<kind>_id` calls for the same refs don't make API
+    calls. Refs which are not found or are ambiguous are left to the
+    regular per-item lookup.
+
+    Returns: number of refs resolved
+    """
+    find_name, list_name = _NEUTRON_LOOKUPS[kind]
+    find_method = getattr(conn.network, find_name)
+    cache = reference_cache(conn)
+
+    wanted_by_filters = {}
+    for ref in refs:
+        if ref is None:
+            continue
+        key = _fetch_id_key(find_method, ref)
+        if key in cache:
+            continue
+        filters = tuple(sorted(_project_id_filters(conn, ref).items()))
+        wanted_by_filters.setdefault(filters, {})[key] = ref["name"]
+
+    resolved = 0
+    for filters, wanted in wanted_by_filters.items():
+        ids_by_name = {}
+        for sdk_res in getattr(conn.network, list_name)(**dict(filters)):
+            ids_by_name.setdefault(sdk_res["name"], []).append(sdk_res["id"])
+        for key, name in wanted.items():
+            ids = ids_by_name.get(name, [])
+            if len(ids) == 1:
+                cache.put(key, ids[0], name)
+                resolved += 1
+    return resolved
+
+
+def invalidate_references(conn, lookups):
+    """Drop cached lookups of the resources named or identified by any
+    of `lookups` from the reference cache of `conn`, e.g. after such
+    resources were created or updated.
+    """
+    try:
+        cache = _CACHES.get(conn)
+    except TypeError:
+        # `conn` can't be weakly referenced, so it has no cache.
+        return
+    if cache is not None:
+        cache.invalidate([lookup for lookup in lookups if lookup is not None])
+
+
+def reference_cache(conn, max_size=None, ttl=None):
+    """Get the ReferenceCache of OpenStack SDK connection `conn`,
+    creating it on first use. Non-None `max_size` and `ttl` reconfigure
+    the cache bounds.
+
+    Returns: ReferenceCache instance
+    """
+    with _CACHES_LOCK:
+        cache = _CACHES.get(conn)
+        if cache is None:
+            cache = ReferenceCache()
+            _CACHES[conn] = cache
+    if max_size is not None:
+        cache.max_size = max_size
+    if ttl is not None:
+        cache.ttl = ttl
+    return cache
+
+
+def use_reference_store(conn, file_path, ttl=None):
+    """Back the reference cache of `conn` with a SQLite file at
+    `file_path`, shared by all module invocations which use it. Entries
+    are scoped by the auth URL, region and project of `conn`.
+
+    Returns: the ReferenceStore
+    """
+    if ttl is None:
+        ttl = reference_store.DEFAULT_STORE_TTL
+    store = reference_store.ReferenceStore(file_path, _store_scope(conn), ttl)
+    reference_cache(conn).store = store
+    return store
 
 
 def image_id(conn, ref, required=True):
@@ -37,21 +394,11 @@ def image_id(conn, ref, required=True):
     if ref is None:
         return None
 
-    filters = {"name": ref["name"]}
-    project_id_filters = _project_id_filters(conn, ref)
-    if "project_id" in project_id_filters:
-        filters["owner"] = project_id_filters["project_id"]
-
-    matches = list(conn.image.images(**filters))
-
-    if len(matches) > 1:
-        raise DuplicateResource(f"More than one image found for query: {filters}")
-    if len(matches) < 1:
-        if required:
-            raise ResourceFailure(f"No image found for query: {filters}")
-        else:
-            return None
-    return matches[0]["id"]
+    return _cached(
+        conn,
+        ("image_id", ref["name"], ref["project_name"], ref["domain_name"]),
+        lambda: _fetch_image_id(conn, ref, required),
+    )
 
 
 def image_ref(conn, id_, required=True):
@@ -63,6 +410,9 @@ def image_ref(conn, id_, required=True):
 
     Raises: openstack's ResourceNotFound when `required` but not found
     """
+    catalog = image_catalog(conn)
+    if catalog is not None and catalog.get(id_) is not None:
+        return _ref_from_resource(conn, catalog.get(id_), get_project_info=True)
     return _fetch_ref(conn, conn.image.find_image, id_, required)
 
 
@@ -305,6 +655,12 @@ def domain_ref(conn, id_, required=True):
     Returns: the ref dict, or None if not found and not `required`
     Raises: openstack's ResourceNotFound when `required` but not found
     """
+    directory = identity_directory(conn)
+    if directory is not None and id_ is not None:
+        ref = directory.ref("domains", id_)
+        if ref is not None:
+            return ref
+
     # Domain objects don't have project_id
     return _fetch_ref(
         conn, conn.identity.find_domain, id_, required, get_project_info=False
@@ -328,22 +684,11 @@ def project_ref(conn, id_, required=True):
     Returns: the ref dict, or None if not found and not `required`
     Raises: openstack's ResourceNotFound when `required` but not found
     """
-    # Project objects don't have project_id, but most of them have a
-    # domain_id (unless they're domains themselves). Since extending
-    # _fetch_ref with this very special case doesn't make much sense,
-    # we handle it here.
-    ref = _fetch_ref(
-        conn, conn.identity.find_project, id_, required, get_project_info=False
+    if id_ is None:
+        return None
+    return _cached(
+        conn, ("project_ref", id_), lambda: _fetch_project_ref(conn, id_, required)
     )
-    if ref is None:
-        return
-
-    project = conn.identity.find_project(id_)
-    if project is not None and project["domain_id"] is not None:
-        domain = conn.identity.find_domain(project["domain_id"])
-        ref["domain_name"] = domain["name"]
-
-    return ref
 
 
 def user_id(conn, ref, required=True, none_if_auth=False):
@@ -380,21 +725,11 @@ def user_ref(conn, id_, required=True, allow_auth=True):
             "domain_name": const.REF_AUTH,
         }
 
-    # User objects don't have project_id, but they have a
-    # domain_id. Since extending _fetch_ref with this very special
-    # case doesn't make much sense, we handle it here.
-    ref = _fetch_ref(
-        conn, conn.identity.find_user, id_, required, get_project_info=False
+    if id_ is None:
+        return None
+    return _cached(
+        conn, ("user_ref", id_), lambda: _fetch_user_ref(conn, id_, required)
     )
-    if ref is None:
-        return
-
-    user = conn.identity.find_user(id_)
-    if user is not None and user["domain_id"] is not None:
-        domain = conn.identity.find_domain(user["domain_id"])
-        ref["domain_name"] = domain["name"]
-
-    return ref
 
 
 def role_id(conn, ref, required=True):
@@ -414,6 +749,69 @@ def role_ref(conn, id_, required=True):
     Returns: the ref dict, or None if not found and not `required`
     Raises: openstack's ResourceNotFound when `required` but not found
     """
+    if id_ is None:
+        return None
+    return _cached(
+        conn, ("role_ref", id_), lambda: _fetch_role_ref(conn, id_, required)
+    )
+
+
+def _fetch_project_ref(conn, id_, required):
+    directory = identity_directory(conn)
+    if directory is not None:
+        ref = directory.ref("projects", id_)
+        if ref is not None:
+            return ref
+
+    # Project objects don't have project_id, but most of them have a
+    # domain_id (unless they're domains themselves). Since extending
+    # _fetch_ref with this very special case doesn't make much sense,
+    # we handle it here.
+    ref = _fetch_ref(
+        conn, conn.identity.find_project, id_, required, get_project_info=False
+    )
+    if ref is None:
+        return
+
+    project = conn.identity.find_project(id_)
+    if project is not None and project["domain_id"] is not None:
+        domain = conn.identity.find_domain(project["domain_id"])
+        ref["domain_name"] = domain["name"]
+
+    return ref
+
+
+def _fetch_user_ref(conn, id_, required):
+    directory = identity_directory(conn)
+    if directory is not None:
+        ref = directory.ref("users", id_)
+        if ref is not None:
+            return ref
+
+    # User objects don't have project_id, but they have a
+    # domain_id. Since extending _fetch_ref with this very special
+    # case doesn't make much sense, we handle it here.
+    ref = _fetch_ref(
+        conn, conn.identity.find_user, id_, required, get_project_info=False
+    )
+    if ref is None:
+        return
+
+    user = conn.identity.find_user(id_)
+    if user is not None and user["domain_id"] is not None:
+        domain = conn.identity.find_domain(user["domain_id"])
+        ref["domain_name"] = domain["name"]
+
+    return ref
+
+
+def _fetch_role_ref(conn, id_, required):
+    directory = identity_directory(conn)
+    if directory is not None:
+        ref = directory.ref("roles", id_)
+        if ref is not None:
+            return ref
+
     ref = _fetch_ref(
         conn, conn.identity.find_role, id_, required, get_project_info=False
     )
@@ -428,16 +826,54 @@ def role_ref(conn, id_, required=True):
     return ref
 
 
+def _fetch_image_id(conn, ref, required):
+    filters = {"name": ref["name"]}
+    project_id_filters = _project_id_filters(conn, ref)
+    if "project_id" in project_id_filters:
+        filters["owner"] = project_id_filters["project_id"]
+
+    catalog = image_catalog(conn)
+    if catalog is not None:
+        matches = catalog.with_name(ref["name"], filters.get("owner"))
+    else:
+        matches = list(conn.image.images(**filters))
+
+    if len(matches) > 1:
+        raise openstack_sdk.exceptions().DuplicateResource(
+            f"More than one image found for query: {filters}"
+        )
+    if len(matches) < 1:
+        if required:
+            raise openstack_sdk.exceptions().ResourceFailure(
+                f"No image found for query: {filters}"
+            )
+        else:
+            return None
+    return matches[0]["id"]
+
+
 def _fetch_ref(conn, get_method, id_, required=True, get_project_info=True):
     if id_ is None:
         return None
 
+    return _cached(
+        conn,
+        ("ref", _method_key(get_method), id_, get_project_info),
+        lambda: _fetch_ref_uncached(conn, get_method, id_, required, get_project_info),
+    )
+
+
+def _fetch_ref_uncached(conn, get_method, id_, required, get_project_info):
     resource = get_method(id_, ignore_missing=not required)
     if resource is None:
         return None
+    return _ref_from_resource(conn, resource, get_project_info)
 
+
+def _ref_from_resource(conn, resource, get_project_info):
     if get_project_info:
-        if isinstance(resource, OPENSTACK_IMAGE_CLASS):
+        image_class = openstack_sdk.resource_class("image.v2.image.Image")
+        if image_class is not None and isinstance(resource, image_class):
             project_name, domain_name = _fetch_project_name_and_domain_name(
                 conn, resource.owner_id
             )
@@ -458,6 +894,24 @@ def _fetch_id(conn, get_method, ref, required=True):
     if ref is None:
         return None
 
+    return _cached(
+        conn,
+        _fetch_id_key(get_method, ref),
+        lambda: _fetch_id_uncached(conn, get_method, ref, required),
+    )
+
+
+def _fetch_id_key(get_method, ref):
+    return (
+        "id",
+        _method_key(get_method),
+        ref["name"],
+        ref["project_name"],
+        ref["domain_name"],
+    )
+
+
+def _fetch_id_uncached(conn, get_method, ref, required):
     sdk_res = get_method(
         ref["name"],
         ignore_missing=not required,
@@ -471,12 +925,26 @@ def _project_id_filters(conn, ref):
     if ref["project_name"] == const.REF_AUTH:
         return {"project_id": conn.current_project_id}
 
+    return _cached(
+        conn,
+        ("project_id_filters", ref["project_name"], ref["domain_name"]),
+        lambda: _project_id_filters_uncached(conn, ref),
+    )
+
+
+def _project_id_filters_uncached(conn, ref):
+    directory = identity_directory(conn)
+    if directory is not None:
+        filters = _project_id_filters_from_directory(directory, ref)
+        if filters is not None:
+            return filters
+
     domain_filters = {}
     if ref["domain_name"] is not None and ref["domain_name"] != const.REF_AUTH:
         try:
             domain = conn.identity.find_domain(ref["domain_name"])
             domain_filters = {"domain_id": domain["id"]}
-        except HttpException as e:
+        except openstack_sdk.exceptions().HttpException as e:
             if e.status_code != 403:
                 raise e
 
@@ -484,12 +952,26 @@ def _project_id_filters(conn, ref):
         try:
             project = conn.identity.find_project(ref["project_name"], **domain_filters)
             return {"project_id": project["id"]}
-        except HttpException as e:
+        except openstack_sdk.exceptions().HttpException as e:
             if e.status_code != 403:
                 raise e
     return {}
 
 
+def _project_id_filters_from_directory(directory, ref):
+    domain_id = None
+    if ref["domain_name"] is not None and ref["domain_name"] != const.REF_AUTH:
+        domain_id = directory.find_id("domains", ref["domain_name"])
+        if domain_id is None:
+            return None
+    if ref["project_name"] is None:
+        return {}
+    project_id = directory.find_id("projects", ref["project_name"], domain_id)
+    if project_id is None:
+        return None
+    return {"project_id": project_id}
+
+
 def _fetch_project_name_and_domain_name(conn, project_id):
     # Perhaps we could make it configurable whether to use explicit
     # project/domain names even when the project_id matches the
@@ -499,6 +981,20 @@ def _fetch_project_name_and_domain_name(conn, project_id):
     if project_id == conn.current_project_id:
         return (const.REF_AUTH, const.REF_AUTH)
 
+    return _cached(
+        conn,
+        ("project_name_and_domain_name", project_id),
+        lambda: _fetch_project_name_and_domain_name_uncached(conn, project_id),
+    )
+
+
+def _fetch_project_name_and_domain_name_uncached(conn, project_id):
+    directory = identity_directory(conn)
+    if directory is not None:
+        ref = directory.ref("projects", project_id)
+        if ref is not None:
+            return (ref["name"], ref["domain_name"])
+
     project_name = None
     domain_name = None
     try:
@@ -507,7 +1003,7 @@ def _fetch_project_name_and_domain_name(conn, project_id):
 
         domain = conn.identity.get_domain(project.domain_id)
         domain_name = domain["name"]
-    except HttpException as e:
+    except openstack_sdk.exceptions().HttpException as e:
         # If we don't have permission to fetch project/domain names,
         # make a simple reference based on resource name only (keep
         # project and domain names as None). Re-raise any other error.
@@ -515,3 +1011,48 @@ def _fetch_project_name_and_domain_name(conn, project_id):
             raise e
 
     return (project_name, domain_name)
+
+
+def _cached(conn, key, fetch):
+    """Look up `key` in the reference cache of `conn`, calling `fetch`
+    to get the value on a miss.
+
+    Returns: the value, dicts are returned as copies so that callers
+    can modify them freely
+    """
+    cache = reference_cache(conn)
+    value = cache.get(key)
+    if value is None:
+        value = fetch()
+        cache.put(key, value, _lookup_of(key))
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def _lookup_of(key):
+    # The name or ID which the cached value was looked up by.
+    if key[0] in ("id", "ref"):
+        return key[2]
+    return key[1]
+
+
+def _method_key(get_method):
+    # Bound SDK proxy methods are re-created on each attribute access,
+    # identify them by the proxy module and method name instead. Other
+    # callables (e.g. mocks) are identified by the object itself.
+    owner = getattr(get_method, "__self__", None)
+    if owner is None:
+        return id(get_method)
+    return f"{type(owner).__module__}.{get_method.__name__}"
+
+
+def _store_scope(conn):
+    return "|".join(
+        str(part)
+        for part in (
+            conn.config.get_auth_args().get("auth_url"),
+            conn.config.get_region_name(),
+            conn.current_project_id,
+        )
+    )
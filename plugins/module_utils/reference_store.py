@@ -0,0 +1,97 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import sqlite3
+import time
+
+# How long (in seconds) persisted lookups stay valid.
+DEFAULT_STORE_TTL = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS refs (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    lookup TEXT,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE INDEX IF NOT EXISTS refs_lookup ON refs (scope, lookup);
+"""
+
+
+class ReferenceStore:
+    """SQLite file of reference lookups shared by module invocations.
+
+    Entries are separated by `scope` (identifying the cloud and auth
+    project), keyed by JSON-serialized lookup keys and indexed by the
+    looked up name or ID, so that they can be invalidated when a
+    resource of that name or ID changes.
+    """
+
+    def __init__(self, file_path, scope, ttl=DEFAULT_STORE_TTL):
+        self.file_path = file_path
+        self.scope = scope
+        self.ttl = ttl
+        # Create the file as private to the user before SQLite opens it.
+        os.close(os.open(file_path, os.O_RDWR | os.O_CREAT, 0o600))
+        # Callers serialize access, the connection may be used from worker
+        # threads.
+        self._db = sqlite3.connect(
+            file_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def get(self, key):
+        """Returns: (value, lookup) tuple stored under `key`, or None if
+        not stored or expired
+        """
+        row = self._db.execute(
+            "SELECT value, lookup, expires_at FROM refs WHERE scope = ? AND key = ?",
+            (self.scope, json.dumps(key)),
+        ).fetchone()
+        if row is None or row[2] <= time.time():
+            return None
+        return (json.loads(row[0]), row[1])
+
+    def invalidate(self, lookups):
+        """Remove all entries looked up by any of the names or IDs in
+        `lookups`.
+        """
+        self._db.executemany(
+            "DELETE FROM refs WHERE scope = ? AND lookup = ?",
+            [(self.scope, lookup) for lookup in lookups],
+        )
+
+    def put(self, key, value, lookup=None):
+        """Store `value` under `key`, `lookup` is the name or ID the value
+        was looked up by.
+        """
+        self._db.execute(
+            "INSERT OR REPLACE INTO refs (scope, key, lookup, value, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                self.scope,
+                json.dumps(key),
+                lookup,
+                json.dumps(value),
+                time.time() + self.ttl,
+            ),
+        )
+
+
+def persistable(key):
+    """Returns: True if `key` only consists of strings, booleans and
+    None (possibly nested in tuples), so it has the same meaning in
+    other processes
+    """
+    if isinstance(key, tuple):
+        return all(persistable(part) for part in key)
+    return key is None or isinstance(key, (str, bool))
@@ -2,39 +2,153 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
-    flavor,
-    image,
-    keypair,
-    network,
-    project,
-    router,
-    router_interface,
-    security_group,
-    security_group_rule,
-    server,
-    server_floating_ip,
-    server_port,
-    server_volume,
-    subnet,
-    user,
-)
+from collections.abc import Mapping
+
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
 
-RESOURCE_MAP = {
-    const.RES_TYPE_FLAVOR: flavor.Flavor,
-    const.RES_TYPE_IMAGE: image.Image,
-    const.RES_TYPE_KEYPAIR: keypair.Keypair,
-    const.RES_TYPE_NETWORK: network.Network,
-    const.RES_TYPE_PROJECT: project.Project,
-    const.RES_TYPE_ROUTER: router.Router,
-    const.RES_TYPE_ROUTER_INTERFACE: router_interface.RouterInterface,
-    const.RES_TYPE_SECURITYGROUP: security_group.SecurityGroup,
-    const.RES_TYPE_SECURITYGROUPRULE: security_group_rule.SecurityGroupRule,
-    const.RES_TYPE_SERVER: server.Server,
-    const.RES_TYPE_SERVER_FLOATING_IP: server_floating_ip.ServerFloatingIP,
-    const.RES_TYPE_SERVER_PORT: server_port.ServerPort,
-    const.RES_TYPE_SERVER_VOLUME: server_volume.ServerVolume,
-    const.RES_TYPE_SUBNET: subnet.Subnet,
-    const.RES_TYPE_USER: user.User,
-}
+RESOURCE_TYPES = (
+    const.RES_TYPE_FLAVOR,
+    const.RES_TYPE_IMAGE,
+    const.RES_TYPE_KEYPAIR,
+    const.RES_TYPE_NETWORK,
+    const.RES_TYPE_PROJECT,
+    const.RES_TYPE_ROUTER,
+    const.RES_TYPE_ROUTER_INTERFACE,
+    const.RES_TYPE_SECURITYGROUP,
+    const.RES_TYPE_SECURITYGROUPRULE,
+    const.RES_TYPE_SERVER,
+    const.RES_TYPE_SERVER_FLOATING_IP,
+    const.RES_TYPE_SERVER_PORT,
+    const.RES_TYPE_SERVER_VOLUME,
+    const.RES_TYPE_SUBNET,
+    const.RES_TYPE_USER,
+)
+
+
+def resource_class(res_type):
+    """Returns: resource class of `res_type`, only the module defining
+    the class gets imported
+
+    Raises: KeyError if `res_type` has no resource class
+    """
+    # The imports are spelled out so that Ansible ships the modules
+    # with the module payload.
+    if res_type == const.RES_TYPE_FLAVOR:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            flavor,
+        )
+
+        return flavor.Flavor
+    if res_type == const.RES_TYPE_IMAGE:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            image,
+        )
+
+        return image.Image
+    if res_type == const.RES_TYPE_KEYPAIR:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            keypair,
+        )
+
+        return keypair.Keypair
+    if res_type == const.RES_TYPE_NETWORK:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            network,
+        )
+
+        return network.Network
+    if res_type == const.RES_TYPE_PROJECT:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            project,
+        )
+
+        return project.Project
+    if res_type == const.RES_TYPE_ROUTER:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            router,
+        )
+
+        return router.Router
+    if res_type == const.RES_TYPE_ROUTER_INTERFACE:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            router_interface,
+        )
+
+        return router_interface.RouterInterface
+    if res_type == const.RES_TYPE_SECURITYGROUP:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            security_group,
+        )
+
+        return security_group.SecurityGroup
+    if res_type == const.RES_TYPE_SECURITYGROUPRULE:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            security_group_rule,
+        )
+
+        return security_group_rule.SecurityGroupRule
+    if res_type == const.RES_TYPE_SERVER:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            server,
+        )
+
+        return server.Server
+    if res_type == const.RES_TYPE_SERVER_FLOATING_IP:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            server_floating_ip,
+        )
+
+        return server_floating_ip.ServerFloatingIP
+    if res_type == const.RES_TYPE_SERVER_PORT:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            server_port,
+        )
+
+        return server_port.ServerPort
+    if res_type == const.RES_TYPE_SERVER_VOLUME:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            server_volume,
+        )
+
+        return server_volume.ServerVolume
+    if res_type == const.RES_TYPE_SUBNET:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            subnet,
+        )
+
+        return subnet.Subnet
+    if res_type == const.RES_TYPE_USER:
+        from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+            user,
+        )
+
+        return user.User
+    raise KeyError(res_type)
+
+
+class _ResourceMap(Mapping):
+    """Read-only map of resource types to resource classes, importing
+    the module of each class on first access.
+    """
+
+    def __init__(self):
+        self._classes = {}
+
+    def __contains__(self, res_type):
+        return res_type in RESOURCE_TYPES
+
+    def __getitem__(self, res_type):
+        res_cls = self._classes.get(res_type)
+        if res_cls is None:
+            res_cls = resource_class(res_type)
+            self._classes[res_type] = res_cls
+        return res_cls
+
+    def __iter__(self):
+        return iter(RESOURCE_TYPES)
+
+    def __len__(self):
+        return len(RESOURCE_TYPES)
+
+
+RESOURCE_MAP = _ResourceMap()
@@ -2,22 +2,14 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_PORT = openstack.network.v2.port.Port
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_PORT = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     exc,
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
-
 ROUTER_INTERFACE_OWNERS = [
     "network:router_interface",
     "network:ha_router_replicated_interface",
@@ -38,8 +30,10 @@ def router_ports(conn, sdk_rtr):
 
 class RouterInterface(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_ROUTER_INTERFACE
-    sdk_class = OPENSTACK_SDK_PORT
+    sdk_class = openstack_sdk.LazyResourceClass("network.v2.port.Port")
 
     info_from_sdk = [
         "id",
@@ -57,6 +51,7 @@ class RouterInterface(osm_resource.Resource):
         "fixed_ips",
         "network_id",
     ]
+    readonly_sdk_params = ["network_id"]
 
     @classmethod
     def from_sdk(cls, conn, sdk_resource):
@@ -91,9 +86,14 @@ class RouterInterface(osm_resource.Resource):
                     f"to a different device: {port.to_dict()}"
                 )
 
-            if self._port_needs_update(self.from_sdk(conn, port)):
-                port = self._update_port(conn, port["id"], sdk_params)
-                changed = True
+            target = self.from_sdk(conn, port)
+            if self._port_needs_update(target):
+                self._remove_readonly_params(sdk_params)
+                self._remove_unchanged_params(sdk_params, self.changed_params(target))
+                if sdk_params:
+                    reference.invalidate_references(conn, [port["id"], port["name"]])
+                    port = self._update_port(conn, port["id"], sdk_params)
+                    changed = True
         else:
             port = self._create_port(conn, sdk_params)
             changed = True
@@ -133,13 +133,10 @@ class RouterInterface(osm_resource.Resource):
             )
 
     def _port_needs_update(self, other):
-        self_trimmed = self._data_without_info()
-        other_trimmed = other._data_without_info()
-        del self_trimmed["params"]["device_owner"]
-        del self_trimmed["params"]["device_ref"]
-        del other_trimmed["params"]["device_owner"]
-        del other_trimmed["params"]["device_ref"]
-        return self_trimmed != other_trimmed
+        skip_params = ("device_owner", "device_ref")
+        return osm_resource.importable_fingerprint(
+            self.data, skip_params
+        ) != osm_resource.importable_fingerprint(other.data, skip_params)
 
     @staticmethod
     def _update_port(conn, port_id, sdk_params):
@@ -149,6 +146,20 @@ class RouterInterface(osm_resource.Resource):
     def _create_port(conn, sdk_params):
         return conn.network.create_port(**sdk_params)
 
+    @classmethod
+    def _prefetch_refs(cls, conn, resources):
+        network_refs = []
+        router_refs = []
+        subnet_refs = []
+        for res in resources:
+            network_refs.append(res.params()["network_ref"])
+            router_refs.append(res.params()["device_ref"])
+            for fixed_ip in res.params()["fixed_ips_refs"]:
+                subnet_refs.append(fixed_ip["subnet_ref"])
+        reference.prefetch_ids(conn, "network", network_refs)
+        reference.prefetch_ids(conn, "router", router_refs)
+        reference.prefetch_ids(conn, "subnet", subnet_refs)
+
     @staticmethod
     def _refs_from_sdk(conn, sdk_res):
         refs = {}
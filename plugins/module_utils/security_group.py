@@ -2,24 +2,21 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_SECURITY_GROUP = openstack.network.v2.security_group.SecurityGroup
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_SECURITY_GROUP = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class SecurityGroup(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_SECURITYGROUP
-    sdk_class = OPENSTACK_SDK_SECURITY_GROUP
+    sdk_class = openstack_sdk.LazyResourceClass(
+        "network.v2.security_group.SecurityGroup"
+    )
 
     info_from_sdk = [
         "id",
@@ -52,6 +49,10 @@ class SecurityGroup(osm_resource.Resource):
     def _find_sdk_res(conn, name_or_id, filters=None):
         return conn.network.find_security_group(name_or_id, **(filters or {}))
 
+    @staticmethod
+    def _list_sdk_res(conn, filters=None):
+        return conn.network.security_groups(**(filters or {}))
+
     def _hook_after_update(self, conn, sdk_res, is_create):
         if is_create:
             # Security groups are auto-created with default rules. This is
@@ -2,25 +2,22 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_SECURITY_GROUP_RULE = openstack.network.v2.security_group_rule.SecurityGroupRule
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_SECURITY_GROUP_RULE = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class SecurityGroupRule(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_SECURITYGROUPRULE
-    sdk_class = OPENSTACK_SDK_SECURITY_GROUP_RULE
+    sdk_class = openstack_sdk.LazyResourceClass(
+        "network.v2.security_group_rule.SecurityGroupRule"
+    )
 
     info_from_sdk = [
         "id",
@@ -64,7 +61,7 @@ class SecurityGroupRule(osm_resource.Resource):
         try:
             conn.network.create_security_group_rule(**sdk_params)
             return True
-        except openstack.exceptions.ConflictException:
+        except openstack_sdk.exceptions().ConflictException:
             # TODO: Log that the security group rule already exists
             return False
 
@@ -81,6 +78,14 @@ class SecurityGroupRule(osm_resource.Resource):
         refs["remote_group_id"] = sdk_res["remote_group_id"]
         return refs
 
+    @classmethod
+    def _prefetch_refs(cls, conn, resources):
+        refs = []
+        for res in resources:
+            refs.append(res.params()["security_group_ref"])
+            refs.append(res.params()["remote_group_ref"])
+        reference.prefetch_ids(conn, "security_group", refs)
+
     def _refs_from_ser(self, conn):
         refs = {}
         refs["security_group_ref"] = self.params()["security_group_ref"]
@@ -2,7 +2,11 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import hashlib
+import json
+
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import stringfilter
 
 
 def new_resources_file_struct():
@@ -22,22 +26,122 @@ def add_or_replace_resource(resources, resource):
     Returns: True if something changed in resources structure, False
     otherwise
     """
-    for i, r in enumerate(resources):
-        if resource.is_same_resource(r):
-            if r == resource.data:
-                return False
-            else:
-                resources[i] = resource.data
-                return True
+    return add_or_replace_resources(resources, [resource])
+
+
+def add_or_replace_resources(resources, new_resources):
+    """Add all `new_resources` into `resources` struct, replacing those
+    already present (check via is_same_resource). Edits `resources` in
+    place.
+
+    Returns: True if something changed in resources structure, False
+    otherwise
+    """
+    return bool(merge_resources(resources, new_resources))
+
+
+def merge_resources(resources, new_resources):
+    """Add all `new_resources` into `resources` struct, replacing those
+    already present (check via is_same_resource). Edits `resources` in
+    place.
 
-    # If we didn't return by now, the resource wasn't found, so append it.
-    resources.append(resource.data)
-    return True
+    Resources are looked up via an index of same_resource_key values
+    built over `resources`, so merging is linear in the number of
+    resources rather than quadratic. Resources which don't provide a
+    key fall back to is_same_resource comparisons.
+
+    Returns: list of positions in `resources` which were added or
+    replaced, in the order in which they were first changed
+    """
+    # Keys are computed by resource classes, so we keep a separate
+    # index per class, built lazily on first use.
+    indexes = {}
+    changed = {}
+
+    for resource in new_resources:
+        key = resource.same_resource_key()
+        if key is None:
+            idx = find_resource(resources, resource)
+        else:
+            index = indexes.get(type(resource))
+            if index is None:
+                index = build_resource_index(resources, type(resource))
+                indexes[type(resource)] = index
+            idx = index.get(key)
+
+        if idx is not None:
+            if resources[idx] == resource.data:
+                continue
+            resources[idx] = resource.data
+        else:
+            resources.append(resource.data)
+            idx = len(resources) - 1
+        changed.setdefault(idx, True)
+
+        # Indexes of other classes might be keyed differently, drop
+        # them rather than trying to keep them in sync.
+        if key is None:
+            indexes = {}
+        else:
+            indexes = {type(resource): indexes[type(resource)]}
+            indexes[type(resource)].setdefault(key, idx)
+
+    return list(changed)
+
+
+def build_resource_index(resources, resource_cls):
+    """Build an index of serialized `resources` list, keyed by
+    same_resource_key as computed by `resource_cls`.
+
+    Returns: dict mapping (type, key) to position in `resources`
+    """
+    index = {}
+    for i, res in enumerate(resources):
+        key = resource_cls._same_resource_key(res)
+        if key is not None:
+            # First match wins, same as with a linear scan.
+            index.setdefault((res.get(const.RES_TYPE), key), i)
+    return index
+
+
+def find_resource(resources, resource):
+    """Returns: position of `resource` in serialized `resources` list, or
+    None if not present.
+    """
+    for i, res in enumerate(resources):
+        if resource.is_same_resource(res):
+            return i
+    return None
+
+
+def content_fingerprint(resource_data):
+    """Compute a stable fingerprint of serialized `resource_data`,
+    covering its type, params, info and migration params. Equal
+    serializations always have equal fingerprints, regardless of dict
+    ordering.
+
+    Returns: fingerprint string
+    """
+    canonical = json.dumps(
+        resource_data, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf8")).hexdigest()
 
 
 def create_resources_from_struct(struct_resources, cls_map):
-    resources = []
     errors = []
+    resources = list(iter_resources_from_struct(struct_resources, cls_map, errors))
+    return resources, errors
+
+
+def iter_resources_from_struct(struct_resources, cls_map, errors):
+    """Instantiate resources from serialized `struct_resources` one at a
+    time, using `cls_map` to look up resource classes by type. Error
+    messages about resources which cannot be instantiated are appended
+    to `errors` list.
+
+    Returns: generator of Resource instances
+    """
     for struct_res in struct_resources:
         if not struct_res.get("type"):
             errors.append("Cannot parse resource due to missing 'type'.")
@@ -45,9 +149,45 @@ def create_resources_from_struct(struct_resources, cls_map):
         if not cls_map.get(struct_res["type"]):
             errors.append(f"Unknown resource type '{struct_res['type']}'.")
             continue
-        resources.append(cls_map[struct_res["type"]].from_data(struct_res))
+        yield cls_map[struct_res["type"]].from_data(struct_res)
 
-    return resources, errors
+
+def select_resources(
+    resources,
+    types=None,
+    queries=None,
+    query_attribute="params.name",
+    offset=0,
+    limit=None,
+    fields=None,
+):
+    """Select a subset of serialized `resources`.
+
+    Resources are kept if their type is one of `types` (when given)
+    and the value under `query_attribute` matches at least one of
+    `queries` (when given, see stringfilter). The matching resources
+    are then paginated via `offset` and `limit`, and if `fields` is
+    given, only the listed keys (dot-separated paths into nested
+    dicts) are kept in each of them.
+
+    Returns: tuple of the list of selected resources and the number of
+    matching resources before pagination
+    """
+    if types is not None:
+        resources = [res for res in resources if res.get(const.RES_TYPE) in types]
+    if queries is not None:
+        resources = stringfilter.stringfilter(resources, queries, query_attribute)
+
+    total = len(resources)
+    if limit is None:
+        resources = resources[offset:]
+    else:
+        resources = resources[offset : offset + limit]
+
+    if fields is not None:
+        key_paths = [field.split(".") for field in fields]
+        resources = [_project_fields(res, key_paths) for res in resources]
+    return resources, total
 
 
 # TODO: Remove when everything is a Resource
@@ -118,3 +258,23 @@ def _trim_info(resource):
             return obj
 
     return _recursive_trim(resource)
+
+
+def _project_fields(resource, key_paths):
+    """Returns: copy of serialized `resource` which only contains values
+    under `key_paths` (lists of keys into nested dicts). Paths not
+    present in `resource` are skipped.
+    """
+    result = {}
+    for key_path in key_paths:
+        value = resource
+        for key in key_path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = result
+            for key in key_path[:-1]:
+                target = target.setdefault(key, {})
+            target[key_path[-1]] = value
+    return result
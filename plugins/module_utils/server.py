@@ -2,21 +2,18 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_SERVER = openstack.compute.v2.server.Server
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_SERVER = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
     exc,
+    filesystem,
     reference,
+    openstack_sdk,
     osm_resource,
+    server_port,
+    server_volume,
 )
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils.server_floating_ip import (
     server_floating_ips,
@@ -34,8 +31,10 @@ from ansible_collections.os_migrate.os_migrate.plugins.module_utils.server_volum
 
 class Server(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_SERVER
-    sdk_class = OPENSTACK_SDK_SERVER
+    sdk_class = openstack_sdk.LazyResourceClass("compute.v2.server.Server")
 
     info_from_sdk = [
         "created_at",
@@ -117,6 +116,41 @@ class Server(osm_resource.Resource):
 
         return obj
 
+    @classmethod
+    def from_names(cls, conn, names_or_ids, workers=1):
+        """Fetch servers identified by `names_or_ids` using OpenStack SDK
+        connection `conn` and serialize them. Each server takes several
+        API calls to serialize (ports, floating IPs, volumes, security
+        groups), so up to `workers` servers are fetched concurrently,
+        sharing `conn`. Ports, floating IPs and volumes of multiple
+        servers are listed at once per project (see
+        server_port.PortIndex and server_volume.VolumeIndex).
+
+        Returns: list of Server, in the order of `names_or_ids`
+        """
+
+        def fetch(name_or_id):
+            sdk_server_nodetails = conn.compute.find_server(
+                name_or_id, ignore_missing=False
+            )
+            return conn.compute.get_server(sdk_server_nodetails["id"])
+
+        def serialize(sdk_server):
+            return cls.from_sdk(conn, sdk_server)
+
+        workers = max(min(workers, len(names_or_ids)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            sdk_servers = list(executor.map(fetch, names_or_ids))
+            if len(sdk_servers) > 1:
+                # List ports, floating IPs and volumes of all the servers
+                # at once rather than per server, port and attachment.
+                project_ids = set(
+                    sdk_server["project_id"] for sdk_server in sdk_servers
+                )
+                server_port.use_port_index(conn, project_ids)
+                server_volume.use_volume_index(conn, project_ids)
+            return list(executor.map(serialize, sdk_servers))
+
     def create(self, conn, block_device_mapping):
         sdk_params = self.sdk_params(conn)
         port_creation_mode = self.migration_params()["port_creation_mode"]
@@ -288,6 +322,7 @@ class Server(osm_resource.Resource):
     def update_sdk_params_networks_simple(self, conn, sdk_params, port_creation_mode):
         sdk_params["networks"] = []
         ports = list(map(ServerPort.from_data, self.params()["ports"]))
+        ServerPort._prefetch_refs(conn, ports)
         for port in ports:
             try:
                 if port_creation_mode == "nova":
@@ -337,7 +372,7 @@ class Server(osm_resource.Resource):
         ser_ports = list(map(lambda p: ServerPort.from_sdk(conn, p), sdk_ports))
         refs["ports"] = list(map(lambda p: p.data, ser_ports))
 
-        sdk_fips = server_floating_ips(conn, ser_ports)
+        sdk_fips = server_floating_ips(conn, ser_ports, sdk_res)
         ser_fips = map(lambda fip: ServerFloatingIP.from_sdk(conn, fip), sdk_fips)
         refs["floating_ips"] = list(map(lambda fip: fip.data, ser_fips))
 
@@ -388,13 +423,167 @@ class Server(osm_resource.Resource):
         # Only perform this check if params['key_name'] is truthy (not empty string and not None)
         params = self.params()
         if "key_name" in params and params["key_name"]:
+            sdk_exc = openstack_sdk.exceptions()
             try:
                 conn.compute.find_keypair(params["key_name"], ignore_missing=False)
             except (
-                openstack.exceptions.ResourceFailure,
-                openstack.exceptions.ResourceNotFound,
-                openstack.exceptions.DuplicateResource,
+                sdk_exc.ResourceFailure,
+                sdk_exc.ResourceNotFound,
+                sdk_exc.DuplicateResource,
             ) as e:
                 errors.append(f"Destination keypair prerequisites not met: {e}")
 
         return errors
+
+
+def update_nbdkit_disks(file_path, instance_id, nbdkit_disks):
+    """Record `nbdkit_disks` in migration params of the server with
+    `instance_id` in resource file at `file_path`. Goes through
+    filesystem, so sharded and journaled resource files are handled
+    like on export.
+
+    Returns: True if the file was modified, False otherwise
+
+    Raises: exc.InconsistentState if the server is not in the file
+    """
+    for res in filesystem.load_resources_file(file_path)["resources"]:
+        if (
+            res.get(const.RES_TYPE) == const.RES_TYPE_SERVER
+            and res.get(const.RES_INFO, {}).get("id") == instance_id
+        ):
+            srv = Server.from_data(res)
+            break
+    else:
+        raise exc.InconsistentState(
+            f"workload with instance_id {instance_id} not found in {file_path}"
+        )
+
+    srv.update_migration_params({"nbdkit_disks": nbdkit_disks})
+    return filesystem.write_or_replace_resource(file_path, srv)
+
+
+class ServerChanges:
+    """Servers of projects `project_ids` updated since `since` (an
+    `updated_at` timestamp), listed using the `changes-since` filter
+    with one listing per project. If `since` is None, all servers of
+    the projects are listed.
+
+    Servers of projects other than the current one are listed with
+    `all_projects`, which requires admin privileges. Projects which
+    can't be listed are collected in `unlisted_project_ids`, all their
+    servers are considered changed.
+
+    `mark` is the latest `updated_at` of the listed servers, or `since`
+    if none is newer. The listing precedes exporting the servers, so
+    servers changed afterwards get a newer `updated_at` than `mark`.
+    Servers of projects which weren't listed raise the mark once
+    exported (see add_exported).
+    """
+
+    def __init__(self, conn, project_ids, since=None):
+        self.changed = set()
+        self.listed_project_ids = set()
+        self.unlisted_project_ids = set()
+        self.mark = since
+        filters = {}
+        if since is not None:
+            filters["changes_since"] = since
+        current_project_id = conn.current_project_id
+        for project_id in set(project_ids):
+            if not project_id:
+                continue
+            if project_id == current_project_id:
+                project_filters = filters
+            else:
+                project_filters = dict(
+                    filters, all_projects=True, project_id=project_id
+                )
+            try:
+                for sdk_server in conn.compute.servers(**project_filters):
+                    self._add(sdk_server)
+                self.listed_project_ids.add(project_id)
+            except openstack_sdk.exceptions().HttpException as e:
+                if e.status_code != 403:
+                    raise e
+                self.unlisted_project_ids.add(project_id)
+
+    def add_exported(self, srvs):
+        """Raise `mark` to the latest `updated_at` of exported Servers
+        `srvs` which belong to projects that weren't listed, e.g. when
+        an admin exports servers of other projects and only the current
+        project was listed on the first incremental export. Otherwise
+        the mark would stay unset and every export would be a full one.
+        """
+        for srv in srvs:
+            info = srv.info()
+            if info.get("project_id") in self.listed_project_ids:
+                continue
+            updated_at = info.get("updated_at")
+            if updated_at and (self.mark is None or updated_at > self.mark):
+                self.mark = updated_at
+
+    def select(self, names_or_ids, exported):
+        """Pick servers to export out of `names_or_ids`, given `exported`
+        serialized servers already present in the resources file.
+
+        Returns: list of those `names_or_ids` which haven't been exported
+        yet, have changed, or belong to projects which couldn't be listed
+        """
+        exported_by_name_or_id = {}
+        for ser in exported:
+            exported_by_name_or_id[ser[const.RES_PARAMS]["name"]] = ser
+            exported_by_name_or_id[ser[const.RES_INFO]["id"]] = ser
+
+        selected = []
+        for name_or_id in names_or_ids:
+            ser = exported_by_name_or_id.get(name_or_id)
+            if (
+                ser is None
+                or name_or_id in self.changed
+                or ser[const.RES_INFO]["id"] in self.changed
+                or ser[const.RES_INFO].get("project_id") in self.unlisted_project_ids
+            ):
+                selected.append(name_or_id)
+        return selected
+
+    def _add(self, sdk_server):
+        self.changed.add(sdk_server["id"])
+        self.changed.add(sdk_server["name"])
+        updated_at = sdk_server["updated_at"]
+        if updated_at and (self.mark is None or updated_at > self.mark):
+            self.mark = updated_at
+
+
+def changed_servers(conn, file_path, names_or_ids):
+    """Find which of servers `names_or_ids` need exporting into resource
+    file at `file_path`, given the mark of the previous incremental
+    export into it (see filesystem.load_export_mark). Without a mark,
+    all of them do.
+
+    Returns: (ServerChanges, those of `names_or_ids` which need
+    exporting, list of Server loaded from the file for the others)
+    """
+    since = filesystem.load_export_mark(file_path, const.RES_TYPE_SERVER)
+    if since is None:
+        return ServerChanges(conn, [conn.current_project_id]), names_or_ids, []
+
+    exported = [
+        res
+        for res in filesystem.load_resources_file(file_path)["resources"]
+        if res[const.RES_TYPE] == const.RES_TYPE_SERVER
+    ]
+    project_ids = set(res[const.RES_INFO].get("project_id") for res in exported)
+    project_ids.add(conn.current_project_id)
+    changes = ServerChanges(conn, project_ids, since)
+    selected = changes.select(names_or_ids, exported)
+
+    exported_by_name_or_id = {}
+    for ser in exported:
+        exported_by_name_or_id[ser[const.RES_PARAMS]["name"]] = ser
+        exported_by_name_or_id[ser[const.RES_INFO]["id"]] = ser
+    unchanged = {}
+    for name_or_id in names_or_ids:
+        if name_or_id not in selected:
+            ser = exported_by_name_or_id[name_or_id]
+            unchanged[ser[const.RES_INFO]["id"]] = Server.from_data(ser)
+    return changes, selected, list(unchanged.values())
@@ -2,24 +2,27 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_FLOATING_IP = openstack.network.v2.floating_ip.FloatingIP
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_FLOATING_IP = None
 import time
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     exc,
     const,
     reference,
+    openstack_sdk,
     osm_resource,
+    server_port,
 )
 
 
-def server_floating_ips(conn, server_ports):
+def server_floating_ips(conn, server_ports, sdk_ser=None):
+    index = server_port.port_index(conn)
+    if index is not None and sdk_ser is not None:
+        sdk_fips = index.floating_ips(
+            sdk_ser, [port.info()["id"] for port in server_ports]
+        )
+        if sdk_fips is not None:
+            return sdk_fips
+
     sdk_fips = []
 
     # Typically a server will have one or a few ports, while there can
@@ -35,8 +38,10 @@ def server_floating_ips(conn, server_ports):
 
 class ServerFloatingIP(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_SERVER_FLOATING_IP
-    sdk_class = OPENSTACK_SDK_FLOATING_IP
+    sdk_class = openstack_sdk.LazyResourceClass("network.v2.floating_ip.FloatingIP")
 
     info_from_sdk = [
         "created_at",
@@ -2,29 +2,103 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_PORT = openstack.network.v2.port.Port
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_PORT = None
+import weakref
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     exc,
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 SERVER_PORT_ORDER_MAX = 1000
 
+_PORT_INDEXES = weakref.WeakKeyDictionary()
+
+
+class PortIndex:
+    """Ports and floating IPs of projects `project_ids`, fetched with
+    one listing of each per project and grouped by device ID and port
+    ID respectively. Serializing many servers then doesn't take
+    requests per server and port.
+
+    Ports and floating IPs owned by other projects than the server are
+    not indexed. Lookups return None when the server's Nova addresses
+    aren't all covered by the index, and callers query Neutron instead.
+    """
+
+    def __init__(self, conn, project_ids):
+        self.project_ids = set(project_id for project_id in project_ids if project_id)
+        # device_id -> [port, ...]
+        self._ports_by_device = {}
+        # port_id -> [floating IP, ...]
+        self._fips_by_port = {}
+        for project_id in self.project_ids:
+            for sdk_port in conn.network.ports(project_id=project_id):
+                self._ports_by_device.setdefault(sdk_port["device_id"], []).append(
+                    sdk_port
+                )
+            for sdk_fip in conn.network.ips(project_id=project_id):
+                if sdk_fip["port_id"]:
+                    self._fips_by_port.setdefault(sdk_fip["port_id"], []).append(
+                        sdk_fip
+                    )
+
+    def floating_ips(self, sdk_ser, port_ids):
+        """Returns: list of floating IPs attached to ports `port_ids` of
+        server `sdk_ser`, or None if the index may be missing some
+        """
+        if sdk_ser["project_id"] not in self.project_ids:
+            return None
+        sdk_fips = [
+            sdk_fip
+            for port_id in port_ids
+            for sdk_fip in self._fips_by_port.get(port_id, [])
+        ]
+        fip_addrs = set(sdk_fip["floating_ip_address"] for sdk_fip in sdk_fips)
+        if not set(_nova_ips(sdk_ser, "floating")) <= fip_addrs:
+            return None
+        return sdk_fips
+
+    def ports(self, sdk_ser):
+        """Returns: list of ports of server `sdk_ser`, or None if the
+        index may be missing some
+        """
+        if sdk_ser["project_id"] not in self.project_ids:
+            return None
+        sdk_ports = self._ports_by_device.get(sdk_ser["id"], [])
+        for ip in _nova_fixed_ips_sorted(sdk_ser):
+            if not any(_neutron_port_has_fixed_ip(p, ip) for p in sdk_ports):
+                return None
+        return list(sdk_ports)
+
+
+def port_index(conn):
+    """Returns: PortIndex used for connection `conn`, or None"""
+    return _PORT_INDEXES.get(conn)
+
+
+def use_port_index(conn, project_ids):
+    """Fetch a PortIndex of projects `project_ids` and use it to look
+    up ports and floating IPs of servers via connection `conn`.
+
+    Returns: the PortIndex
+    """
+    index = PortIndex(conn, project_ids)
+    _PORT_INDEXES[conn] = index
+    return index
+
 
 def server_ports(conn, sdk_ser):
+    index = port_index(conn)
+    sdk_ports = index.ports(sdk_ser) if index is not None else None
+    if sdk_ports is None:
+        sdk_ports = conn.network.ports(device_id=sdk_ser["id"])
     # the device_owner part after the colon varies - it is the availability zone
     sdk_ports = filter(
         lambda p: p.get("device_owner", "").startswith("compute:"),
-        conn.network.ports(device_id=sdk_ser["id"]),
+        sdk_ports,
     )
     return _ports_sorted_by_nova_order(sdk_ser, sdk_ports)
 
@@ -45,10 +119,14 @@ def _ports_sorted_by_nova_order(sdk_ser, sdk_ports):
 
 
 def _nova_fixed_ips_sorted(sdk_ser):
+    return _nova_ips(sdk_ser, "fixed")
+
+
+def _nova_ips(sdk_ser, ip_type):
     ips_sorted = []
     for net in sdk_ser["addresses"]:
         for addr in sdk_ser["addresses"][net]:
-            if addr.get("OS-EXT-IPS:type") != "fixed":
+            if addr.get("OS-EXT-IPS:type") != ip_type:
                 continue
             ips_sorted.append(addr["addr"])
     return ips_sorted
@@ -63,8 +141,10 @@ def _neutron_port_has_fixed_ip(sdk_port, ip):
 
 class ServerPort(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_SERVER_PORT
-    sdk_class = OPENSTACK_SDK_PORT
+    sdk_class = openstack_sdk.LazyResourceClass("network.v2.port.Port")
 
     info_from_sdk = [
         "id",
@@ -115,6 +195,17 @@ class ServerPort(osm_resource.Resource):
             "fixed_ip": refs["fixed_ips"][0]["ip_address"],
         }
 
+    @classmethod
+    def _prefetch_refs(cls, conn, resources):
+        network_refs = []
+        subnet_refs = []
+        for res in resources:
+            network_refs.append(res.params()["network_ref"])
+            for fixed_ip in res.params()["fixed_ips_refs"]:
+                subnet_refs.append(fixed_ip["subnet_ref"])
+        reference.prefetch_ids(conn, "network", network_refs)
+        reference.prefetch_ids(conn, "subnet", subnet_refs)
+
     @staticmethod
     def _refs_from_sdk(conn, sdk_res):
         refs = {}
@@ -2,32 +2,96 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_VOLUME = openstack.block_storage.v3.volume.Volume
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_VOLUME = None
+import threading
+import weakref
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     exc,
     const,
+    openstack_sdk,
     osm_resource,
 )
 
+_VOLUME_INDEXES = weakref.WeakKeyDictionary()
+
+
+class VolumeIndex:
+    """Volumes of projects `project_ids` by ID, fetched with one listing
+    per project on the first lookup. Serializing servers then doesn't
+    take a request per attached volume, and servers without volumes
+    don't need the volumes listed at all.
+
+    Volumes of projects other than the current one are listed with
+    `all_projects`, which requires admin privileges. Projects which
+    can't be listed (e.g. forbidden, or no block storage endpoint) are
+    skipped, lookups of their volumes return None and callers fetch
+    the volumes one by one instead.
+    """
+
+    def __init__(self, project_ids):
+        self.project_ids = set(project_id for project_id in project_ids if project_id)
+        self._volumes = None
+        self._lock = threading.Lock()
+
+    def _list_volumes(self, conn):
+        volumes = {}
+        current_project_id = conn.current_project_id
+        for project_id in self.project_ids:
+            if project_id == current_project_id:
+                filters = {}
+            else:
+                filters = {"all_projects": True, "project_id": project_id}
+            try:
+                for sdk_volume in conn.block_storage.volumes(details=True, **filters):
+                    volumes[sdk_volume["id"]] = sdk_volume
+            except openstack_sdk.exceptions().SDKException:
+                continue
+        return volumes
+
+    def volume(self, conn, volume_id):
+        """Returns: volume with `volume_id`, or None if not indexed"""
+        with self._lock:
+            if self._volumes is None:
+                self._volumes = self._list_volumes(conn)
+        return self._volumes.get(volume_id)
+
+
+def use_volume_index(conn, project_ids):
+    """Use a VolumeIndex of projects `project_ids` to look up volumes
+    attached to servers via connection `conn`. The volumes are listed
+    on the first lookup.
+
+    Returns: the VolumeIndex
+    """
+    index = VolumeIndex(project_ids)
+    _VOLUME_INDEXES[conn] = index
+    return index
+
+
+def volume_index(conn):
+    """Returns: VolumeIndex used for connection `conn`, or None"""
+    return _VOLUME_INDEXES.get(conn)
+
 
 def server_volumes(conn, sdk_res):
+    index = volume_index(conn)
     volumes = []
     for attachment in conn.compute.volume_attachments(sdk_res):
-        volumes.append(conn.block_storage.get_volume(attachment["volume_id"]))
+        volume = None
+        if index is not None:
+            volume = index.volume(conn, attachment["volume_id"])
+        if volume is None:
+            volume = conn.block_storage.get_volume(attachment["volume_id"])
+        volumes.append(volume)
     return volumes
 
 
 class ServerVolume(osm_resource.Resource):
 
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_SERVER_VOLUME
-    sdk_class = OPENSTACK_SDK_VOLUME
+    sdk_class = openstack_sdk.LazyResourceClass("block_storage.v3.volume.Volume")
 
     info_from_sdk = [
         "attachments",
@@ -2,25 +2,20 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_SUBNET = openstack.network.v2.subnet.Subnet
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_SUBNET = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     common,
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class Subnet(osm_resource.Resource):
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_SUBNET
-    sdk_class = OPENSTACK_SDK_SUBNET
+    sdk_class = openstack_sdk.LazyResourceClass("network.v2.subnet.Subnet")
 
     info_from_sdk = [
         "created_at",
@@ -83,6 +78,10 @@ class Subnet(osm_resource.Resource):
     def _find_sdk_res(conn, name_or_id, filters=None):
         return conn.network.find_subnet(name_or_id, **(filters or {}))
 
+    @staticmethod
+    def _list_sdk_res(conn, filters=None):
+        return conn.network.subnets(**(filters or {}))
+
     def _hook_after_update(self, conn, sdk_res, is_create):
         common.neutron_set_tags(conn, sdk_res, self.params()["tags"])
 
@@ -103,6 +102,12 @@ class Subnet(osm_resource.Resource):
         )
         return refs
 
+    @classmethod
+    def _prefetch_refs(cls, conn, resources):
+        reference.prefetch_ids(
+            conn, "network", [res.params()["network_ref"] for res in resources]
+        )
+
     def _refs_from_ser(self, conn):
         refs = {}
         refs["network_ref"] = self.params()["network_ref"]
@@ -2,24 +2,19 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_USER = openstack.identity.v3.user.User
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_USER = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class User(osm_resource.Resource):
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_USER
-    sdk_class = OPENSTACK_SDK_USER
+    sdk_class = openstack_sdk.LazyResourceClass("identity.v3.user.User")
 
     info_from_sdk = [
         "id",
@@ -2,24 +2,21 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-try:
-    import openstack
-    HAS_OPENSTACK = True
-    OPENSTACK_SDK_ROLE_ASSIGNMENT = openstack.identity.v3.role_assignment.RoleAssignment
-except ImportError:
-    HAS_OPENSTACK = False
-    OPENSTACK_SDK_ROLE_ASSIGNMENT = None
-
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
     reference,
+    openstack_sdk,
     osm_resource,
 )
 
 
 class UserProjectRoleAssignment(osm_resource.Resource):
+    __slots__ = ()
+
     resource_type = const.RES_TYPE_USER_PROJECT_ROLE_ASSIGNMENT
-    sdk_class = OPENSTACK_SDK_ROLE_ASSIGNMENT
+    sdk_class = openstack_sdk.LazyResourceClass(
+        "identity.v3.role_assignment.RoleAssignment"
+    )
 
     info_from_refs = [
         "project_id",
@@ -98,22 +95,14 @@ class UserProjectRoleAssignment(osm_resource.Resource):
 
         return False
 
-    def _is_same_resource(self, target_data):
-        """Check if `target_data` dict is the same resource as self.
-
-        Returns: True if the `target` is the same resource as self.
-        """
-        # if something else than ['type'] && ['_info']['id'] should be the
-        # deciding factors for sameness, just override the following method in
-        # the specific subclass
-        same_project = self.data[const.RES_INFO].get(
-            "project_id", "__undefined1__"
-        ) == target_data[const.RES_INFO].get("project_id", "__undefined2__")
-        same_role = self.data[const.RES_INFO].get(
-            "role_id", "__undefined1__"
-        ) == target_data[const.RES_INFO].get("role_id", "__undefined2__")
-        same_user = self.data[const.RES_INFO].get(
-            "user_id", "__undefined1__"
-        ) == target_data[const.RES_INFO].get("user_id", "__undefined2__")
-
-        return same_project and same_role and same_user
+    @classmethod
+    def _same_resource_key(cls, data):
+        # Role assignments have no ID of their own, they are
+        # identified by the project, role and user they bind together.
+        info = data.get(const.RES_INFO) or {}
+        key = []
+        for id_key in ["project_id", "role_id", "user_id"]:
+            if id_key not in info:
+                return None
+            key.append(osm_resource.hashable(info[id_key]))
+        return tuple(key)
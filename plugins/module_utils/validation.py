@@ -2,6 +2,8 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import itertools
+
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     resource_map,
     serialization,
@@ -13,23 +15,56 @@ def get_errors_in_file_structs(file_structs, resrc_map=None):
     structures. Validates unique resource naming, in the future should
     also validate internal format of resources.
 
+    `file_structs` can be any iterable (e.g. a generator loading the
+    files lazily), it is only iterated once. Resources are
+    instantiated and validated one at a time, so memory use doesn't
+    grow with the number of resources beyond what is needed for
+    duplicity detection.
+
     Returns: A list of validation error messages. Empty if all is ok.
     """
     if resrc_map is None:
         resrc_map = resource_map.RESOURCE_MAP
 
-    all_resource_structs = []
-    for file_struct in file_structs:
-        all_resource_structs.extend(file_struct["resources"])
-    all_resources, errors = serialization.create_resources_from_struct(
-        all_resource_structs, resrc_map
+    errors = []
+    data_errors = []
+    first_fingerprints = {}
+    duplicates = {}
+    all_resource_structs = itertools.chain.from_iterable(
+        file_struct["resources"] for file_struct in file_structs
     )
+    for resource in serialization.iter_resources_from_struct(
+        all_resource_structs, resrc_map, errors
+    ):
+        _record_import_id(first_fingerprints, duplicates, resource)
+        data_errors.extend(_resource_data_errors([resource]))
 
-    errors.extend(_resource_duplicate_name_errors(all_resources))
-    errors.extend(_resource_data_errors(all_resources))
+    errors.extend(_duplicate_import_id_errors(duplicates))
+    errors.extend(data_errors)
     return errors
 
 
+def _record_import_id(first_fingerprints, duplicates, resource):
+    """Record import identity of `resource`. `first_fingerprints` dict
+    maps identities to the importable fingerprint of the first resource
+    with that identity, `duplicates` dict maps identities seen more than
+    once to [count, whether the resources differ].
+    """
+    import_id = resource.import_id()
+    if not import_id:
+        return
+    # A prefix of the digest is plenty to tell the resources apart, and
+    # keeps the memory use low, as every resource has an entry.
+    fingerprint = bytes.fromhex(resource.importable_fingerprint()[:16])
+    first_fingerprint = first_fingerprints.get(import_id)
+    if first_fingerprint is None:
+        first_fingerprints[import_id] = fingerprint
+        return
+    duplicate = duplicates.setdefault(import_id, [1, False])
+    duplicate[0] += 1
+    duplicate[1] = duplicate[1] or fingerprint != first_fingerprint
+
+
 def _resource_data_errors(resources):
     errors = []
     for resource in resources:
@@ -39,24 +74,18 @@ def _resource_data_errors(resources):
     return errors
 
 
-def _resource_duplicate_name_errors(resources):
-    """Validate a `resources` list for duplicate naming.
-
-    Returns: A list of validation error messages. Empty if all is ok.
+def _duplicate_import_id_errors(duplicates):
+    """Returns: A list of validation error messages for import identities
+    in `duplicates` dict, as recorded by _record_import_id.
     """
-    import_id_counts = {}
-    for resource in resources:
-        import_id = resource.import_id()
-        if import_id:
-            count = import_id_counts.get(import_id, 0)
-            import_id_counts[import_id] = count + 1
-
     errors = []
-    for import_id, count in import_id_counts.items():
-        if count > 1:
-            errors.append(
-                f"Resource duplication: {count} resources with import identity '{import_id}'. "
-                "This would result in duplicit imports."
-            )
+    for import_id, (count, differ) in duplicates.items():
+        error = (
+            f"Resource duplication: {count} resources with import identity '{import_id}'. "
+            "This would result in duplicit imports."
+        )
+        if differ:
+            error += " The resources differ in their importable data."
+        errors.append(error)
 
     return errors
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+
+DOCUMENTATION = r"""
+---
+module: compact_resources_file
+
+short_description: Fold resources file journal into the resources file
+
+version_added: "2.9.0"
+
+author: "OpenStack tenant migration tools (@os-migrate)"
+
+description:
+  - "Fold changes recorded in the journal of an OS-Migrate YAML
+    resources file (see the I(journal) option of export modules) back
+    into the resources file, and remove the journal."
+
+options:
+  path:
+    description:
+      - Resources YAML file to compact.
+    required: true
+    type: str
+"""
+
+EXAMPLES = r"""
+- name: Export networks via journal
+  os_migrate.os_migrate.export_network:
+    path: /opt/os-migrate/networks.yml
+    name: "{{ item }}"
+    journal: true
+  loop: "{{ network_names }}"
+
+- name: Compact /opt/os-migrate/networks.yml
+  os_migrate.os_migrate.compact_resources_file:
+    path: /opt/os-migrate/networks.yml
+"""
+
+RETURN = r"""
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
+
+
+def run_module():
+    module_args = dict(
+        path=dict(type="str", required=True),
+    )
+
+    result = dict(
+        changed=False,
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        # TODO: Consider check mode. We'd report whether the journal
+        # exists.
+        # supports_check_mode=True,
+    )
+
+    result["changed"] = filesystem.compact_resources_file(module.params["path"])
+
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
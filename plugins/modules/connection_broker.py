@@ -0,0 +1,126 @@
+#!/usr/bin/python
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+
+DOCUMENTATION = r"""
+---
+module: connection_broker
+
+short_description: Start or stop the OpenStack connection broker
+
+version_added: "2.9.0"
+
+author: "OpenStack tenant migration tools (@os-migrate)"
+
+description:
+  - "Start or stop a local broker process which holds warm OpenStack
+    SDK connections and serves them to OS-Migrate modules over a Unix
+    socket. Modules given the socket path in their I(broker_socket_path)
+    option use the broker instead of connecting on their own, which
+    saves authentication and connection setup on each module run. When
+    no broker is serving at the path, modules connect on their own."
+  - "The broker resolves cloud names from C(clouds.yaml) and the
+    environment of the process which started it."
+
+options:
+  socket_path:
+    description:
+      - Path of the Unix socket the broker serves at. The socket is
+        created readable only by its owner.
+    required: true
+    type: str
+  state:
+    description:
+      - Whether the broker should be running.
+    required: false
+    default: started
+    choices: ['started', 'stopped']
+    type: str
+  idle_timeout:
+    description:
+      - The broker stops after this many seconds without requests.
+    required: false
+    default: 3600
+    type: int
+"""
+
+EXAMPLES = r"""
+- name: Start the connection broker
+  os_migrate.os_migrate.connection_broker:
+    socket_path: /opt/os-migrate/broker.sock
+
+- name: Export networks via the broker
+  os_migrate.os_migrate.export_network:
+    cloud: src
+    path: /opt/os-migrate/networks.yml
+    name: "{{ item }}"
+    broker_socket_path: /opt/os-migrate/broker.sock
+  loop: "{{ network_names }}"
+
+- name: Stop the connection broker
+  os_migrate.os_migrate.connection_broker:
+    socket_path: /opt/os-migrate/broker.sock
+    state: stopped
+"""
+
+RETURN = r"""
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    connection_broker,
+)
+
+
+def run_module():
+    module_args = dict(
+        socket_path=dict(type="str", required=True),
+        state=dict(type="str", default="started", choices=["started", "stopped"]),
+        idle_timeout=dict(type="int", default=connection_broker.DEFAULT_IDLE_TIMEOUT),
+    )
+
+    result = dict(
+        changed=False,
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    socket_path = module.params["socket_path"]
+    if module.params["state"] == "started":
+        if module.check_mode:
+            result["changed"] = not connection_broker.ping(socket_path)
+        else:
+            try:
+                result["changed"] = connection_broker.spawn(
+                    socket_path, module.params["idle_timeout"]
+                )
+            except (OSError, connection_broker.BrokerError) as e:
+                module.fail_json(msg=f"Cannot start connection broker: {str(e)}")
+    else:
+        if module.check_mode:
+            result["changed"] = connection_broker.ping(socket_path)
+        else:
+            result["changed"] = connection_broker.shutdown(socket_path)
+
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
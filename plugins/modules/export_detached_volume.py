@@ -47,6 +47,27 @@ options:
         it will be replaced.
     required: true
     type: str
+  journal:
+    description:
+      - Append changed resources to a journal file next to I(path)
+        instead of rewriting the whole resources file. The journal is
+        replayed whenever the resources file is read, and folded back
+        into it by M(os_migrate.os_migrate.compact_resources_file).
+      - The roles don't enable journaling, it is meant for playbooks
+        which call the module many times on the same large resources
+        file and compact the file afterwards.
+    required: false
+    type: bool
+    default: false
+  shard_size:
+    description:
+      - When the resources file at I(path) doesn't exist yet, create it
+        with sharded layout, storing at most this many resources per
+        shard under C(<path>.d/). Only the shards which change get
+        rewritten on subsequent exports.
+      - Existing resources files keep their layout.
+    required: false
+    type: int
   volume_id:
     description:
       - Volume ID of the detached volume to export.
@@ -68,18 +89,27 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import server_volume
 
 
 def run_module():
     argument_spec = os_auth.openstack_full_argument_spec(
         path=dict(type="str", required=True),
+        journal=dict(type="bool", required=False, default=False),
+        shard_size=dict(type="int", required=False, default=None),
         volume_id=dict(type="str", required=True),
     )
 
@@ -101,12 +131,16 @@ def run_module():
 
     if not sdk_volume["attachments"]:
         result["changed"] = filesystem.write_or_replace_resource(
-            module.params["path"], data
+            module.params["path"],
+            data,
+            journal=module.params["journal"],
+            shard_size=module.params["shard_size"],
         )
     else:
         result["failed"] = True
         result["errors"] = "Volume " + module.params["volume_id"] + " is not detached"
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
@@ -32,12 +32,43 @@ options:
       - Path to YAML resource file
     required: true
     type: str
+  journal:
+    description:
+      - Append changed resources to a journal file next to I(path)
+        instead of rewriting the whole resources file. The journal is
+        replayed whenever the resources file is read, and folded back
+        into it by M(os_migrate.os_migrate.compact_resources_file).
+      - The roles don't enable journaling, it is meant for playbooks
+        which call the module many times on the same large resources
+        file and compact the file afterwards.
+    required: false
+    type: bool
+    default: false
+  shard_size:
+    description:
+      - When the resources file at I(path) doesn't exist yet, create it
+        with sharded layout, storing at most this many resources per
+        shard under C(<path>.d/). Only the shards which change get
+        rewritten on subsequent exports.
+      - Existing resources files keep their layout.
+    required: false
+    type: int
 
   name:
     description:
       - Flavor name or ID
-    required: true
+      - Mutually exclusive with I(names).
+    required: false
     type: str
+  names:
+    description:
+      - Flavor names or IDs
+      - All the resources are exported with a single load and a single
+        write of the resources file at I(path).
+      - Mutually exclusive with I(name).
+    required: false
+    type: list
+    elements: str
 """
 
 EXAMPLES = r"""
@@ -53,6 +84,12 @@ changed:
   description: Whether the file changed
   returned: always
   type: bool
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -60,16 +97,24 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import flavor
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 
 
 def run_module():
 
     argument_spec = os_auth.openstack_full_argument_spec(
         path=dict(type="str", required=True),
-        name=dict(type="str", required=True),
+        journal=dict(type="bool", required=False, default=False),
+        shard_size=dict(type="int", required=False, default=None),
+        name=dict(type="str", required=False, default=None),
+        names=dict(type="list", required=False, default=None, elements="str"),
     )
 
-    module = AnsibleModule(argument_spec=argument_spec)
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=[("name", "names")],
+        required_one_of=[("name", "names")],
+    )
 
     result = dict(
         changed=False,
@@ -77,19 +122,27 @@ def run_module():
 
     conn = os_auth.get_connection(module)
 
-    try:
-        sdk_flavor = conn.compute.find_flavor(
-            module.params["name"], ignore_missing=False
-        )
-    except Exception as e:
-        module.fail_json(msg=f"Failed to fetch flavor: {str(e)}")
+    names = module.params["names"]
+    if names is None:
+        names = [module.params["name"]]
+
+    data = []
+    for name in names:
+        try:
+            sdk_flavor = conn.compute.find_flavor(name, ignore_missing=False)
+        except Exception as e:
+            module.fail_json(msg=f"Failed to fetch flavor: {str(e)}")
 
-    data = flavor.Flavor.from_sdk(conn, sdk_flavor)
+        data.append(flavor.Flavor.from_sdk(conn, sdk_flavor))
 
-    result["changed"] = filesystem.write_or_replace_resource(
-        module.params["path"], data
+    result["changed"] = filesystem.write_or_replace_resources(
+        module.params["path"],
+        data,
+        journal=module.params["journal"],
+        shard_size=module.params["shard_size"],
     )
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
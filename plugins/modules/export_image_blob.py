@@ -65,12 +65,19 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import image
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 
 
 def run_module():
@@ -96,6 +103,7 @@ def run_module():
     sdk_image = conn.image.find_image(module.params["name"], ignore_missing=False)
     result["changed"] = image.export_blob(conn, sdk_image, module.params["blob_path"])
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
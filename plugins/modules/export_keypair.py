@@ -46,6 +46,27 @@ options:
         it will be replaced.
     required: true
     type: str
+  journal:
+    description:
+      - Append changed resources to a journal file next to I(path)
+        instead of rewriting the whole resources file. The journal is
+        replayed whenever the resources file is read, and folded back
+        into it by M(os_migrate.os_migrate.compact_resources_file).
+      - The roles don't enable journaling, it is meant for playbooks
+        which call the module many times on the same large resources
+        file and compact the file afterwards.
+    required: false
+    type: bool
+    default: false
+  shard_size:
+    description:
+      - When the resources file at I(path) doesn't exist yet, create it
+        with sharded layout, storing at most this many resources per
+        shard under C(<path>.d/). Only the shards which change get
+        rewritten on subsequent exports.
+      - Existing resources files keep their layout.
+    required: false
+    type: int
   name:
     description:
       - Name (or ID) of a Nova Keypair to export.
@@ -74,6 +95,12 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -82,11 +109,14 @@ from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_au
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import keypair
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 
 
 def run_module():
     argument_spec = os_auth.openstack_full_argument_spec(
         path=dict(type="str", required=True),
+        journal=dict(type="bool", required=False, default=False),
+        shard_size=dict(type="int", required=False, default=None),
         name=dict(type="str", required=True),
         user_id=dict(type="str", required=False, default=None),
     )
@@ -112,9 +142,13 @@ def run_module():
     data = keypair.Keypair.from_sdk(conn, sdk_keypair)
 
     result["changed"] = filesystem.write_or_replace_resource(
-        module.params["path"], data
+        module.params["path"],
+        data,
+        journal=module.params["journal"],
+        shard_size=module.params["shard_size"],
     )
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
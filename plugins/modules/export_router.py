@@ -52,11 +52,42 @@ options:
         it will be replaced.
     required: true
     type: str
+  journal:
+    description:
+      - Append changed resources to a journal file next to I(path)
+        instead of rewriting the whole resources file. The journal is
+        replayed whenever the resources file is read, and folded back
+        into it by M(os_migrate.os_migrate.compact_resources_file).
+      - The roles don't enable journaling, it is meant for playbooks
+        which call the module many times on the same large resources
+        file and compact the file afterwards.
+    required: false
+    type: bool
+    default: false
+  shard_size:
+    description:
+      - When the resources file at I(path) doesn't exist yet, create it
+        with sharded layout, storing at most this many resources per
+        shard under C(<path>.d/). Only the shards which change get
+        rewritten on subsequent exports.
+      - Existing resources files keep their layout.
+    required: false
+    type: int
   name:
     description:
       - Name (or ID) of a Router to export.
-    required: true
+      - Mutually exclusive with I(names).
+    required: false
     type: str
+  names:
+    description:
+      - Names (or IDs) of Routers to export.
+      - All the resources are exported with a single load and a single
+        write of the resources file at I(path).
+      - Mutually exclusive with I(name).
+    required: false
+    type: list
+    elements: str
   cloud:
     description:
       - Cloud configuration from clouds.yml
@@ -73,6 +104,12 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -83,12 +120,16 @@ from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     filesystem,
     router,
 )
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 
 
 def run_module():
     argument_spec = os_auth.openstack_full_argument_spec(
         path=dict(type="str", required=True),
-        name=dict(type="str", required=True),
+        journal=dict(type="bool", required=False, default=False),
+        shard_size=dict(type="int", required=False, default=None),
+        name=dict(type="str", required=False, default=None),
+        names=dict(type="list", required=False, default=None, elements="str"),
     )
     # TODO: check the del
     # del argument_spec['cloud']
@@ -99,17 +140,31 @@ def run_module():
 
     module = AnsibleModule(
         argument_spec=argument_spec,
+        mutually_exclusive=[("name", "names")],
+        required_one_of=[("name", "names")],
         # TODO: Consider check mode. We'd fetch the resource and check
         # if the file representation matches it.
         # supports_check_mode=True,
     )
 
     conn = os_auth.get_connection(module)
-    sdk_rtr = conn.network.find_router(module.params["name"], ignore_missing=False)
-    rtr = router.Router.from_sdk(conn, sdk_rtr)
-
-    result["changed"] = filesystem.write_or_replace_resource(module.params["path"], rtr)
+    names = module.params["names"]
+    if names is None:
+        names = [module.params["name"]]
+
+    rtrs = []
+    for name in names:
+        sdk_rtr = conn.network.find_router(name, ignore_missing=False)
+        rtrs.append(router.Router.from_sdk(conn, sdk_rtr))
+
+    result["changed"] = filesystem.write_or_replace_resources(
+        module.params["path"],
+        rtrs,
+        journal=module.params["journal"],
+        shard_size=module.params["shard_size"],
+    )
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
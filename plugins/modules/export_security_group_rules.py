@@ -52,11 +52,42 @@ options:
         it will be replaced.
     required: true
     type: str
+  journal:
+    description:
+      - Append changed resources to a journal file next to I(path)
+        instead of rewriting the whole resources file. The journal is
+        replayed whenever the resources file is read, and folded back
+        into it by M(os_migrate.os_migrate.compact_resources_file).
+      - The roles don't enable journaling, it is meant for playbooks
+        which call the module many times on the same large resources
+        file and compact the file afterwards.
+    required: false
+    type: bool
+    default: false
+  shard_size:
+    description:
+      - When the resources file at I(path) doesn't exist yet, create it
+        with sharded layout, storing at most this many resources per
+        shard under C(<path>.d/). Only the shards which change get
+        rewritten on subsequent exports.
+      - Existing resources files keep their layout.
+    required: false
+    type: int
   name:
     description:
       - Name of the security group. OS-Migrate requires unique resource names.
-    required: true
+      - Mutually exclusive with I(names).
+    required: false
     type: str
+  names:
+    description:
+      - Names of the security groups whose rules to export.
+      - All the resources are exported with a single load and a single
+        write of the resources file at I(path).
+      - Mutually exclusive with I(name).
+    required: false
+    type: list
+    elements: str
   cloud:
     description:
       - Clouds resource from clouds.yml
@@ -74,6 +105,12 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -81,6 +118,7 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     security_group_rule,
 )
@@ -89,7 +127,10 @@ from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
 def run_module():
     argument_spec = os_auth.openstack_full_argument_spec(
         path=dict(type="str", required=True),
-        name=dict(type="str", required=True),
+        journal=dict(type="bool", required=False, default=False),
+        shard_size=dict(type="int", required=False, default=None),
+        name=dict(type="str", required=False, default=None),
+        names=dict(type="list", required=False, default=None, elements="str"),
     )
     # TODO: check the del
     # del argument_spec['cloud']
@@ -100,26 +141,36 @@ def run_module():
 
     module = AnsibleModule(
         argument_spec=argument_spec,
+        mutually_exclusive=[("name", "names")],
+        required_one_of=[("name", "names")],
         # TODO: Consider check mode. We'd fetch the resource and check
         # if the file representation matches it.
         # supports_check_mode=True,
     )
 
     conn = os_auth.get_connection(module)
-    sdk_sec = conn.network.find_security_group(
-        module.params["name"], ignore_missing=False
+    names = module.params["names"]
+    if names is None:
+        names = [module.params["name"]]
+
+    ser_rules = []
+    for name in names:
+        sdk_sec = conn.network.find_security_group(name, ignore_missing=False)
+        sdk_rules = conn.network.security_group_rules(security_group_id=sdk_sec["id"])
+
+        for sdk_rule in sdk_rules:
+            ser_rules.append(
+                security_group_rule.SecurityGroupRule.from_sdk(conn, sdk_rule)
+            )
+
+    result["changed"] = filesystem.write_or_replace_resources(
+        module.params["path"],
+        ser_rules,
+        journal=module.params["journal"],
+        shard_size=module.params["shard_size"],
     )
-    sdk_rules = conn.network.security_group_rules(security_group_id=sdk_sec["id"])
-
-    result["changed"] = False
-
-    for sdk_rule in sdk_rules:
-        ser_rule = security_group_rule.SecurityGroupRule.from_sdk(conn, sdk_rule)
-
-        rchanged = filesystem.write_or_replace_resource(module.params["path"], ser_rule)
-        if rchanged:
-            result["changed"] = True
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
@@ -57,17 +57,80 @@ options:
         it will be replaced.
     required: true
     type: str
+  journal:
+    description:
+      - Append changed resources to a journal file next to I(path)
+        instead of rewriting the whole resources file. The journal is
+        replayed whenever the resources file is read, and folded back
+        into it by M(os_migrate.os_migrate.compact_resources_file).
+      - The roles don't enable journaling, it is meant for playbooks
+        which call the module many times on the same large resources
+        file and compact the file afterwards.
+    required: false
+    type: bool
+    default: false
+  shard_size:
+    description:
+      - When the resources file at I(path) doesn't exist yet, create it
+        with sharded layout, storing at most this many resources per
+        shard under C(<path>.d/). Only the shards which change get
+        rewritten on subsequent exports.
+      - Existing resources files keep their layout.
+    required: false
+    type: int
   name:
     description:
       - Name (or ID) of an instance to export.
-    required: true
+      - Mutually exclusive with I(names).
+    required: false
     type: str
+  names:
+    description:
+      - Names (or IDs) of instances to export.
+      - All the resources are exported with a single load and a single
+        write of the resources file at I(path).
+      - Mutually exclusive with I(name).
+    required: false
+    type: list
+    elements: str
+  workers:
+    description:
+      - Number of instances to fetch concurrently when exporting
+        I(names). Each instance takes several API requests to export
+        (ports, floating IPs, volumes, security groups), fetching them
+        concurrently makes exporting many instances faster.
+    required: false
+    type: int
+    default: 1
+  incremental:
+    description:
+      - Only export instances which changed since the previous
+        incremental export into I(path), or which are not in I(path)
+        yet. Changed instances are found by listing instances with the
+        C(changes-since) filter, and the latest C(updated_at) seen is
+        stored as a high-water mark in C(<path>.marks) after each
+        successful export. Instances which aren't exported again still
+        get I(migration_params) applied in I(path).
+      - Changes of ports, floating IPs and volumes which don't update
+        the instance itself are not detected. Removing C(<path>.marks)
+        makes the next export a full one.
+    required: false
+    type: bool
+    default: false
   migration_params:
     description:
       - Dictionary with parameters for the migration procedure.
     required: false
     type: dict
     default: {}
+  image_catalog:
+    description:
+      - List all images visible to the user once, and look up the
+        images the instances were booted from in that list instead of
+        querying Glance for each of them.
+    required: false
+    type: bool
+    default: false
   cloud:
     description:
       - Cloud resource from clouds.yml
@@ -81,23 +144,56 @@ EXAMPLES = r"""
   os_migrate.os_migrate.export_workload:
     path: /opt/os-migrate/workloads.yml
     name: migration-vm
+
+- name: Export several instances in a single module run
+  os_migrate.os_migrate.export_workload:
+    path: /opt/os-migrate/workloads.yml
+    names:
+      - migration-vm
+      - other-migration-vm
+
+- name: Export many instances, fetching 8 at a time
+  os_migrate.os_migrate.export_workload:
+    path: /opt/os-migrate/workloads.yml
+    names: "{{ instance_names }}"
+    workers: 8
+
+- name: Re-export only the instances which changed since the last run
+  os_migrate.os_migrate.export_workload:
+    path: /opt/os-migrate/workloads.yml
+    names: "{{ instance_names }}"
+    incremental: true
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
 
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import server
 
 
 def run_module():
     argument_spec = os_auth.openstack_full_argument_spec(
         path=dict(type="str", required=True),
-        name=dict(type="str", required=True),
+        journal=dict(type="bool", required=False, default=False),
+        shard_size=dict(type="int", required=False, default=None),
+        name=dict(type="str", required=False, default=None),
+        names=dict(type="list", required=False, default=None, elements="str"),
+        workers=dict(type="int", required=False, default=1),
+        incremental=dict(type="bool", required=False, default=False),
         migration_params=dict(type="dict", required=False, default={}),
+        image_catalog=dict(type="bool", required=False, default=False),
     )
     # TODO: check the del
     # del argument_spec['cloud']
@@ -108,21 +204,48 @@ def run_module():
 
     module = AnsibleModule(
         argument_spec=argument_spec,
+        mutually_exclusive=[("name", "names")],
+        required_one_of=[("name", "names")],
         # TODO: Consider check mode. We'd fetch the resource and check
         # if the file representation matches it.
         # supports_check_mode=True,
     )
 
     conn = os_auth.get_connection(module)
-    sdk_server_nodetails = conn.compute.find_server(
-        module.params["name"], ignore_missing=False
-    )
-    sdk_server = conn.compute.get_server(sdk_server_nodetails["id"])
-    srv = server.Server.from_sdk(conn, sdk_server)
-    srv.update_migration_params(module.params["migration_params"])
+    if module.params["image_catalog"]:
+        reference.use_image_catalog(conn)
+    names = module.params["names"]
+    if names is None:
+        names = [module.params["name"]]
 
-    result["changed"] = filesystem.write_or_replace_resource(module.params["path"], srv)
+    changes = None
+    unchanged = []
+    if module.params["incremental"]:
+        changes, names, unchanged = server.changed_servers(
+            conn, module.params["path"], names
+        )
+
+    srvs = server.Server.from_names(conn, names, workers=module.params["workers"])
+    # Servers which haven't changed are kept as exported, but they
+    # still take the current migration params.
+    srvs.extend(unchanged)
+    for srv in srvs:
+        srv.update_migration_params(module.params["migration_params"])
+
+    result["changed"] = filesystem.write_or_replace_resources(
+        module.params["path"],
+        srvs,
+        journal=module.params["journal"],
+        shard_size=module.params["shard_size"],
+    )
+    if changes is not None:
+        changes.add_exported(srvs)
+        if changes.mark is not None:
+            filesystem.write_export_mark(
+                module.params["path"], const.RES_TYPE_SERVER, changes.mark
+            )
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
@@ -61,6 +61,14 @@ options:
         already performed and the module doesn't overwrite it.
     required: true
     type: str
+  image_catalog:
+    description:
+      - List all images visible to the user once, and look up the
+        existing image and its kernel and ramdisk images from that
+        list instead of querying Glance for each of them.
+    required: false
+    type: bool
+    default: false
   cloud:
     description:
       - Cloud from clouds.yaml to use.
@@ -81,12 +89,19 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import image
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 
 
 def run_module():
@@ -94,6 +109,7 @@ def run_module():
         data=dict(type="dict", required=True),
         blob_path=dict(type="str", required=True),
         filters=dict(type="dict", required=False, default={}),
+        image_catalog=dict(type="bool", required=False, default=False),
     )
     # TODO: check the del
     # del argument_spec['cloud']
@@ -110,11 +126,14 @@ def run_module():
     )
 
     conn = os_auth.get_connection(module)
+    if module.params["image_catalog"]:
+        reference.use_image_catalog(conn)
     ser_img = image.Image.from_data(module.params["data"])
     result["changed"] = ser_img.create_or_update(
         conn, module.params["filters"], module.params["blob_path"]
     )
 
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
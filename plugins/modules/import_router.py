@@ -46,8 +46,19 @@ options:
   data:
     description:
       - Data structure with router parameters as loaded from OS-Migrate YAML file.
-    required: true
+      - Mutually exclusive with I(data_list).
+    required: false
     type: dict
+  data_list:
+    description:
+      - List of data structures as in I(data), all imported in a single module
+        run. Existing routers are looked up with a single listing where
+        supported, and references shared by the routers are resolved
+        once rather than per item.
+      - Mutually exclusive with I(data).
+    required: false
+    type: list
+    elements: dict
   filters:
     description:
       - Options for filtering existing resources to be looked up, e.g. by project.
@@ -73,17 +84,25 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+reference_cache_stats:
+  description:
+    - Hit and miss counts and size of the reference lookup cache, for
+      tuning I(reference_cache_size) and I(reference_cache_ttl).
+  returned: always
+  type: dict
 """
 
 from ansible.module_utils.basic import AnsibleModule
 
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import router
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
 
 
 def run_module():
     argument_spec = os_auth.openstack_full_argument_spec(
-        data=dict(type="dict", required=True),
+        data=dict(type="dict", required=False, default=None),
+        data_list=dict(type="list", required=False, default=None, elements="dict"),
         filters=dict(type="dict", required=False, default={}),
     )
     # TODO: check the del
@@ -95,15 +114,28 @@ def run_module():
 
     module = AnsibleModule(
         argument_spec=argument_spec,
+        mutually_exclusive=[("data", "data_list")],
+        required_one_of=[("data", "data_list")],
         # TODO: Consider check mode. We'd fetch the resource and check
         # if the file representation matches it.
         # supports_check_mode=True,
     )
 
     conn = os_auth.get_connection(module)
-    rtr = router.Router.from_data(module.params["data"])
-    result["changed"] = rtr.create_or_update(conn, module.params["filters"])
-
+    if module.params["data_list"] is None:
+        rtr = router.Router.from_data(module.params["data"])
+        result["changed"] = rtr.create_or_update(conn, module.params["filters"])
+    else:
+        resources = [
+            router.Router.from_data(data) for data in module.params["data_list"]
+        ]
+        result["changed"] = any(
+            router.Router.create_or_update_all(
+                conn, resources, module.params["filters"]
+            )
+        )
+
+    result["reference_cache_stats"] = reference.reference_cache(conn).stats()
     module.exit_json(**result)
 
 
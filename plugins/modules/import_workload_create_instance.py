@@ -66,6 +66,14 @@ options:
     required: true
     type: list
     elements: dict
+  image_catalog:
+    description:
+      - List all images visible to the user once, and look up the
+        image to boot the instance from in that list instead of
+        querying Glance for it.
+    required: false
+    type: bool
+    default: false
 """
 
 EXAMPLES = r"""
@@ -212,6 +220,7 @@ server_id:
 from ansible.module_utils.basic import AnsibleModule
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import server
 
 
@@ -219,6 +228,7 @@ def run_module():
     argument_spec = os_auth.openstack_full_argument_spec(
         data=dict(type="dict", required=True),
         block_device_mapping=dict(type="list", required=True, elements="dict"),
+        image_catalog=dict(type="bool", required=False, default=False),
     )
 
     result = dict(
@@ -230,6 +240,8 @@ def run_module():
     )
 
     conn = os_auth.get_connection(module)
+    if module.params["image_catalog"]:
+        reference.use_image_catalog(conn)
     block_device_mapping = module.params["block_device_mapping"]
 
     ser_server = server.Server.from_data(module.params["data"])
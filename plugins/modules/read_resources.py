@@ -27,9 +27,70 @@ description:
 options:
   path:
     description:
-      - Resources YAML file to read.
+      - Resources YAML file to read, either a regular or a sharded one
+        (see the I(shard_size) option of export modules).
     required: true
     type: str
+  cache:
+    description:
+      - Cache the parsed resource file next to it (as C(<path>.cache)) and
+        reuse the cache while the file doesn't change.
+      - The cache is a Python pickle, only enable it if the directory
+        with the resource file is trusted.
+    required: false
+    type: bool
+    default: false
+  import_ids:
+    description:
+      - Only return resources with these import identities
+        (e.g. C(openstack.network.Network:mynetwork)).
+      - For sharded resource files, only the shards holding these
+        resources are read.
+    required: false
+    type: list
+    elements: str
+  types:
+    description:
+      - Only return resources of these types.
+    required: false
+    type: list
+    elements: str
+  queries:
+    description:
+      - Only return resources where the value under I(query_attribute)
+        matches at least one of the queries.
+      - Each query is either a string for an exact match, or a dict
+        with C(regex) key for a regex match, same as with the
+        C(os_migrate.os_migrate.stringfilter) filter.
+    required: false
+    type: list
+    elements: raw
+  query_attribute:
+    description:
+      - Dot-separated path to the value within each resource which
+        I(queries) are matched against.
+    required: false
+    type: str
+    default: params.name
+  offset:
+    description:
+      - Number of matching resources to skip.
+    required: false
+    type: int
+    default: 0
+  limit:
+    description:
+      - Maximum number of resources to return. All matching resources
+        are returned when omitted.
+    required: false
+    type: int
+  fields:
+    description:
+      - Only return these keys of each resource. Each field is a
+        dot-separated path into the resource, e.g. C(params.name).
+    required: false
+    type: list
+    elements: str
 """
 
 EXAMPLES = r"""
@@ -41,6 +102,16 @@ EXAMPLES = r"""
 - name: Debug-print resources
   debug:
     msg: "{{ read_networks.resources }}"
+
+- name: Read names of first 100 networks with a 'prod-' prefix
+  os_migrate.os_migrate.read_resources:
+    path: /opt/os-migrate/networks.yml
+    queries:
+      - regex: '^prod-'
+    limit: 100
+    fields:
+      - params.name
+  register: read_prod_networks
 """
 
 RETURN = r"""
@@ -61,16 +132,34 @@ resources:
             description: Additional resource information, not needed for import.
             returned: success
             type: dict
+total:
+    description:
+      - Number of resources matching I(types) and I(queries), before
+        applying I(offset) and I(limit).
+    returned: success
+    type: int
 """
 
 from ansible.module_utils.basic import AnsibleModule
 
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import exc
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    serialization,
+)
 
 
 def run_module():
     module_args = dict(
         path=dict(type="str", required=True),
+        cache=dict(type="bool", required=False, default=False),
+        import_ids=dict(type="list", required=False, default=None, elements="str"),
+        types=dict(type="list", required=False, default=None, elements="str"),
+        queries=dict(type="list", required=False, default=None, elements="raw"),
+        query_attribute=dict(type="str", required=False, default="params.name"),
+        offset=dict(type="int", required=False, default=0),
+        limit=dict(type="int", required=False, default=None),
+        fields=dict(type="list", required=False, default=None, elements="str"),
     )
 
     result = dict(
@@ -85,8 +174,23 @@ def run_module():
         supports_check_mode=True,
     )
 
-    struct = filesystem.load_resources_file(module.params["path"])
-    result["resources"] = struct["resources"]
+    struct = filesystem.load_resources_file(
+        module.params["path"],
+        cache=module.params["cache"],
+        import_ids=module.params["import_ids"],
+    )
+    try:
+        result["resources"], result["total"] = serialization.select_resources(
+            struct["resources"],
+            types=module.params["types"],
+            queries=module.params["queries"],
+            query_attribute=module.params["query_attribute"],
+            offset=module.params["offset"],
+            limit=module.params["limit"],
+            fields=module.params["fields"],
+        )
+    except exc.InvalidQuery as e:
+        module.fail_json(msg=str(e), **result)
 
     module.exit_json(**result)
 
@@ -27,7 +27,9 @@ description:
 options:
   path:
     description:
-      - Path to workloads YAML file
+      - Path to workloads YAML file. Sharded and journaled workloads
+        files are updated the same way as by
+        M(os_migrate.os_migrate.export_workload).
     required: true
     type: str
   instance_id:
@@ -66,11 +68,9 @@ RETURN = r"""
 """
 
 from ansible.module_utils.basic import AnsibleModule
-try:
-    import yaml
-    HAS_YAML = True
-except ImportError:
-    HAS_YAML = False
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import exc
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import server
 
 
 def run_module():
@@ -88,39 +88,14 @@ def run_module():
         argument_spec=argument_spec,
     )
 
-    path = module.params["path"]
-    instance_id = module.params["instance_id"]
-    nbdkit_disks = module.params["nbdkit_disks"]
-
-    # Read the workloads file
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-    except Exception as e:
-        module.fail_json(msg=f"Failed to read workloads file: {str(e)}")
-
-    # Find and update the workload
-    found = False
-    for resource in data.get("resources", []):
-        if resource.get("_info", {}).get("id") == instance_id:
-            # Update migration_params with list of disks
-            if "_migration_params" not in resource:
-                resource["_migration_params"] = {}
-
-            resource["_migration_params"]["nbdkit_disks"] = nbdkit_disks
-            found = True
-            result["changed"] = True
-            break
-
-    if not found:
-        module.fail_json(msg=f"Workload with instance_id {instance_id} not found in {path}")
-
-    # Write back the file
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-    except Exception as e:
-        module.fail_json(msg=f"Failed to write workloads file: {str(e)}")
+        result["changed"] = server.update_nbdkit_disks(
+            module.params["path"],
+            module.params["instance_id"],
+            module.params["nbdkit_disks"],
+        )
+    except exc.InconsistentState as e:
+        module.fail_json(msg=str(e), **result)
 
     module.exit_json(**result)
 
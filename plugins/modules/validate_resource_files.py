@@ -32,6 +32,15 @@ options:
     required: true
     type: list
     elements: str
+  cache:
+    description:
+      - Cache the parsed resource files next to them (as C(<path>.cache))
+        and reuse the cache while the files don't change.
+      - The cache is a Python pickle, only enable it if the directory
+        with resource files is trusted.
+    required: false
+    type: bool
+    default: false
 """
 
 EXAMPLES = r"""
@@ -69,6 +78,7 @@ from ansible_collections.os_migrate.os_migrate.plugins.module_utils import valid
 def run_module():
     module_args = dict(
         paths=dict(type="list", required=True, elements="str"),
+        cache=dict(type="bool", required=False, default=False),
     )
 
     result = dict(
@@ -85,9 +95,12 @@ def run_module():
         supports_check_mode=True,
     )
 
-    file_structs = []
-    for path in module.params["paths"]:
-        file_structs.append(filesystem.load_resources_file(path))
+    # Load the files lazily, only one of them needs to be kept in
+    # memory at a time.
+    file_structs = (
+        filesystem.load_resources_file(path, cache=module.params["cache"])
+        for path in module.params["paths"]
+    )
     errors = validation.get_errors_in_file_structs(file_structs)
 
     if len(errors) == 0:
@@ -32,6 +32,8 @@ def minimal_resource_file_struct():
 
 class MinimalResource(resource.Resource):
 
+    __slots__ = ()
+
     resource_type = "openstack.Minimal"
     sdk_class = dict
 
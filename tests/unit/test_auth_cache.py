@@ -0,0 +1,78 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import auth_cache
+
+
+class FakeAuth:
+
+    def __init__(self, expires_soon=False):
+        self.auth_ref = None
+        self.expires_soon = expires_soon
+
+    def get_auth_state(self):
+        return '{"auth_token": "token"}'
+
+    def invalidate(self):
+        self.auth_ref = None
+
+    def set_auth_state(self, state):
+        self.auth_ref = mock.Mock()
+        self.auth_ref.will_expire_soon.return_value = self.expires_soon
+
+
+def fake_conn(auth, auth_url="http://keystone"):
+    conn = mock.Mock()
+    conn.session.auth = auth
+    conn.config.get_auth_args.return_value = {"auth_url": auth_url}
+    conn.config.get_region_name.return_value = "regionOne"
+    conn.config.get_interface.return_value = "public"
+    return conn
+
+
+class TestAuthCache(unittest.TestCase):
+
+    def test_reuse_auth_state(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "auth_cache.json")
+            conn1 = fake_conn(FakeAuth())
+            self.assertFalse(auth_cache.reuse_auth_state(conn1, file_path))
+            conn1.session.get_token.assert_called_once()
+            self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o600)
+
+            conn2 = fake_conn(FakeAuth())
+            self.assertTrue(auth_cache.reuse_auth_state(conn2, file_path))
+            conn2.session.get_token.assert_not_called()
+
+            # Different cloud config doesn't get the token.
+            conn3 = fake_conn(FakeAuth(), auth_url="http://other")
+            self.assertFalse(auth_cache.reuse_auth_state(conn3, file_path))
+            conn3.session.get_token.assert_called_once()
+
+    def test_expiring_token_is_not_reused(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "auth_cache.json")
+            auth_cache.reuse_auth_state(fake_conn(FakeAuth()), file_path)
+
+            auth = FakeAuth(expires_soon=True)
+            conn = fake_conn(auth)
+            self.assertFalse(auth_cache.reuse_auth_state(conn, file_path))
+            conn.session.get_token.assert_called_once()
+            self.assertIsNone(auth.auth_ref)
+
+    def test_damaged_cache_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "auth_cache.json")
+            with open(file_path, "w") as f:
+                f.write('{"trunc')
+            conn = fake_conn(FakeAuth())
+            self.assertFalse(auth_cache.reuse_auth_state(conn, file_path))
+            self.assertTrue(
+                auth_cache.reuse_auth_state(fake_conn(FakeAuth()), file_path)
+            )
@@ -0,0 +1,126 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import openstack
+from openstack.network.v2 import network
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    connection_broker,
+)
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
+
+
+class FakeNetworkProxy:
+
+    def find_network(self, name_or_id, ignore_missing=True):
+        if name_or_id == "net":
+            return network.Network.existing(id="uuid-net", name="net")
+        if ignore_missing:
+            return None
+        raise openstack.exceptions.ResourceNotFound(
+            f"No Network found for {name_or_id}"
+        )
+
+    def networks(self, **filters):
+        yield network.Network.existing(id="uuid-net", name="net", **filters)
+
+
+class FakeConnection:
+
+    def __init__(self, cloud):
+        self.cloud = cloud
+        self.current_project_id = f"{cloud}-project-id"
+        self.network = FakeNetworkProxy()
+        self.barrier = threading.Barrier(2, timeout=10)
+
+    def rendezvous(self):
+        return self.barrier.wait()
+
+
+class TestConnectionBroker(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.socket_path = os.path.join(tmpdir.name, "broker.sock")
+        self.connects = []
+
+        def connect(**kwargs):
+            self.connects.append(kwargs)
+            return FakeConnection(**kwargs)
+
+        self.server = connection_broker.BrokerServer(self.socket_path, connect)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.addCleanup(self.thread.join)
+        self.addCleanup(self.server.shutdown)
+
+    def test_brokered_connection(self):
+        self.assertTrue(connection_broker.ping(self.socket_path))
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+        conn = connection_broker.BrokeredConnection(self.socket_path, {"cloud": "src"})
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.current_project_id, "src-project-id")
+        net = conn.network.find_network("net")
+        self.assertIsInstance(net, network.Network)
+        self.assertEqual(net.id, "uuid-net")
+        self.assertIsNone(conn.network.find_network("missing"))
+        with self.assertRaises(openstack.exceptions.ResourceNotFound):
+            conn.network.find_network("missing", ignore_missing=False)
+        nets = conn.network.networks(project_id="src-project-id")
+        self.assertEqual([n.project_id for n in nets], ["src-project-id"])
+
+    def test_connections_are_shared(self):
+        src1 = connection_broker.BrokeredConnection(self.socket_path, {"cloud": "src"})
+        src2 = connection_broker.BrokeredConnection(self.socket_path, {"cloud": "src"})
+        dst = connection_broker.BrokeredConnection(self.socket_path, {"cloud": "dst"})
+        for conn in (src1, src2, dst):
+            self.addCleanup(conn.close)
+        self.assertEqual(src2.current_project_id, "src-project-id")
+        self.assertEqual(dst.current_project_id, "dst-project-id")
+        self.assertEqual(self.connects, [{"cloud": "src"}, {"cloud": "dst"}])
+
+    def test_threads_are_served_concurrently(self):
+        conn = connection_broker.BrokeredConnection(self.socket_path, {"cloud": "src"})
+        self.addCleanup(conn.close)
+        # Both calls must be in the broker at the same time to get past
+        # the barrier.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda _: conn.rendezvous(), range(2)))
+        self.assertEqual(sorted(results), [0, 1])
+
+    def test_remote_methods_are_cached_references(self):
+        conn = connection_broker.BrokeredConnection(self.socket_path, {"cloud": "src"})
+        self.addCleanup(conn.close)
+        self.assertIs(conn.network.find_network, conn.network.find_network)
+        ref = {"name": "net", "project_name": None, "domain_name": None}
+        self.assertEqual(reference.network_id(conn, ref), "uuid-net")
+        self.assertEqual(reference.network_id(conn, ref), "uuid-net")
+        self.assertEqual(reference.reference_cache(conn).stats()["hits"], 1)
+
+    def test_shutdown(self):
+        self.assertTrue(connection_broker.shutdown(self.socket_path))
+        self.thread.join()
+        self.assertFalse(os.path.exists(self.socket_path))
+        self.assertFalse(connection_broker.ping(self.socket_path))
+        self.assertFalse(connection_broker.shutdown(self.socket_path))
+
+    def test_connect_timeout(self):
+        # A socket which accepts connections but never answers them.
+        unresponsive_path = self.socket_path + ".unresponsive"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(unresponsive_path)
+            listener.listen(1)
+            with self.assertRaises(socket.timeout):
+                connection_broker.BrokeredConnection(
+                    unresponsive_path, {"cloud": "src"}, connect_timeout=0.1
+                )
@@ -2,9 +2,15 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import copy
+import json
+import multiprocessing
+import os
+import time
 import yaml
 from os import path
 import unittest
+from unittest import mock
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import exc
@@ -57,6 +63,364 @@ class TestFilesystem(unittest.TestCase):
             self.assertEqual(resource1["_info"]["id"], "id-minimal2")
             self.assertEqual(resource1["params"]["description"], "minimal two")
 
+    def test_write_or_replace_resources(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            with open(file_path, "w", encoding="utf8") as f:
+                f.write(yaml.dump(fixtures.minimal_resource_file_struct()))
+
+            minimal = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+            minimal.data[const.RES_PARAMS]["description"] = "minimal updated"
+            minimal2 = fixtures.MinimalResource.from_data(
+                fixtures.valid_minimalresource_data()
+            )
+            minimal2.data[const.RES_PARAMS]["name"] = "minimal2"
+            minimal2.data[const.RES_INFO]["id"] = "id-minimal2"
+            self.assertTrue(
+                filesystem.write_or_replace_resources(file_path, [minimal, minimal2])
+            )
+            # repeated replacement should report no changes - return False
+            self.assertFalse(
+                filesystem.write_or_replace_resources(file_path, [minimal, minimal2])
+            )
+            self.assertFalse(filesystem.write_or_replace_resources(file_path, []))
+
+            file_struct = filesystem.load_resources_file(file_path)
+            self.assertEqual(len(file_struct["resources"]), 2)
+            resource0 = file_struct["resources"][0]
+            resource1 = file_struct["resources"][1]
+            self.assertEqual(resource0["_info"]["id"], "id-minimal")
+            self.assertEqual(resource0["params"]["description"], "minimal updated")
+            self.assertEqual(resource1["_info"]["id"], "id-minimal2")
+            self.assertEqual(resource1["params"]["name"], "minimal2")
+
+    def test_write_or_replace_resources_nothing_to_write(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            self.assertFalse(filesystem.write_or_replace_resources(file_path, []))
+            self.assertFalse(path.exists(file_path))
+
+    def test_write_or_replace_resources_journal(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            journal_path = filesystem.journal_file_path(file_path)
+            minimal = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+            minimal2 = fixtures.MinimalResource.from_data(
+                fixtures.valid_minimalresource_data()
+            )
+            minimal2.data[const.RES_PARAMS]["name"] = "minimal2"
+            minimal2.data[const.RES_INFO]["id"] = "id-minimal2"
+
+            # new file is written in full
+            self.assertTrue(
+                filesystem.write_or_replace_resource(file_path, minimal, journal=True)
+            )
+            self.assertFalse(path.exists(journal_path))
+            with open(file_path, "r", encoding="utf8") as f:
+                resources_file_content = f.read()
+
+            minimal.data[const.RES_PARAMS]["description"] = "minimal updated"
+            self.assertTrue(
+                filesystem.write_or_replace_resources(
+                    file_path, [minimal, minimal2], journal=True
+                )
+            )
+            self.assertFalse(
+                filesystem.write_or_replace_resources(
+                    file_path, [minimal, minimal2], journal=True
+                )
+            )
+            with open(file_path, "r", encoding="utf8") as f:
+                self.assertEqual(f.read(), resources_file_content)
+            with open(journal_path, "r", encoding="utf8") as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+            file_struct = filesystem.load_resources_file(file_path)
+            self.assertEqual(file_struct["resources"], [minimal.data, minimal2.data])
+
+            self.assertTrue(filesystem.compact_resources_file(file_path))
+            self.assertFalse(path.exists(journal_path))
+            self.assertFalse(filesystem.compact_resources_file(file_path))
+            self.assertEqual(filesystem.load_resources_file(file_path), file_struct)
+
+    def test_load_resources_file_torn_journal(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            with open(file_path, "w", encoding="utf8") as f:
+                f.write(yaml.dump(fixtures.minimal_resource_file_struct()))
+            with open(
+                filesystem.journal_file_path(file_path), "w", encoding="utf8"
+            ) as f:
+                f.write('{"key": null, "resource": {"type": "openstack.Minimal"}}\n')
+                f.write('{"key": null, "resource": {"ty')
+
+            file_struct = filesystem.load_resources_file(file_path)
+            self.assertEqual(len(file_struct["resources"]), 2)
+            self.assertEqual(file_struct["resources"][1], {"type": "openstack.Minimal"})
+
+    def test_write_or_replace_resources_journal_after_torn_write(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            journal_path = filesystem.journal_file_path(file_path)
+            minimal = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+            filesystem.write_or_replace_resource(file_path, minimal)
+
+            updated = copy.deepcopy(minimal.data)
+            updated[const.RES_PARAMS]["description"] = "minimal updated"
+            with open(journal_path, "w", encoding="utf8") as f:
+                key = repr(minimal.same_resource_key())
+                f.write(json.dumps({"key": key, "resource": updated}) + "\n")
+                f.write('{"key": null, "resource": {"ty')
+            self.assertEqual(
+                filesystem.load_resources_file(file_path)["resources"], [updated]
+            )
+
+            minimal2 = fixtures.MinimalResource.from_data(
+                fixtures.valid_minimalresource_data()
+            )
+            minimal2.data[const.RES_PARAMS]["name"] = "minimal2"
+            minimal2.data[const.RES_INFO]["id"] = "id-minimal2"
+            self.assertTrue(
+                filesystem.write_or_replace_resource(file_path, minimal2, journal=True)
+            )
+            with open(journal_path, "r", encoding="utf8") as f:
+                self.assertEqual(len(f.readlines()), 2)
+            self.assertEqual(
+                filesystem.load_resources_file(file_path)["resources"],
+                [updated, minimal2.data],
+            )
+
+    def test_load_resources_file_journal_after_manual_edit(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            resources = []
+            for i in range(3):
+                res = fixtures.MinimalResource.from_data(
+                    fixtures.valid_minimalresource_data()
+                )
+                res.data[const.RES_PARAMS]["name"] = f"n{i}"
+                res.data[const.RES_INFO]["id"] = f"id-n{i}"
+                resources.append(res)
+            filesystem.write_or_replace_resources(file_path, resources)
+
+            resources[2].data[const.RES_PARAMS]["description"] = "changed"
+            self.assertTrue(
+                filesystem.write_or_replace_resource(
+                    file_path, resources[2], journal=True
+                )
+            )
+
+            # Remove n0 by hand, the journaled n2 moves up in the list.
+            with open(file_path, "r", encoding="utf8") as f:
+                file_struct = yaml.safe_load(f)
+            del file_struct["resources"][0]
+            with open(file_path, "w", encoding="utf8") as f:
+                f.write(yaml.dump(file_struct))
+
+            self.assertEqual(
+                filesystem.load_resources_file(file_path)["resources"],
+                [resources[1].data, resources[2].data],
+            )
+
+            # Entries of resources removed from the file are appended.
+            del file_struct["resources"][1]
+            with open(file_path, "w", encoding="utf8") as f:
+                f.write(yaml.dump(file_struct))
+            self.assertEqual(
+                filesystem.load_resources_file(file_path)["resources"],
+                [resources[1].data, resources[2].data],
+            )
+
+    def test_write_or_replace_resources_concurrent(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            ctx = multiprocessing.get_context("fork")
+            workers = [
+                ctx.Process(target=_write_minimal_resources, args=(file_path, i, 10))
+                for i in range(4)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+                self.assertEqual(worker.exitcode, 0)
+
+            file_struct = filesystem.load_resources_file(file_path)
+            self.assertEqual(len(file_struct["resources"]), 40)
+            # no leftover temporary files
+            self.assertEqual(
+                [name for name in os.listdir(tmp_dir) if name.endswith(".tmp")], []
+            )
+
+    def test_load_resources_file_cache(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            cache_path = filesystem.cache_file_path(file_path)
+            struct = fixtures.minimal_resource_file_struct()
+            filesystem._write_resources_file(file_path, struct)
+
+            self.assertEqual(filesystem.load_resources_file(file_path), struct)
+            self.assertFalse(path.exists(cache_path))
+            self.assertEqual(
+                filesystem.load_resources_file(file_path, cache=True), struct
+            )
+            self.assertEqual(os.stat(cache_path).st_mode & 0o777, 0o600)
+
+            with mock.patch.object(filesystem.yaml, "load") as yaml_load:
+                self.assertEqual(
+                    filesystem.load_resources_file(file_path, cache=True), struct
+                )
+                yaml_load.assert_not_called()
+
+            # rewritten resource file invalidates the cache
+            minimal = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+            minimal.data[const.RES_PARAMS]["description"] = "minimal updated"
+            filesystem.write_or_replace_resource(file_path, minimal)
+            loaded = filesystem.load_resources_file(file_path, cache=True)
+            self.assertEqual(loaded["resources"], [minimal.data])
+
+            # journal is replayed on top of the cached parse
+            minimal.data[const.RES_PARAMS]["description"] = "minimal journaled"
+            filesystem.write_or_replace_resource(file_path, minimal, journal=True)
+            loaded = filesystem.load_resources_file(file_path, cache=True)
+            self.assertEqual(loaded["resources"], [minimal.data])
+
+            # corrupted cache is ignored
+            with open(cache_path, "wb") as f:
+                f.write(b"garbage")
+            loaded = filesystem.load_resources_file(file_path, cache=True)
+            self.assertEqual(loaded["resources"], [minimal.data])
+
+    def test_write_or_replace_resources_sharded(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            resources = []
+            for i in range(5):
+                res = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+                res.data[const.RES_PARAMS]["name"] = "minimal-{0}".format(i)
+                res.data[const.RES_INFO]["id"] = "id-minimal-{0}".format(i)
+                resources.append(res)
+
+            self.assertTrue(
+                filesystem.write_or_replace_resources(
+                    file_path, resources[:3], shard_size=2
+                )
+            )
+            self.assertFalse(path.exists(file_path))
+            self.assertTrue(filesystem.is_sharded(file_path))
+            self.assertEqual(
+                sorted(
+                    name
+                    for name in os.listdir(filesystem.shards_dir_path(file_path))
+                    if name.endswith((".json", ".yml"))
+                ),
+                ["manifest.json", "shard-00000.yml", "shard-00001.yml"],
+            )
+
+            # only the shard holding the changed resource is rewritten
+            shard0_path = path.join(
+                filesystem.shards_dir_path(file_path), "shard-00000.yml"
+            )
+            shard0_mtime = os.stat(shard0_path).st_mtime_ns
+            resources[2].data[const.RES_PARAMS]["description"] = "updated"
+            self.assertTrue(filesystem.write_or_replace_resources(file_path, resources))
+            self.assertFalse(
+                filesystem.write_or_replace_resources(file_path, resources)
+            )
+            self.assertEqual(os.stat(shard0_path).st_mtime_ns, shard0_mtime)
+
+            file_struct = filesystem.load_resources_file(file_path)
+            self.assertEqual(file_struct["resources"], [res.data for res in resources])
+
+            import_ids = [resources[1].import_id(), resources[4].import_id()]
+            file_struct = filesystem.load_resources_file(
+                file_path, import_ids=import_ids
+            )
+            self.assertEqual(
+                file_struct["resources"], [resources[1].data, resources[4].data]
+            )
+
+    def test_load_resources_file_import_ids(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            struct = fixtures.minimal_resource_file_struct()
+            filesystem._write_resources_file(file_path, struct)
+
+            file_struct = filesystem.load_resources_file(
+                file_path, import_ids=["openstack.Minimal:minimal"]
+            )
+            self.assertEqual(file_struct, struct)
+            file_struct = filesystem.load_resources_file(
+                file_path, import_ids=["openstack.Minimal:other"]
+            )
+            self.assertEqual(file_struct["resources"], [])
+
+    def test_write_or_replace_resources_fingerprints(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            minimal = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+            self.assertTrue(filesystem.write_or_replace_resource(file_path, minimal))
+            self.assertTrue(path.exists(filesystem.fingerprints_file_path(file_path)))
+
+            # unchanged resources are detected without parsing the file
+            with mock.patch.object(filesystem.yaml, "load") as yaml_load:
+                self.assertFalse(
+                    filesystem.write_or_replace_resource(file_path, minimal)
+                )
+                yaml_load.assert_not_called()
+
+            # fingerprints are ignored once the file changes elsewhere
+            struct = fixtures.minimal_resource_file_struct()
+            struct["resources"][0][const.RES_PARAMS]["description"] = "edited"
+            with open(file_path, "w", encoding="utf8") as f:
+                f.write(yaml.dump(struct))
+            self.assertTrue(filesystem.write_or_replace_resource(file_path, minimal))
+            self.assertEqual(
+                filesystem.load_resources_file(file_path)["resources"], [minimal.data]
+            )
+
+    def test_export_marks(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            mark = "2020-01-01T00:00:00Z"
+            filesystem.write_export_mark(file_path, "openstack.Minimal", mark)
+            # marks are ignored until the resource file exists
+            self.assertIsNone(
+                filesystem.load_export_mark(file_path, "openstack.Minimal")
+            )
+
+            minimal = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+            filesystem.write_or_replace_resource(file_path, minimal)
+            self.assertEqual(
+                filesystem.load_export_mark(file_path, "openstack.Minimal"), mark
+            )
+            self.assertIsNone(filesystem.load_export_mark(file_path, "openstack.Other"))
+
+            filesystem.write_export_mark(file_path, "openstack.Other", "2021")
+            self.assertEqual(
+                filesystem.load_export_mark(file_path, "openstack.Minimal"), mark
+            )
+            self.assertEqual(
+                filesystem.load_export_mark(file_path, "openstack.Other"), "2021"
+            )
+
+            os.remove(filesystem.marks_file_path(file_path))
+            self.assertIsNone(filesystem.load_export_mark(file_path, "openstack.Other"))
+
+    def test_export_marks_sharded(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            mark = "2020-01-01T00:00:00Z"
+            minimal = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+            filesystem.write_or_replace_resources(file_path, [minimal], shard_size=1)
+            self.assertTrue(filesystem.is_sharded(file_path))
+            self.assertFalse(path.exists(file_path))
+
+            filesystem.write_export_mark(file_path, "openstack.Minimal", mark)
+            self.assertEqual(
+                filesystem.load_export_mark(file_path, "openstack.Minimal"), mark
+            )
+
     def test_load_resources_file(self):
         with utils.tmp_dir_context() as tmp_dir:
             file_path = path.join(tmp_dir, "resources.yml")
@@ -77,3 +441,66 @@ class TestFilesystem(unittest.TestCase):
                 f.write(yaml.dump(struct))
             with self.assertRaises(exc.DataVersionMismatch):
                 filesystem.load_resources_file(file_path)
+
+    def test_write_resources_file_identical_to_pure_python_dump(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+
+            struct = _large_resource_file_struct(50)
+            params = struct["resources"][0][const.RES_PARAMS]
+            params["description"] = "multi\nline ünïcödé 'quoted' \"text\": # x\n"
+            # Long multi-line strings are where the LibYAML emitter
+            # would produce different bytes.
+            struct["resources"][1][const.RES_PARAMS]["user_data"] = "\n".join(
+                "line {0} ".format(i) + "x" * (i * 7 % 150) + " \t trailing  "
+                for i in range(200)
+            )
+            filesystem._write_resources_file(file_path, struct)
+            with open(file_path, "r", encoding="utf8") as f:
+                self.assertEqual(f.read(), yaml.safe_dump(struct))
+            self.assertEqual(filesystem.load_resources_file(file_path), struct)
+
+    @unittest.skipUnless(
+        os.environ.get("OS_MIGRATE_BENCHMARKS"),
+        "benchmarks are only run when OS_MIGRATE_BENCHMARKS is set",
+    )
+    @unittest.skipUnless(
+        getattr(yaml, "__with_libyaml__", False), "LibYAML bindings not available"
+    )
+    def test_libyaml_loads_faster_than_pure_python(self):
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "resources.yml")
+            filesystem._write_resources_file(
+                file_path, _large_resource_file_struct(2000)
+            )
+
+            start = time.perf_counter()
+            with open(file_path, "r", encoding="utf8") as f:
+                yaml.load(f, Loader=yaml.SafeLoader)
+            pure_python = time.perf_counter() - start
+
+            start = time.perf_counter()
+            filesystem.load_resources_file(file_path)
+            libyaml = time.perf_counter() - start
+
+            self.assertLess(libyaml, pure_python)
+
+
+def _write_minimal_resources(file_path, worker, count):
+    for i in range(count):
+        res = fixtures.MinimalResource.from_data(fixtures.minimal_resource())
+        res.data[const.RES_INFO]["id"] = "id-minimal-{0}-{1}".format(worker, i)
+        filesystem.write_or_replace_resource(file_path, res, journal=i % 2 == 1)
+
+
+def _large_resource_file_struct(count):
+    struct = fixtures.minimal_resource_file_struct()
+    template = struct["resources"][0]
+    struct["resources"] = []
+    for i in range(count):
+        res = copy.deepcopy(template)
+        res[const.RES_PARAMS]["name"] = "minimal-{0}".format(i)
+        res[const.RES_INFO]["id"] = "id-minimal-{0}".format(i)
+        res[const.RES_PARAMS]["tags"] = ["tag-a", "tag-b"]
+        struct["resources"].append(res)
+    return struct
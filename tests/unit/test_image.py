@@ -2,10 +2,13 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import copy
 import openstack
 import unittest
+from unittest import mock
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const, image
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
 
 
 def sdk_image():
@@ -213,3 +216,98 @@ class TestImage(unittest.TestCase):
         self.assertEqual(sdk_params["min_ram"], params["min_ram"])
         self.assertEqual(sdk_params["name"], params["name"])
         self.assertEqual(sdk_params["ramdisk_id"], refs["ramdisk_id"])
+
+    def test_image_catalog(self):
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        test_image = sdk_image()
+        kernel = openstack.image.v2.image.Image(
+            id="uuid-test-kernel",
+            name="test-kernel",
+            owner="uuid-other-project",
+            checksum="1234",
+        )
+        conn.image.images.return_value = [test_image, kernel]
+        catalog = reference.use_image_catalog(conn)
+        conn.image.images.reset_mock()
+
+        self.assertIs(image.Image._find_sdk_res(conn, "test-image"), test_image)
+        self.assertIs(image.Image._find_sdk_res(conn, "uuid-test-kernel"), kernel)
+        self.assertIsNone(
+            image.Image._find_sdk_res(
+                conn, "test-kernel", {"project_id": "uuid-test-project"}
+            )
+        )
+        kernel_ref = {
+            "name": "test-kernel",
+            "project_name": None,
+            "domain_name": None,
+        }
+        self.assertEqual(reference.image_id(conn, kernel_ref), "uuid-test-kernel")
+        self.assertEqual(catalog.with_checksum("1234"), [kernel])
+        self.assertEqual(
+            reference.image_ref(conn, "uuid-test-image"),
+            {"name": "test-image", "project_name": "%auth%", "domain_name": "%auth%"},
+        )
+        conn.image.images.assert_not_called()
+        conn.image.find_image.assert_not_called()
+
+        renamed = openstack.image.v2.image.Image(
+            id="uuid-test-kernel", name="renamed", checksum="1234"
+        )
+        catalog.add(renamed)
+        self.assertEqual(catalog.with_name("test-kernel"), [])
+        self.assertEqual(catalog.with_checksum("1234"), [renamed])
+
+    def test_create_or_update_with_image_catalog(self):
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        conn.image.images.return_value = []
+        conn.image.create_image.return_value = sdk_image()
+        catalog = reference.use_image_catalog(conn)
+
+        ser = serialized_image()
+        ser[const.RES_PARAMS]["kernel_ref"] = None
+        ser[const.RES_PARAMS]["ramdisk_ref"] = None
+        img = image.Image.from_data(ser)
+        self.assertTrue(img.create_or_update(conn, blob_path="/tmp/blob"))
+        self.assertEqual(catalog.with_name("test-image"), [sdk_image()])
+
+        # The created image is found in the catalog on the next run.
+        sdk_res = image.Image._find_sdk_res(conn, "test-image")
+        self.assertEqual(sdk_res["id"], "uuid-test-image")
+        conn.image.images.assert_called_once_with()
+
+    def test_create_or_update_sends_changed_params(self):
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        existing = sdk_image()
+        conn.image.images.return_value = [
+            existing,
+            openstack.image.v2.image.Image(
+                id="uuid-test-kernel", name="test-kernel", owner="uuid-test-project"
+            ),
+            openstack.image.v2.image.Image(
+                id="uuid-test-ramdisk", name="test-ramdisk", owner="uuid-test-project"
+            ),
+        ]
+        catalog = reference.use_image_catalog(conn)
+        updated = openstack.image.v2.image.Image(
+            id="uuid-test-image", name="test-image", min_ram=8192
+        )
+        conn.image.update_image.return_value = updated
+        cache = reference.reference_cache(conn)
+        cache.put(("id", "find_image", "test-image"), "uuid-test-image", "test-image")
+
+        img = image.Image.from_sdk(conn, existing)
+        self.assertFalse(img.create_or_update(conn, blob_path="/tmp/blob"))
+        conn.image.update_image.assert_not_called()
+
+        data = copy.deepcopy(img.data)
+        data[const.RES_PARAMS]["min_ram"] = 8192
+        img = image.Image.from_data(data)
+        self.assertTrue(img.create_or_update(conn, blob_path="/tmp/blob"))
+        # Neither unchanged params nor the image data are sent.
+        conn.image.update_image.assert_called_once_with(existing, min_ram=8192)
+        self.assertIsNone(cache.get(("id", "find_image", "test-image")))
+        self.assertEqual(catalog.with_name("test-image"), [updated])
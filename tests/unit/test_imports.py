@@ -0,0 +1,73 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import resource_map
+
+MODULE_UTILS = "ansible_collections.os_migrate.os_migrate.plugins.module_utils"
+
+# Generous compared to the tens of milliseconds the imports take, the
+# OpenStack SDK alone takes several times more.
+IMPORT_TIME_BUDGET = 0.5
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def fresh_import(*names):
+    """Import module `names` in a new interpreter.
+
+    Returns: (seconds the imports took, names of all imported modules)
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.check_output(
+        [sys.executable, "-c", _IMPORT_SCRIPT] + list(names), env=env
+    )
+    result = json.loads(output)
+    return result["seconds"], set(result["modules"])
+
+
+class TestImports(unittest.TestCase):
+
+    def test_module_utils_dont_import_sdk(self):
+        names = [
+            f"{MODULE_UTILS}.{name}"
+            for name in (
+                "filesystem",
+                "os_auth",
+                "reference",
+                "serialization",
+                "server",
+                "validation",
+            )
+        ]
+        seconds, modules = fresh_import(*names)
+        self.assertNotIn("openstack", modules)
+        self.assertLess(seconds, IMPORT_TIME_BUDGET)
+
+    def test_resource_map_imports_resource_modules_lazily(self):
+        _, modules = fresh_import(f"{MODULE_UTILS}.validation")
+        self.assertNotIn(f"{MODULE_UTILS}.network", modules)
+        self.assertNotIn(f"{MODULE_UTILS}.osm_resource", modules)
+
+    def test_resource_map(self):
+        self.assertEqual(len(resource_map.RESOURCE_MAP), 15)
+        for res_type, res_cls in resource_map.RESOURCE_MAP.items():
+            self.assertEqual(res_cls.resource_type, res_type)
+            self.assertTrue(res_cls.sdk_class.__module__.startswith("openstack."))
+        self.assertIsNone(resource_map.RESOURCE_MAP.get("openstack.Unknown"))
+        self.assertNotIn("openstack.Unknown", resource_map.RESOURCE_MAP)
@@ -127,3 +127,18 @@ class TestKeypair(unittest.TestCase):
 
         # not used with '%auth%'
         self.assertNotIn("user_id", sdk_params)
+
+    def test_keypair_is_same_resource(self):
+        kp1 = Keypair.from_data(serialized_keypair())
+        kp2 = serialized_keypair()
+        self.assertTrue(kp1.is_same_resource(kp2))
+
+        # Keypair IDs are names, they are only unique per user.
+        kp2[const.RES_PARAMS]["user_ref"]["name"] = "other-user"
+        self.assertFalse(kp1.is_same_resource(kp2))
+        self.assertNotEqual(
+            kp1.same_resource_key(), Keypair.from_data(kp2).same_resource_key()
+        )
+
+        del kp2[const.RES_PARAMS]["user_ref"]
+        self.assertFalse(kp1.is_same_resource(kp2))
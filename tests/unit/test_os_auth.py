@@ -0,0 +1,88 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import openstack
+
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    connection_broker,
+)
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import os_auth
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
+
+
+def _module(**params):
+    module = mock.Mock()
+    module.params = dict(cloud="src")
+    module.params.update(params)
+    module.fail_json.side_effect = AssertionError("fail_json called")
+    return module
+
+
+class TestGetConnection(unittest.TestCase):
+
+    def test_get_connection_defaults(self):
+        conn = mock.Mock()
+        with mock.patch.object(openstack, "connect", return_value=conn):
+            self.assertIs(os_auth.get_connection(_module()), conn)
+        self.assertIsNone(reference.identity_directory(conn))
+        conn.identity.projects.assert_not_called()
+
+    def test_get_connection_reference_cache_bounds(self):
+        conn = mock.Mock()
+        module = _module(reference_cache_size=10, reference_cache_ttl=60)
+        with mock.patch.object(openstack, "connect", return_value=conn):
+            os_auth.get_connection(module)
+        cache = reference.reference_cache(conn)
+        self.assertEqual(cache.max_size, 10)
+        self.assertEqual(cache.ttl, 60)
+
+    def test_get_connection_identity_directory(self):
+        conn = mock.Mock()
+        conn.identity.domains.return_value = []
+        conn.identity.projects.return_value = [
+            {"id": "proj_id", "name": "proj", "domain_id": "default"},
+        ]
+        conn.identity.users.return_value = []
+        conn.identity.roles.return_value = []
+        module = _module(identity_directory=True)
+        with mock.patch.object(openstack, "connect", return_value=conn):
+            os_auth.get_connection(module)
+        self.assertIsNotNone(reference.identity_directory(conn))
+        conn.identity.projects.assert_called_once_with()
+
+    def test_get_connection_brokered_doesnt_import_sdk(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            socket_path = os.path.join(tmpdir, "broker.sock")
+            server = connection_broker.BrokerServer(
+                socket_path, lambda **kwargs: mock.Mock(current_project_id="proj_id")
+            )
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                module = _module(broker_socket_path=socket_path)
+                with mock.patch.object(
+                    os_auth.importlib,
+                    "import_module",
+                    side_effect=AssertionError("SDK imported"),
+                ):
+                    conn = os_auth.get_connection(module)
+                    self.assertIsInstance(conn, connection_broker.BrokeredConnection)
+                    self.assertEqual(conn.current_project_id, "proj_id")
+                conn.close()
+            finally:
+                server.shutdown()
+                thread.join()
+
+    def test_get_connection_falls_back_without_broker(self):
+        conn = mock.Mock()
+        module = _module(broker_socket_path="/nonexistent/broker.sock")
+        with mock.patch.object(connection_broker, "ping", return_value=True):
+            with mock.patch.object(openstack, "connect", return_value=conn):
+                self.assertIs(os_auth.get_connection(module), conn)
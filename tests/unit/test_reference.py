@@ -2,10 +2,17 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import os
+import tempfile
 import unittest
 from unittest import mock
 
+import openstack
+
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import reference
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    reference_store,
+)
 
 
 class TestReference(unittest.TestCase):
@@ -30,3 +37,169 @@ class TestReference(unittest.TestCase):
         conn = mock.Mock()
         conn.current_user_id = "current_user_id"
         self.assertEqual(reference.user_ref(conn, "current_user_id"), expected_ref)
+
+    def test_ref_lookups_are_cached(self):
+        conn = mock.Mock()
+        conn.current_project_id = "current_project_id"
+        network = mock.MagicMock(project_id="current_project_id")
+        network.__getitem__.side_effect = {"name": "net"}.__getitem__
+        conn.network.find_network.return_value = network
+        expected_ref = {
+            "name": "net",
+            "project_name": "%auth%",
+            "domain_name": "%auth%",
+        }
+        ref = reference.network_ref(conn, "net_id")
+        self.assertEqual(ref, expected_ref)
+        ref["name"] = "modified by caller"
+        self.assertEqual(reference.network_ref(conn, "net_id"), expected_ref)
+        conn.network.find_network.assert_called_once_with(
+            "net_id", ignore_missing=False
+        )
+        self.assertEqual(
+            reference.reference_cache(conn).stats(),
+            {"hits": 1, "store_hits": 0, "misses": 1, "size": 1},
+        )
+
+    def test_missing_refs_are_not_cached(self):
+        conn = mock.Mock()
+        conn.network.find_network.return_value = None
+        self.assertIsNone(reference.network_ref(conn, "net_id", required=False))
+        self.assertIsNone(reference.network_ref(conn, "net_id", required=False))
+        self.assertEqual(conn.network.find_network.call_count, 2)
+
+    def test_reference_cache_bounds(self):
+        cache = reference.ReferenceCache(max_size=2, ttl=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        # "b" was the least recently used entry
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+        with mock.patch.object(reference.time, "monotonic", return_value=1e12):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(
+            cache.stats(), {"hits": 3, "store_hits": 0, "misses": 2, "size": 1}
+        )
+
+    def test_reference_cache_reconfigure(self):
+        conn = mock.Mock()
+        cache = reference.reference_cache(conn)
+        self.assertEqual(cache.max_size, reference.DEFAULT_CACHE_MAX_SIZE)
+        self.assertEqual(cache.ttl, reference.DEFAULT_CACHE_TTL)
+
+        self.assertIs(reference.reference_cache(conn, max_size=0, ttl=30), cache)
+        self.assertEqual(cache.max_size, 0)
+        self.assertEqual(cache.ttl, 30)
+        # A zero-sized cache doesn't keep any lookups.
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_identity_directory(self):
+        conn = mock.Mock()
+        conn.current_project_id = "current_project_id"
+        conn.identity.domains.return_value = [
+            {"id": "dom_id", "name": "dom"},
+        ]
+        conn.identity.projects.return_value = [
+            {"id": "proj_id", "name": "proj", "domain_id": "dom_id"},
+        ]
+        conn.identity.users.side_effect = openstack.exceptions.HttpException()
+        conn.identity.users.side_effect.status_code = 403
+        conn.identity.roles.return_value = [
+            {"id": "role_id", "name": "role", "domain_id": None},
+        ]
+        directory = reference.use_identity_directory(conn)
+        self.assertFalse(directory.available("users"))
+
+        self.assertEqual(
+            reference.project_ref(conn, "proj_id"),
+            {"name": "proj", "project_name": None, "domain_name": "dom"},
+        )
+        self.assertEqual(
+            reference.role_ref(conn, "role_id"),
+            {"name": "role", "project_name": None, "domain_name": None},
+        )
+        self.assertEqual(
+            reference._project_id_filters(
+                conn, {"name": "x", "project_name": "proj", "domain_name": "dom"}
+            ),
+            {"project_id": "proj_id"},
+        )
+        self.assertEqual(
+            reference._fetch_project_name_and_domain_name(conn, "proj_id"),
+            ("proj", "dom"),
+        )
+        conn.identity.find_project.assert_not_called()
+        conn.identity.find_domain.assert_not_called()
+        conn.identity.get_project.assert_not_called()
+
+        # Users could not be listed, fall back to find calls.
+        conn.identity.find_user.return_value = {
+            "name": "user",
+            "domain_id": "dom_id",
+        }
+        conn.identity.find_domain.return_value = {"name": "dom"}
+        self.assertEqual(
+            reference.user_ref(conn, "user_id"),
+            {"name": "user", "project_name": None, "domain_name": "dom"},
+        )
+        conn.identity.find_user.assert_called()
+
+    def test_prefetch_ids(self):
+        conn = mock.Mock()
+        conn.current_project_id = "current_project_id"
+        conn.network.security_groups.return_value = [
+            {"id": "sg1_id", "name": "sg1"},
+            {"id": "sg2_id", "name": "sg2"},
+            {"id": "dup1_id", "name": "dup"},
+            {"id": "dup2_id", "name": "dup"},
+        ]
+        refs = [
+            {"name": name, "project_name": "%auth%", "domain_name": "%auth%"}
+            for name in ["sg1", "sg2", "sg1", "dup"]
+        ]
+        self.assertEqual(
+            reference.prefetch_ids(conn, "security_group", refs + [None]), 2
+        )
+        conn.network.security_groups.assert_called_once_with(
+            project_id="current_project_id"
+        )
+
+        self.assertEqual(reference.security_group_id(conn, refs[0]), "sg1_id")
+        self.assertEqual(reference.security_group_id(conn, refs[1]), "sg2_id")
+        conn.network.find_security_group.assert_not_called()
+        # Ambiguous names are left to the regular lookup.
+        conn.network.find_security_group.return_value = {"id": "dup1_id"}
+        self.assertEqual(reference.security_group_id(conn, refs[3]), "dup1_id")
+        conn.network.find_security_group.assert_called_once()
+
+    def test_reference_store_shared_between_caches(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "refs.sqlite")
+            key = ("id", "openstack.network.v2._proxy.find_network", "net", None, None)
+            cache1 = reference.ReferenceCache()
+            cache1.store = reference_store.ReferenceStore(file_path, "scope")
+            cache1.put(key, "net_id", "net")
+            # Keys which only make sense within the process are not stored.
+            cache1.put(("id", 1234, "net", None, None), "net_id", "net")
+            self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o600)
+
+            cache2 = reference.ReferenceCache()
+            cache2.store = reference_store.ReferenceStore(file_path, "scope")
+            self.assertEqual(cache2.get(key), "net_id")
+            self.assertIsNone(cache2.get(("id", 1234, "net", None, None)))
+            self.assertEqual(cache2.stats()["store_hits"], 1)
+
+            other_scope = reference_store.ReferenceStore(file_path, "other")
+            self.assertIsNone(other_scope.get(key))
+            self.assertEqual(cache1.store.get(key), ("net_id", "net"))
+
+            cache2.invalidate(["net"])
+            self.assertIsNone(cache2.get(key))
+            cache1.clear()
+            self.assertIsNone(cache1.get(key))
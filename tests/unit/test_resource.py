@@ -6,8 +6,15 @@ import unittest
 from unittest import mock
 
 from openstack.exceptions import ResourceFailure
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import exc
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import osm_resource
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import resource
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import resource_map
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import serialization
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    user_project_role_assignment,
+)
 
 
 class FakeResource(resource.Resource):
@@ -118,6 +125,14 @@ class TestResource(unittest.TestCase):
         with self.assertRaises(exc.UnexpectedResourceType):
             FakeResource.from_data(data)
 
+    def test_resource_classes_have_no_instance_dict(self):
+        resource_classes = list(resource_map.RESOURCE_MAP.values()) + [
+            user_project_role_assignment.UserProjectRoleAssignment,
+        ]
+        for resource_class in resource_classes:
+            obj = resource_class.from_data({"type": resource_class.resource_type})
+            self.assertFalse(hasattr(obj, "__dict__"), resource_class)
+
     def test_from_sdk(self):
         sdk = valid_fakeresource_sdk()
         # conn=None because the fake _refs_from_* methods don't need it
@@ -162,6 +177,51 @@ class TestResource(unittest.TestCase):
         res2.params()["param1"] = "changed"
         self.assertTrue(res1._needs_update(res2))
 
+    def test_importable_fingerprint(self):
+        res1 = FakeResource.from_data(valid_fakeresource_data())
+        res2 = FakeResource.from_data(valid_fakeresource_data())
+        res2.info()["info1"] = "changed"
+        res2.migration_params()["migparam1"] = "changed"
+        fingerprint = res1.importable_fingerprint()
+        self.assertEqual(fingerprint, res2.importable_fingerprint())
+        self.assertEqual(
+            fingerprint,
+            serialization.content_fingerprint(osm_resource.importable_data(res1.data)),
+        )
+
+        res2.params()["param1"] = "changed"
+        self.assertNotEqual(fingerprint, res2.importable_fingerprint())
+        res2.data[const.RES_PARAMS] = dict(res1.params())
+        self.assertEqual(fingerprint, res2.importable_fingerprint())
+
+        # In-place edits of nested values are taken into account too.
+        res2.params()["param1"] = ["a"]
+        fingerprint = res2.importable_fingerprint()
+        res2.params()["param1"].append("b")
+        self.assertNotEqual(fingerprint, res2.importable_fingerprint())
+        self.assertTrue(res1._needs_update(res2))
+
+    def test_importable_fingerprint_bool_equals_int(self):
+        res1 = FakeResource.from_data(valid_fakeresource_data())
+        res2 = FakeResource.from_data(valid_fakeresource_data())
+        res1.params()["param1"] = [True, 0, 1.0]
+        res2.params()["param1"] = [1, False, True]
+        self.assertEqual(res1.params(), res2.params())
+        self.assertFalse(res1._needs_update(res2))
+
+    def test_importable_fingerprint_nested(self):
+        data1 = {"a": [{"b": 1, "_info": {"x": 1}}], "c": 2.0}
+        data2 = {"c": 2, "a": [{"_info": {"x": 2}, "b": 1}]}
+        self.assertEqual(
+            osm_resource.importable_fingerprint(data1),
+            osm_resource.importable_fingerprint(data2),
+        )
+        data2["a"][0]["b"] = "1"
+        self.assertNotEqual(
+            osm_resource.importable_fingerprint(data1),
+            osm_resource.importable_fingerprint(data2),
+        )
+
     def test_remove_readonly_param(self):
         res1 = FakeResource.from_data(valid_fakeresource_data())
         res1._remove_readonly_params(res1.params())
@@ -190,6 +250,83 @@ class TestResource(unittest.TestCase):
         res._update_sdk_res.assert_called_once()
         res._hook_after_update.assert_called_once_with(None, "mock resource", False)
 
+    def test_create_and_update_sends_changed_params(self):
+        res = FakeResource.from_data(valid_fakeresource_data())
+        stale = valid_fakeresource_sdk()
+        stale["param1"] = "stale"
+        stale["readonly_param"] = "stale"
+        res._find_sdk_res = mock.Mock(return_value=stale)
+        res._update_sdk_res = mock.Mock(return_value="mock resource")
+        self.assertTrue(res.create_or_update(None))
+        # Unchanged same-name params are left out, params which can't
+        # be mapped to serialized ones (param3id, param4id) are kept.
+        res._update_sdk_res.assert_called_once_with(
+            None,
+            stale,
+            {
+                "param1": "param1val",
+                "param3id": "param3idval",
+                "param4id": "param4idval",
+            },
+        )
+
+    def test_create_or_update_all(self):
+        up_to_date = FakeResource.from_data(valid_fakeresource_data())
+        stale_data = valid_fakeresource_data()
+        stale_data["params"]["name"] = "stale"
+        stale = FakeResource.from_data(stale_data)
+        new_data = valid_fakeresource_data()
+        new_data["params"]["name"] = "new"
+        new = FakeResource.from_data(new_data)
+
+        stale_sdk = valid_fakeresource_sdk()
+        stale_sdk.update({"id": "staleid", "name": "stale", "param1": "old"})
+        inventory = [valid_fakeresource_sdk(), stale_sdk]
+        with mock.patch.object(
+            FakeResource, "_list_sdk_res", return_value=inventory
+        ) as list_sdk_res, mock.patch.object(
+            FakeResource, "_find_sdk_res"
+        ) as find_sdk_res, mock.patch.object(
+            FakeResource, "_create_sdk_res", return_value=valid_fakeresource_sdk()
+        ) as create_sdk_res, mock.patch.object(
+            FakeResource, "_update_sdk_res", return_value=stale_sdk
+        ) as update_sdk_res:
+            changed = FakeResource.create_or_update_all(
+                None, [up_to_date, stale, new], {"project_id": "x"}
+            )
+
+        self.assertEqual(changed, [False, True, True])
+        list_sdk_res.assert_called_once_with(None, {"project_id": "x"})
+        find_sdk_res.assert_not_called()
+        create_sdk_res.assert_called_once()
+        self.assertEqual(create_sdk_res.call_args[0][1]["name"], "new")
+        update_sdk_res.assert_called_once()
+        self.assertIs(update_sdk_res.call_args[0][1], stale_sdk)
+
+    def test_create_or_update_all_without_listing(self):
+        res = FakeResource.from_data(valid_fakeresource_data())
+        with mock.patch.object(FakeResource, "create_or_update", return_value=False):
+            self.assertEqual(FakeResource.create_or_update_all(None, [res]), [False])
+            res.create_or_update.assert_called_once_with(None, None)
+
+    def test_create_or_update_all_empty(self):
+        with mock.patch.object(FakeResource, "_list_sdk_res") as list_sdk_res:
+            self.assertEqual(FakeResource.create_or_update_all(None, []), [])
+        list_sdk_res.assert_not_called()
+
+    def test_changed_params(self):
+        res1 = FakeResource.from_data(valid_fakeresource_data())
+        res2 = FakeResource.from_data(valid_fakeresource_data())
+        res2.info()["info1"] = "changed"
+        self.assertEqual(res1.changed_params(res2), [])
+        res2.params()["param1"] = "changed"
+        res2.params()["skip_falsey"].append("changed")
+        res2.params()["nested"] = {"a": 1, "_info": {"b": 2}}
+        res1.params()["nested"] = {"a": 2, "_info": {"b": 3}}
+        self.assertEqual(
+            res1.changed_params(res2), ["nested.a", "param1", "skip_falsey"]
+        )
+
     def test_create_and_update_needs_create(self):
         res = FakeResource.from_data(valid_fakeresource_data())
         # _find_sdk_res returns None - not found
@@ -4,6 +4,7 @@ __metaclass__ = type
 
 import openstack
 import unittest
+from unittest import mock
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     router_interface,
@@ -151,3 +152,82 @@ class TestRouterInterface(unittest.TestCase):
         self.assertEqual(params["network_ref"]["name"], "test-net")
 
         self.assertEqual(info["id"], "uuid-test-router-interface")
+
+    def test_create_or_update_all_prefetches_refs(self):
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        conn.network.networks.return_value = [
+            {"id": "uuid-test-net", "name": "test-net"},
+        ]
+        conn.network.routers.return_value = [
+            {"id": "uuid-test-router", "name": "test-router"},
+        ]
+        conn.network.subnets.return_value = [
+            {"id": "uuid-test-subnet", "name": "test-subnet"},
+        ]
+        conn.network.ports.return_value = []
+        conn.network.create_port.return_value = {
+            "id": "uuid-new-port",
+            "device_owner": "",
+            "device_id": "",
+        }
+        ifaces = []
+        for i in range(5):
+            ser = RouterInterface.from_sdk(None, sdk_router_interface()).data
+            params = ser["params"]
+            params["fixed_ips_refs"][0]["ip_address"] = f"192.168.0.{10 + i}"
+            refs = [params["device_ref"], params["network_ref"]]
+            refs.append(params["fixed_ips_refs"][0]["subnet_ref"])
+            for ref in refs:
+                ref["project_name"] = "%auth%"
+                ref["domain_name"] = "%auth%"
+            ifaces.append(router_interface.RouterInterface.from_data(ser))
+
+        self.assertEqual(
+            router_interface.RouterInterface.create_or_update_all(conn, ifaces),
+            [True] * 5,
+        )
+        for list_method in ["networks", "routers", "subnets"]:
+            getattr(conn.network, list_method).assert_called_once_with(
+                project_id="uuid-test-project"
+            )
+        conn.network.find_network.assert_not_called()
+        conn.network.find_router.assert_not_called()
+        conn.network.find_subnet.assert_not_called()
+        self.assertEqual(conn.network.add_interface_to_router.call_count, 5)
+        conn.network.add_interface_to_router.assert_called_with(
+            "uuid-test-router", port_id="uuid-new-port"
+        )
+
+    def test_create_or_update_sends_changed_params(self):
+        second_ip = {"subnet_id": "uuid-test-subnet", "ip_address": "192.168.0.20"}
+
+        class TwoIpsRouterInterface(RouterInterface):
+            def _refs_from_ser(self, conn):
+                refs = router_interface_refs()
+                refs["fixed_ips"].append(second_ip)
+                return refs
+
+        conn = mock.Mock()
+        port = sdk_router_interface()
+        conn.network.ports.return_value = [port]
+        conn.network.update_port.return_value = port
+
+        ser = RouterInterface.from_sdk(None, port).data
+        self.assertFalse(TwoIpsRouterInterface.from_data(ser).create_or_update(conn))
+        conn.network.update_port.assert_not_called()
+
+        ser["params"]["fixed_ips_refs"].append(
+            {
+                "subnet_ref": ser["params"]["fixed_ips_refs"][0]["subnet_ref"],
+                "ip_address": "192.168.0.20",
+            }
+        )
+        iface = TwoIpsRouterInterface.from_data(ser)
+        self.assertTrue(iface.create_or_update(conn))
+        # The network of a port can't be updated, only fixed IPs changed.
+        conn.network.update_port.assert_called_once_with(
+            "uuid-test-router-interface",
+            fixed_ips=router_interface_refs()["fixed_ips"] + [second_ip],
+        )
+        conn.network.add_interface_to_router.assert_not_called()
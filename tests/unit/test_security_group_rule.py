@@ -4,6 +4,7 @@ __metaclass__ = type
 
 import openstack
 import unittest
+from unittest import mock
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
     const,
@@ -134,3 +135,35 @@ class TestSecurityGroupRule(unittest.TestCase):
         self.assertEqual(sdk_params["port_range_min"], "10")
         self.assertEqual(sdk_params["protocol"], "null")
         self.assertEqual(sdk_params["remote_ip_prefix"], "null")
+
+    def test_create_or_update_all_prefetches_security_groups(self):
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-project"
+        conn.network.security_groups.return_value = [
+            {"id": "uuid-test-default-secgroup", "name": "test-default-secgroup"},
+            {"id": "uuid-test-remote-secgroup", "name": "test-remote-secgroup"},
+        ]
+        rules = []
+        for port in range(5):
+            ser = serialized_security_group_rule()
+            params = ser[const.RES_PARAMS]
+            params["port_range_min"] = params["port_range_max"] = str(port)
+            for ref_name in ["security_group_ref", "remote_group_ref"]:
+                params[ref_name]["project_name"] = "%auth%"
+                params[ref_name]["domain_name"] = "%auth%"
+            rules.append(security_group_rule.SecurityGroupRule.from_data(ser))
+
+        self.assertEqual(
+            security_group_rule.SecurityGroupRule.create_or_update_all(conn, rules),
+            [True] * 5,
+        )
+        conn.network.security_groups.assert_called_once_with(project_id="uuid-project")
+        conn.network.find_security_group.assert_not_called()
+        self.assertEqual(conn.network.create_security_group_rule.call_count, 5)
+        for call in conn.network.create_security_group_rule.call_args_list:
+            self.assertEqual(
+                call.kwargs["security_group_id"], "uuid-test-default-secgroup"
+            )
+            self.assertEqual(
+                call.kwargs["remote_group_id"], "uuid-test-remote-secgroup"
+            )
@@ -2,10 +2,16 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import time
 import unittest
+from unittest import mock
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import exc
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import resource
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
+    security_group_rule,
+)
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import serialization
 from ansible_collections.os_migrate.os_migrate.tests.unit import fixtures
 
@@ -19,6 +25,44 @@ class MinimalResource(resource.Resource):
     params_from_sdk = ["name", "description"]
 
 
+class SameByNameResource(MinimalResource):
+
+    def _is_same_resource(self, target_data):
+        return self.params()["name"] == target_data[const.RES_PARAMS]["name"]
+
+
+def minimal_data(name, description):
+    return {
+        "type": "openstack.Minimal",
+        "params": {"name": name, "description": description},
+        "_info": {"id": f"id-{name}"},
+        "_migration_params": {},
+    }
+
+
+def security_group_rule_data(idx, description):
+    return {
+        "type": const.RES_TYPE_SECURITYGROUPRULE,
+        "params": {
+            "description": description,
+            "direction": "ingress",
+            "ether_type": "IPv4",
+            "port_range_max": idx % 65536,
+            "port_range_min": idx % 65536,
+            "protocol": "tcp",
+            "remote_group_ref": None,
+            "remote_ip_prefix": "0.0.0.0/0",
+            "security_group_ref": {
+                "name": f"secgroup-{idx // 100}",
+                "project_name": "%auth%",
+                "domain_name": "%auth%",
+            },
+        },
+        "_info": {"id": f"uuid-rule-{idx}"},
+        "_migration_params": {},
+    }
+
+
 class TestSerialization(unittest.TestCase):
 
     def test_new_resources_file_struct(self):
@@ -141,6 +185,105 @@ class TestSerialization(unittest.TestCase):
             ],
         )
 
+    def test_add_or_replace_resources(self):
+        resources = [minimal_data("one", "one"), minimal_data("two", "two")]
+        new_resources = [
+            MinimalResource.from_data(minimal_data("three", "three")),
+            MinimalResource.from_data(minimal_data("two", "two updated")),
+            MinimalResource.from_data(minimal_data("one", "one")),
+            MinimalResource.from_data(minimal_data("three", "three updated")),
+        ]
+
+        self.assertTrue(
+            serialization.add_or_replace_resources(resources, new_resources)
+        )
+        self.assertEqual(
+            resources,
+            [
+                minimal_data("one", "one"),
+                minimal_data("two", "two updated"),
+                minimal_data("three", "three updated"),
+            ],
+        )
+
+        # same resources again - should return False, nothing changed
+        self.assertFalse(
+            serialization.add_or_replace_resources(resources, new_resources[1:])
+        )
+        self.assertEqual(len(resources), 3)
+
+    def test_merge_resources(self):
+        resources = [minimal_data("one", "one"), minimal_data("two", "two")]
+        new_resources = [
+            MinimalResource.from_data(minimal_data("three", "three")),
+            MinimalResource.from_data(minimal_data("two", "two updated")),
+            MinimalResource.from_data(minimal_data("one", "one")),
+            MinimalResource.from_data(minimal_data("three", "three updated")),
+        ]
+
+        self.assertEqual(
+            serialization.merge_resources(resources, new_resources), [2, 1]
+        )
+        self.assertEqual(
+            serialization.merge_resources(resources, new_resources[1:]), []
+        )
+
+    def test_add_or_replace_resources_custom_is_same_resource(self):
+        resources = [minimal_data("one", "one")]
+        same_name = minimal_data("one", "one updated")
+        same_name["_info"]["id"] = "id-other"
+        same_name_res = SameByNameResource.from_data(same_name)
+        self.assertIsNone(same_name_res.same_resource_key())
+
+        self.assertTrue(
+            serialization.add_or_replace_resources(resources, [same_name_res])
+        )
+        self.assertEqual(resources, [same_name])
+
+    def test_add_or_replace_resources_50k_rules(self):
+        rule_count = 50000
+        resources = [
+            security_group_rule_data(i, "rule") for i in range(0, rule_count, 2)
+        ]
+        new_resources = [
+            security_group_rule.SecurityGroupRule.from_data(
+                security_group_rule_data(i, "rule updated")
+            )
+            for i in range(rule_count)
+        ]
+
+        # Indexed merging never falls back to pairwise comparisons.
+        with mock.patch.object(
+            resource.Resource,
+            "is_same_resource",
+            side_effect=AssertionError("unexpected linear scan"),
+        ):
+            start = time.monotonic()
+            self.assertTrue(
+                serialization.add_or_replace_resources(resources, new_resources)
+            )
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(len(resources), rule_count)
+        self.assertEqual(resources[0]["_info"]["id"], "uuid-rule-0")
+        self.assertEqual(resources[0]["params"]["description"], "rule updated")
+        self.assertEqual(resources[rule_count // 2]["_info"]["id"], "uuid-rule-1")
+        # A quadratic merge would need over a billion comparisons here
+        # and take many minutes.
+        self.assertLess(elapsed, 10)
+
+    def test_content_fingerprint(self):
+        data = minimal_data("one", "one")
+        reordered = {k: data[k] for k in reversed(list(data))}
+        self.assertEqual(
+            serialization.content_fingerprint(data),
+            serialization.content_fingerprint(reordered),
+        )
+        self.assertNotEqual(
+            serialization.content_fingerprint(data),
+            serialization.content_fingerprint(minimal_data("one", "two")),
+        )
+
     def test_create_resources_from_struct(self):
         cls_map = {"openstack.Minimal": MinimalResource}
         file_struct = fixtures.minimal_resource_file_struct()
@@ -166,6 +309,46 @@ class TestSerialization(unittest.TestCase):
         self.assertEqual(errors, ["Unknown resource type 'asdf'."])
         self.assertEqual(resources, [])
 
+    def test_select_resources(self):
+        resources = [
+            minimal_data("one", "one"),
+            security_group_rule_data(0, "rule"),
+            minimal_data("two", "two"),
+            minimal_data("three", "three"),
+        ]
+
+        self.assertEqual(serialization.select_resources(resources), (resources, 4))
+        self.assertEqual(
+            serialization.select_resources(resources, types=["openstack.Minimal"]),
+            ([resources[0], resources[2], resources[3]], 3),
+        )
+        self.assertEqual(
+            serialization.select_resources(
+                resources,
+                types=["openstack.Minimal"],
+                queries=["one", {"regex": "^t"}],
+                offset=1,
+                limit=1,
+            ),
+            ([resources[2]], 3),
+        )
+        self.assertEqual(
+            serialization.select_resources(
+                resources,
+                queries=["one"],
+                query_attribute="params.description",
+                fields=["type", "params.name", "_info.missing"],
+            ),
+            ([{"type": "openstack.Minimal", "params": {"name": "one"}}], 1),
+        )
+
+        with self.assertRaises(exc.InvalidQuery):
+            serialization.select_resources(resources, queries=[{"regexp": "one"}])
+        with self.assertRaises(exc.InvalidQuery):
+            serialization.select_resources(
+                resources, queries=["one"], query_attribute="params.missing"
+            )
+
     def test_resource_needs_update_minimal(self):
         current = fixtures.minimal_resource()
         target = fixtures.minimal_resource()
@@ -3,14 +3,19 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import openstack
+from os import path
+import threading
 import unittest
 from unittest import mock
 
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
+from ansible_collections.os_migrate.os_migrate.plugins.module_utils import filesystem
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import server
 from ansible_collections.os_migrate.os_migrate.tests.unit.test_keypair import (
     sdk_keypair,
 )
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import exc
+from ansible_collections.os_migrate.os_migrate.tests.unit import utils
 
 
 def sdk_server():
@@ -408,3 +413,236 @@ class TestServer(unittest.TestCase):
             mocked_find_keypair.assert_not_called()
             # Assert that the errors list is empty
             self.assertFalse(errors)
+
+    def test_from_names(self):
+        # All 3 servers must be serialized at the same time to get past
+        # the barrier.
+        barrier = threading.Barrier(3, timeout=10)
+
+        class ConcurrentServer(Server):
+            @staticmethod
+            def _refs_from_sdk(conn, sdk_res):
+                barrier.wait()
+                return server_refs()
+
+        def get_server(server_id):
+            sdk_srv = sdk_server()
+            sdk_srv.id = server_id
+            sdk_srv.name = server_id
+            sdk_srv.project_id = "uuid-test-project"
+            return sdk_srv
+
+        conn = mock.Mock()
+        conn.compute.find_server.side_effect = lambda name, **kwargs: {"id": name}
+        conn.compute.get_server.side_effect = get_server
+        conn.network.ports.return_value = []
+        conn.network.ips.return_value = []
+        conn.block_storage.volumes.return_value = []
+        conn.current_project_id = "uuid-test-project"
+
+        names = ["srv1", "srv2", "srv3"]
+        srvs = ConcurrentServer.from_names(conn, names, workers=3)
+        self.assertEqual([srv.params()["name"] for srv in srvs], names)
+        self.assertEqual(conn.compute.get_server.call_count, 3)
+        # Ports and floating IPs are listed once for all the servers,
+        # volumes aren't listed as the servers have none attached.
+        conn.network.ports.assert_called_once_with(project_id="uuid-test-project")
+        conn.network.ips.assert_called_once_with(project_id="uuid-test-project")
+        conn.block_storage.volumes.assert_not_called()
+
+    def test_update_nbdkit_disks_sharded(self):
+        srvs = []
+        for i in range(3):
+            srv = Server.from_sdk(None, sdk_server())
+            srv.data["params"]["name"] = f"srv{i}"
+            srv.data["_info"]["id"] = f"uuid-srv{i}"
+            srvs.append(srv)
+        disks = [{"device": "/dev/vda", "uri": "nbd://hv:10809", "bootable": True}]
+
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "workloads.yml")
+            filesystem.write_or_replace_resources(file_path, srvs, shard_size=2)
+            self.assertTrue(filesystem.is_sharded(file_path))
+
+            self.assertTrue(server.update_nbdkit_disks(file_path, "uuid-srv2", disks))
+            self.assertFalse(server.update_nbdkit_disks(file_path, "uuid-srv2", disks))
+            with self.assertRaises(exc.InconsistentState):
+                server.update_nbdkit_disks(file_path, "uuid-missing", disks)
+
+            self.assertFalse(path.exists(file_path))
+            resources = filesystem.load_resources_file(file_path)["resources"]
+            self.assertEqual(
+                [res["_migration_params"].get("nbdkit_disks") for res in resources],
+                [None, None, disks],
+            )
+
+    def test_server_changes(self):
+        forbidden = openstack.exceptions.HttpException(http_status=403)
+
+        def servers(changes_since=None, all_projects=False, project_id=None):
+            if project_id == "uuid-forbidden-project":
+                raise forbidden
+            if all_projects:
+                return [
+                    {
+                        "id": "uuid-other",
+                        "name": "other",
+                        "updated_at": "2020-01-03T00:00:00Z",
+                    }
+                ]
+            return [
+                {
+                    "id": "uuid-changed",
+                    "name": "changed",
+                    "updated_at": "2020-01-02T00:00:00Z",
+                }
+            ]
+
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        conn.compute.servers.side_effect = servers
+
+        changes = server.ServerChanges(
+            conn,
+            ["uuid-test-project", "uuid-other-project", "uuid-forbidden-project"],
+            "2020-01-01T00:00:00Z",
+        )
+        conn.compute.servers.assert_any_call(changes_since="2020-01-01T00:00:00Z")
+        conn.compute.servers.assert_any_call(
+            changes_since="2020-01-01T00:00:00Z",
+            all_projects=True,
+            project_id="uuid-other-project",
+        )
+        self.assertEqual(changes.mark, "2020-01-03T00:00:00Z")
+        self.assertEqual(changes.unlisted_project_ids, {"uuid-forbidden-project"})
+
+        def exported(server_id, name, project_id="uuid-test-project"):
+            return {
+                "params": {"name": name},
+                "_info": {"id": server_id, "project_id": project_id},
+            }
+
+        names = ["uuid-changed", "other", "unchanged", "new", "forbidden"]
+        self.assertEqual(
+            changes.select(
+                names,
+                [
+                    exported("uuid-changed", "changed"),
+                    exported("uuid-other", "other", "uuid-other-project"),
+                    exported("uuid-unchanged", "unchanged"),
+                    exported("uuid-forb", "forbidden", "uuid-forbidden-project"),
+                ],
+            ),
+            ["uuid-changed", "other", "new", "forbidden"],
+        )
+
+        # Without changes since the mark, the mark stays.
+        conn.compute.servers.side_effect = None
+        conn.compute.servers.return_value = []
+        changes = server.ServerChanges(
+            conn, ["uuid-test-project"], "2020-01-03T00:00:00Z"
+        )
+        self.assertEqual(changes.mark, "2020-01-03T00:00:00Z")
+        self.assertEqual(
+            changes.select(["unchanged"], [exported("u", "unchanged")]), []
+        )
+
+    def test_changed_servers_sharded(self):
+        srvs = []
+        for i in range(3):
+            srv = Server.from_sdk(None, sdk_server())
+            srv.data["params"]["name"] = f"srv{i}"
+            srv.data["_info"]["id"] = f"uuid-srv{i}"
+            srv.data["_info"]["project_id"] = "uuid-test-project"
+            srvs.append(srv)
+
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        conn.compute.servers.return_value = [
+            {"id": "uuid-srv1", "name": "srv1", "updated_at": "2020-01-02T00:00:00Z"}
+        ]
+
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "workloads.yml")
+            filesystem.write_or_replace_resources(file_path, srvs, shard_size=2)
+            self.assertTrue(filesystem.is_sharded(file_path))
+
+            # Without a mark, all servers are exported.
+            changes, selected, unchanged = server.changed_servers(
+                conn, file_path, ["srv0", "srv1"]
+            )
+            self.assertEqual((selected, unchanged), (["srv0", "srv1"], []))
+
+            filesystem.write_export_mark(
+                file_path, const.RES_TYPE_SERVER, "2020-01-01T00:00:00Z"
+            )
+            changes, selected, unchanged = server.changed_servers(
+                conn, file_path, ["srv0", "srv1", "uuid-srv2", "srv2", "new"]
+            )
+            conn.compute.servers.assert_called_with(
+                changes_since="2020-01-01T00:00:00Z"
+            )
+            self.assertEqual(changes.mark, "2020-01-02T00:00:00Z")
+            self.assertEqual(selected, ["srv1", "new"])
+            self.assertEqual(
+                [srv.params()["name"] for srv in unchanged], ["srv0", "srv2"]
+            )
+
+            # Unchanged servers take new migration params without
+            # being fetched again.
+            for srv in unchanged:
+                srv.update_migration_params({"boot_disk_copy": True})
+            self.assertTrue(filesystem.write_or_replace_resources(file_path, unchanged))
+            resources = filesystem.load_resources_file(file_path)["resources"]
+            self.assertEqual(
+                [res["_migration_params"]["boot_disk_copy"] for res in resources],
+                [True, False, True],
+            )
+
+    def test_changed_servers_other_projects(self):
+        # An admin exports servers of another project, the current
+        # project has none.
+        srvs = []
+        for i, updated_at in enumerate(
+            ["2020-01-02T00:00:00Z", "2020-01-03T00:00:00Z"]
+        ):
+            srv = Server.from_sdk(None, sdk_server())
+            srv.data["params"]["name"] = f"srv{i}"
+            srv.data["_info"]["id"] = f"uuid-srv{i}"
+            srv.data["_info"]["project_id"] = "uuid-tenant-project"
+            srv.data["_info"]["updated_at"] = updated_at
+            srvs.append(srv)
+
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-admin-project"
+        conn.compute.servers.return_value = []
+
+        with utils.tmp_dir_context() as tmp_dir:
+            file_path = path.join(tmp_dir, "workloads.yml")
+            changes, selected, unchanged = server.changed_servers(
+                conn, file_path, ["srv0", "srv1"]
+            )
+            conn.compute.servers.assert_called_once_with()
+            self.assertIsNone(changes.mark)
+
+            changes.add_exported(srvs)
+            self.assertEqual(changes.mark, "2020-01-03T00:00:00Z")
+            filesystem.write_or_replace_resources(file_path, srvs)
+            filesystem.write_export_mark(file_path, const.RES_TYPE_SERVER, changes.mark)
+
+            # The next run lists the tenant project since the mark.
+            changes, selected, unchanged = server.changed_servers(
+                conn, file_path, ["srv0", "srv1"]
+            )
+            conn.compute.servers.assert_any_call(
+                changes_since="2020-01-03T00:00:00Z",
+                all_projects=True,
+                project_id="uuid-tenant-project",
+            )
+            self.assertEqual(selected, [])
+            self.assertEqual(len(unchanged), 2)
+
+            # Servers of listed projects don't move the mark.
+            srvs[0].data["_info"]["updated_at"] = "2030-01-01T00:00:00Z"
+            changes.add_exported(srvs)
+            self.assertEqual(changes.mark, "2020-01-03T00:00:00Z")
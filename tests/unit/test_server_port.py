@@ -4,6 +4,7 @@ __metaclass__ = type
 
 import openstack
 import unittest
+from unittest import mock
 
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import (
@@ -206,3 +207,46 @@ class TestServerPort(unittest.TestCase):
                 "uuid-test-server-port-3",
             ],
         )
+
+    def test_port_index(self):
+        sdk_port = sdk_server_port()
+        sdk_fip = openstack.network.v2.floating_ip.FloatingIP(
+            id="uuid-test-fip",
+            port_id="uuid-test-server-port",
+            floating_ip_address="172.20.9.135",
+        )
+        conn = mock.Mock()
+        conn.network.ports.return_value = [sdk_port]
+        conn.network.ips.return_value = [sdk_fip]
+        index = server_port.use_port_index(conn, ["uuid-test-project", None])
+        conn.network.ports.assert_called_once_with(project_id="uuid-test-project")
+        self.assertIs(server_port.port_index(conn), index)
+
+        sdk_ser = {
+            "id": "uuid-test-server",
+            "project_id": "uuid-test-project",
+            "addresses": {
+                "test-net": [
+                    {"OS-EXT-IPS:type": "fixed", "addr": "192.168.0.11"},
+                    {"OS-EXT-IPS:type": "floating", "addr": "172.20.9.135"},
+                ],
+            },
+        }
+        self.assertEqual(list(server_port.server_ports(conn, sdk_ser)), [sdk_port])
+        self.assertEqual(
+            index.floating_ips(sdk_ser, ["uuid-test-server-port"]), [sdk_fip]
+        )
+        self.assertEqual(conn.network.ports.call_count, 1)
+
+        # Addresses missing in the index make the lookup fall back to
+        # Neutron queries.
+        sdk_ser["addresses"]["test-net"].append(
+            {"OS-EXT-IPS:type": "floating", "addr": "172.20.9.136"}
+        )
+        self.assertIsNone(index.floating_ips(sdk_ser, ["uuid-test-server-port"]))
+        sdk_ser["addresses"]["test-net"].append(
+            {"OS-EXT-IPS:type": "fixed", "addr": "192.168.0.12"}
+        )
+        self.assertIsNone(index.ports(sdk_ser))
+        list(server_port.server_ports(conn, sdk_ser))
+        conn.network.ports.assert_called_with(device_id="uuid-test-server")
@@ -4,6 +4,7 @@ __metaclass__ = type
 
 import openstack
 import unittest
+from unittest import mock
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import server_volume
 
@@ -53,3 +54,53 @@ class TestServerVolume(unittest.TestCase):
                 "volume_type": "tripleo",
             },
         )
+
+    def test_volume_index(self):
+        sdk_volume = sdk_server_volume()
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        forbidden = openstack.exceptions.HttpException(http_status=403)
+
+        def volumes(details, all_projects=False, project_id=None):
+            if all_projects:
+                raise forbidden
+            return [sdk_volume]
+
+        conn.block_storage.volumes.side_effect = volumes
+        conn.compute.volume_attachments.return_value = [
+            {"volume_id": "uuid-test-volume"},
+            {"volume_id": "uuid-other-project-volume"},
+        ]
+        server_volume.use_volume_index(
+            conn, ["uuid-test-project", "uuid-other-project"]
+        )
+        # Volumes are listed on the first lookup.
+        conn.block_storage.volumes.assert_not_called()
+
+        volumes = server_volume.server_volumes(conn, {"id": "uuid-test-server"})
+        self.assertIs(volumes[0], sdk_volume)
+        conn.block_storage.volumes.assert_any_call(
+            details=True, all_projects=True, project_id="uuid-other-project"
+        )
+        # Volumes missing in the index are fetched one by one.
+        conn.block_storage.get_volume.assert_called_once_with(
+            "uuid-other-project-volume"
+        )
+
+        server_volume.server_volumes(conn, {"id": "uuid-test-server"})
+        self.assertEqual(conn.block_storage.volumes.call_count, 2)
+
+    def test_volume_index_without_block_storage(self):
+        sdk_volume = sdk_server_volume()
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-test-project"
+        conn.block_storage.volumes.side_effect = openstack.exceptions.EndpointNotFound()
+        conn.block_storage.get_volume.return_value = sdk_volume
+        conn.compute.volume_attachments.return_value = [
+            {"volume_id": "uuid-test-volume"},
+        ]
+        server_volume.use_volume_index(conn, ["uuid-test-project"])
+
+        volumes = server_volume.server_volumes(conn, {"id": "uuid-test-server"})
+        self.assertEqual(volumes, [sdk_volume])
+        conn.block_storage.get_volume.assert_called_once_with("uuid-test-volume")
@@ -4,6 +4,7 @@ __metaclass__ = type
 
 import openstack
 import unittest
+from unittest import mock
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const, subnet
 
@@ -204,3 +205,31 @@ class TestSubnet(unittest.TestCase):
         self.assertEqual(sdk_params["network_id"], "uuid-test-net")
         self.assertEqual(sdk_params["segment_id"], "uuid-test-segment")
         self.assertEqual(sdk_params["subnet_pool_id"], "uuid-test-subnet-pool")
+
+    def test_create_or_update_all_prefetches_networks(self):
+        conn = mock.Mock()
+        conn.current_project_id = "uuid-tenant"
+        conn.network.networks.return_value = [
+            {"id": "uuid-test-net", "name": "test-net"},
+        ]
+        conn.network.subnets.return_value = []
+        conn.network.create_subnet.return_value = sdk_subnet()
+        subnets = []
+        for i in range(5):
+            ser = serialized_subnet()
+            params = ser[const.RES_PARAMS]
+            params["name"] = f"test-subnet{i}"
+            params["network_ref"]["project_name"] = "%auth%"
+            params["network_ref"]["domain_name"] = "%auth%"
+            params["segment_ref"] = None
+            params["subnet_pool_ref"] = None
+            subnets.append(subnet.Subnet.from_data(ser))
+
+        self.assertEqual(subnet.Subnet.create_or_update_all(conn, subnets), [True] * 5)
+        conn.network.networks.assert_called_once_with(project_id="uuid-tenant")
+        conn.network.find_network.assert_not_called()
+        conn.network.subnets.assert_called_once_with()
+        conn.network.find_subnet.assert_not_called()
+        self.assertEqual(conn.network.create_subnet.call_count, 5)
+        for call in conn.network.create_subnet.call_args_list:
+            self.assertEqual(call.kwargs["network_id"], "uuid-test-net")
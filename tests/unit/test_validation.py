@@ -2,6 +2,8 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import copy
+import tracemalloc
 import unittest
 
 from ansible_collections.os_migrate.os_migrate.plugins.module_utils import const
@@ -47,6 +49,21 @@ class TestValidation(unittest.TestCase):
             ),
         )
 
+    def test_get_errors_in_file_structs_duplication_conflicting(self):
+        file_struct = fixtures.minimal_resource_file_struct()
+        minimal2 = fixtures.minimal_resource()
+        minimal2[const.RES_INFO]["id"] = "uuid-minimal-2"
+        minimal2[const.RES_PARAMS]["description"] = "different"
+        file_struct["resources"].append(minimal2)
+        self.assertEqual(
+            [
+                "Resource duplication: 2 resources with import identity 'openstack.Minimal:minimal'. "
+                "This would result in duplicit imports. "
+                "The resources differ in their importable data."
+            ],
+            validation.get_errors_in_file_structs([file_struct], self.resrc_map),
+        )
+
     def test_get_errors_in_file_structs_bad_data(self):
         file_struct = fixtures.minimal_resource_file_struct()
         res = file_struct["resources"][0]
@@ -55,3 +72,34 @@ class TestValidation(unittest.TestCase):
             ["openstack.Minimal::id-minimal: Missing params.name."],
             validation.get_errors_in_file_structs([file_struct], self.resrc_map),
         )
+
+    def test_get_errors_in_file_structs_memory(self):
+        def file_structs(count):
+            for i in range(count):
+                file_struct = fixtures.minimal_resource_file_struct()
+                template = file_struct["resources"].pop()
+                for j in range(2000):
+                    res = copy.deepcopy(template)
+                    res[const.RES_PARAMS]["name"] = f"minimal-{i}-{j}"
+                    file_struct["resources"].append(res)
+                yield file_struct
+
+        tracemalloc.start()
+        try:
+            all_structs = list(file_structs(10))
+            all_structs_size, _ = tracemalloc.get_traced_memory()
+            del all_structs
+
+            tracemalloc.reset_peak()
+            start_size, _ = tracemalloc.get_traced_memory()
+            errors = validation.get_errors_in_file_structs(
+                file_structs(10), self.resrc_map
+            )
+            _, peak_size = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(errors, [])
+        # Files are validated one at a time, only the import identities
+        # of resources are kept around.
+        self.assertLess(peak_size - start_size, all_structs_size / 2)